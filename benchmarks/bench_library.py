@@ -0,0 +1,267 @@
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import random
+import argparse
+import tempfile
+import resource
+import platform
+import statistics
+import subprocess
+
+# Library benchmarks, every size runs in its own process with Qt on the offscreen platform:
+#   python benchmarks/bench_library.py --output results.json --baseline benchmarks/baseline.json
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = (100, 1000, 10000)
+# Timed operations are repeated and the median is kept
+REPEATS = 5
+SELECTION_SAMPLES = 200
+# A metric regresses when it is this much worse than the baseline
+TOLERANCE = 0.20
+# Time the command line may add on top of the bare interpreter startup
+CLI_BUDGET_MS = 50
+CLI_RUNS = 10
+# Distinct cover images, every game still gets its own file
+ICON_VARIANTS = 32
+ICON_SIZE = 512
+PROTON_BUILD = "GE-Proton9-1"
+MISSING_BUILD = "GE-Proton8-1"
+RESULT_MARKER = "@@bench "
+
+def png_bytes(width, height, color, stripe):
+    # Uncompressed RGB rows with a stripe so the image is not a single color
+    rows = []
+    for y in range(height):
+        pixel = bytes(stripe) if (y // 32) % 2 else bytes(color)
+        rows.append(b"\0" + pixel * width)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b"")
+
+def make_library(home, count):
+    # Synthetic library in a throw-away home: one installed Proton build, real icon files and the game store
+    build_dir = os.path.join(home, ".steam", "root", "compatibilitytools.d", PROTON_BUILD)
+    os.makedirs(build_dir, exist_ok=True)
+    with open(os.path.join(build_dir, "version"), "w") as f:
+        f.write(f"1700000000 {PROTON_BUILD}\n")
+    app_dir = os.path.join(home, ".protonlauncher")
+    icon_dir = os.path.join(app_dir, "bench-icons")
+    os.makedirs(icon_dir, exist_ok=True)
+    # No ProtonDB lookups, the names are made up and a slow network would keep the process alive after the run
+    with open(os.path.join(app_dir, "config.json"), "w") as f:
+        json.dump({"prefix_pool": False, "protondb_lookups": False}, f)
+
+    randomizer = random.Random(count)
+    variants = []
+    for _ in range(ICON_VARIANTS):
+        color = [randomizer.randrange(256) for _ in range(3)]
+        stripe = [randomizer.randrange(256) for _ in range(3)]
+        variants.append(png_bytes(ICON_SIZE, ICON_SIZE, color, stripe))
+
+    sys.path.insert(0, ROOT)
+    from games import Game
+    from game_store import GameStore
+
+    games = []
+    for number in range(count):
+        icon = os.path.join(icon_dir, f"{number:05d}.png")
+        with open(icon, "wb") as f:
+            f.write(variants[number % ICON_VARIANTS])
+        name = f"Benchmark Game {number:05d}"
+        games.append(Game(
+            name=name,
+            path=f"/games/{name}/Game{number:05d}.exe",
+            prefix=f".proton-{name.replace(' ', '')}-prefix",
+            # Some games point at a build that is not installed, like a real library after an upgrade
+            proton=MISSING_BUILD if number % 20 == 0 else PROTON_BUILD,
+            icon=icon,
+            mangohud=number % 3 == 0,
+        ))
+    store = GameStore()
+    store.save_games(games)
+    store.close()
+    return [game.id for game in games]
+
+def timed(function, repeats=REPEATS):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, int(round(fraction * len(ordered))) - 1)]
+
+def run_size(count):
+    # Child process, HOME already points at an empty directory
+    make_library(os.environ["HOME"], count)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5 import QtWidgets
+    from game_store import GameStore
+    from game_model import worker_pool
+    import main
+
+    app = QtWidgets.QApplication([sys.argv[0]])
+    results = {}
+
+    store = GameStore()
+    games = store.load_games()
+    results["load_ms"] = timed(store.load_games)
+    results["save_ms"] = timed(lambda: store.save_games(games))
+    store.close()
+
+    launcher = main.ProtonLauncher()
+    launcher.resize(1280, 800)
+    launcher.show()
+    app.processEvents()
+    # Let the first thumbnails decode and the search index build so they do not compete with the timed operations
+    launcher.thumbnails.pool.waitForDone()
+    worker_pool().waitForDone()
+    app.processEvents()
+
+    def refresh():
+        launcher.load_games()
+        app.processEvents()
+
+    results["refresh_ms"] = timed(refresh)
+
+    randomizer = random.Random(count)
+    latencies = []
+    view_model = launcher.game_list.model()
+    for _ in range(SELECTION_SAMPLES):
+        row = randomizer.randrange(view_model.rowCount())
+        start = time.perf_counter()
+        launcher.game_list.setCurrentIndex(view_model.index(row, 0))
+        app.processEvents()
+        latencies.append((time.perf_counter() - start) * 1000)
+    results["selection_median_ms"] = statistics.median(latencies)
+    results["selection_p95_ms"] = percentile(latencies, 0.95)
+
+    # The index is built on a worker at startup and kept up to date by the refreshes, the first search only pays for
+    # the first layout of the results; the following ones are what typing costs
+    def search(text):
+        launcher.search_edit.setText(text)
+        app.processEvents()
+
+    start = time.perf_counter()
+    search("game")
+    results["search_first_ms"] = (time.perf_counter() - start) * 1000
+    queries = ["g", "ga", "benchmark", "game 1", "game 12", "gme 123", "proton9"]
+    results["search_ms"] = statistics.median(timed(lambda: search(query), 1) for query in queries)
+    search("")
+
+    launcher.thumbnails.pool.waitForDone()
+    # ru_maxrss is in KiB on Linux
+    results["peak_rss_mib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    launcher.close()
+    launcher.store.close()
+    sys.stdout.write(RESULT_MARKER + json.dumps(results) + "\n")
+
+def run_child(count, home):
+    environment = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen")
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-size", str(count)],
+                            env=environment, cwd=ROOT, capture_output=True, text=True)
+    for line in output.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"benchmark for {count} games failed:\n{output.stderr}")
+
+def wall_time(argv, environment, runs=CLI_RUNS):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, env=environment, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def measure_cli(home, game_id):
+    # Startup cost of the command line fast path, with the interpreter startup itself subtracted
+    environment = dict(os.environ, HOME=home)
+    interpreter = wall_time([sys.executable, "-c", "pass"], environment)
+    # The command the shortcuts run
+    status = wall_time([sys.executable, os.path.join(ROOT, "cli.py"), "status", game_id], environment)
+    probe = subprocess.run([sys.executable, "-c", "import sys, cli; cli.main(['status']); print('PyQt5' in sys.modules)"],
+                           env=environment, cwd=ROOT, capture_output=True, text=True)
+    return {
+        "interpreter_ms": interpreter,
+        "status_ms": status,
+        "cli_startup_ms": status - interpreter,
+        "imports_qt": probe.stdout.strip().splitlines()[-1:] != ["False"],
+    }
+
+def compare(results, baseline):
+    # Returns the metrics that got worse than the baseline by more than TOLERANCE
+    regressions = []
+    for size, metrics in results["sizes"].items():
+        for metric, value in metrics.items():
+            reference = baseline.get("sizes", {}).get(size, {}).get(metric)
+            if reference and value > reference * (1 + TOLERANCE):
+                regressions.append((f"{size} games: {metric}", reference, value))
+    reference = baseline.get("cli", {}).get("cli_startup_ms")
+    value = results["cli"]["cli_startup_ms"]
+    if reference and value > reference * (1 + TOLERANCE):
+        regressions.append(("cli_startup_ms", reference, value))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="ProtonLauncher library benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against the results stored in this JSON file")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.run_size:
+        sys.path.insert(0, ROOT)
+        run_size(arguments.run_size)
+        return 0
+
+    results = {"python": platform.python_version(), "machine": platform.machine(), "created": time.time(), "sizes": {}}
+    homes = []
+    for count in arguments.sizes:
+        home = tempfile.mkdtemp(prefix=f"protonlauncher-bench-{count}-")
+        homes.append(home)
+        sys.stderr.write(f"{count} games...\n")
+        results["sizes"][str(count)] = run_child(count, home)
+
+    # The command line is measured against the largest library
+    environment = dict(os.environ, HOME=homes[-1])
+    game_id = subprocess.run([sys.executable, os.path.join(ROOT, "cli.py"), "list"], env=environment, cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.split(None, 1)[0]
+    results["cli"] = measure_cli(homes[-1], game_id)
+
+    for size, metrics in results["sizes"].items():
+        line = ", ".join(f"{metric} {value:.1f}" for metric, value in metrics.items())
+        sys.stdout.write(f"{size:>6} games: {line}\n")
+    cli = results["cli"]
+    sys.stdout.write(f"   cli: startup {cli['cli_startup_ms']:.1f} ms over the interpreter ({cli['interpreter_ms']:.1f} ms), budget {CLI_BUDGET_MS} ms\n")
+
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    if cli["imports_qt"]:
+        sys.stdout.write("FAIL: the command line imports Qt\n")
+        failed = True
+    if cli["cli_startup_ms"] > CLI_BUDGET_MS:
+        sys.stdout.write(f"FAIL: command line startup is over the {CLI_BUDGET_MS} ms budget\n")
+        failed = True
+    if arguments.baseline:
+        with open(arguments.baseline, "r") as f:
+            baseline = json.load(f)
+        for metric, reference, value in compare(results, baseline):
+            sys.stdout.write(f"REGRESSION: {metric} {reference:.1f} -> {value:.1f}\n")
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
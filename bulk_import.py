@@ -0,0 +1,288 @@
+import os
+import re
+import struct
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+
+ICON_DIR = os.path.join(app_dir, "icons")
+SCAN_WORKERS = 8
+
+# Known helper executables that are never the game itself, matched on the whole name so games such as
+# CrashBandicoot or DirectXBenchmarkGame are kept
+SKIP_PATTERNS = re.compile(
+    r"^(unins\d*|uninstall.*|setup.*|install.*|.*redist.*|vc_?redist.*|dxsetup|dxwebsetup|directx_?setup|dotnet.*|ndp\d+.*|oalinst|"
+    r"physxsetup.*|physxupdateloader\d*|crashpad_handler|crashreporter|crashreportclient|crashsender\d*|crashhandler(32|64)?|"
+    r"unitycrashhandler(32|64)?|bugreport.*|errorreporter|easyanticheat.*|"
+    r"beservice.*|battleye.*|cefsharp.*|qtwebengineprocess|zfgamebrowser|ue4prereqsetup.*|"
+    r"touchup|cleanup|pythonw?(\d+(\.\d+)*)?|7za?|7zg|7zfm|winrar|unrar|notification_helper|vulkan-?1?)$"
+)
+# Directories that only hold redistributables, tools or support files
+SKIP_DIRS = {"_commonredist", "commonredist", "redist", "redistributables", "directx", "vcredist", "dotnet",
+             "__installer", "_installer", "installer", "support", "__support", "easyanticheat", "battleye",
+             "crashreporter", "engine", ".git", "tools", "uninstall", "prereqs", "_redist"}
+LAUNCHER_PATTERN = re.compile(r"launcher|config|settings|setup|updater|patcher|editor|server", re.IGNORECASE)
+
+class Candidate:
+    __slots__ = ("path", "size", "score")
+
+    def __init__(self, path, size, score):
+        self.path = path
+        self.size = size
+        self.score = score
+
+class ScanResult:
+    # Best executables found in one game directory, ordered by score
+    __slots__ = ("name", "directory", "candidates", "icon")
+
+    def __init__(self, name, directory, candidates):
+        self.name = name
+        self.directory = directory
+        self.candidates = candidates
+        self.icon = None
+
+    @property
+    def best(self):
+        return self.candidates[0]
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+def score_executable(path, size, game_dir):
+    # Higher is more likely to be the game, None for executables that are skipped
+    stem = os.path.splitext(os.path.basename(path))[0]
+    lowered = stem.lower()
+    if SKIP_PATTERNS.match(lowered):
+        return None
+
+    score = 0.0
+    folder = normalize(os.path.basename(game_dir))
+    name = normalize(stem)
+    if name and folder and (name in folder or folder in name):
+        score += 50
+    if LAUNCHER_PATTERN.search(stem):
+        score -= 40
+    if lowered.endswith("-win64-shipping") or lowered.endswith("-win32-shipping"):
+        score += 20
+    # Bigger executables are usually the game, tiny ones are helpers
+    score += min(size / (1024 * 1024), 100) * 0.3
+    # Executables close to the game directory are preferred
+    depth = os.path.relpath(path, game_dir).count(os.sep)
+    score -= depth * 5
+    if re.search(r"(^|[\\/])(bin|binaries)[\\/](win64|x64)", os.path.relpath(path, game_dir), re.IGNORECASE):
+        score += 10
+    return score
+
+def find_executables(game_dir):
+    executables = []
+    for root, dirs, files in os.walk(game_dir):
+        dirs[:] = [d for d in dirs if d.lower() not in SKIP_DIRS]
+        for name in files:
+            if not name.lower().endswith(".exe"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            executables.append((path, size))
+    return executables
+
+def scan_game_dir(game_dir, known_paths):
+    candidates = []
+    for path, size in find_executables(game_dir):
+        if path in known_paths:
+            continue
+        score = score_executable(path, size, game_dir)
+        if score is not None:
+            candidates.append(Candidate(path, size, score))
+    if not candidates:
+        return None
+    candidates.sort(key=lambda candidate: candidate.score, reverse=True)
+    result = ScanResult(os.path.basename(os.path.normpath(game_dir)), game_dir, candidates)
+    result.icon = extract_icon(result.best.path)
+    return result
+
+def game_dirs(directories):
+    # Every sub directory of a scanned directory is treated as one game, loose executables as another
+    for directory in directories:
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name.lower())
+        except OSError:
+            continue
+        subdirs = [entry.path for entry in entries if is_entry(entry, "dir") and entry.name.lower() not in SKIP_DIRS]
+        if any(is_entry(entry, "file") and entry.name.lower().endswith(".exe") for entry in entries):
+            yield directory, False
+        for subdir in subdirs:
+            yield subdir, True
+
+def is_entry(entry, kind):
+    # Broken symlinks and unreadable entries are neither
+    try:
+        return entry.is_dir() if kind == "dir" else entry.is_file()
+    except OSError:
+        return False
+
+def scan(directories, known_paths=(), workers=SCAN_WORKERS, progress=None):
+    # Scans the directories in parallel, one game directory per task
+    known_paths = set(known_paths)
+    targets = list(game_dirs(directories))
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for directory, recursive in targets:
+            if recursive:
+                futures.append(executor.submit(scan_game_dir, directory, known_paths))
+            else:
+                futures.append(executor.submit(scan_loose_executables, directory, known_paths))
+        for done, future in enumerate(futures, 1):
+            # A directory that can not be read (permissions, a vanished mount) is skipped, the others still count
+            try:
+                found = future.result()
+            except OSError:
+                found = None
+            if isinstance(found, list):
+                results.extend(found)
+            elif found is not None:
+                results.append(found)
+            if progress is not None:
+                progress(done, len(futures))
+    return results
+
+def scan_loose_executables(directory, known_paths):
+    # Executables placed directly in the scanned directory are one game each
+    results = []
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return results
+    for entry in entries:
+        try:
+            if not entry.is_file() or not entry.name.lower().endswith(".exe") or entry.path in known_paths:
+                continue
+            size = entry.stat().st_size
+        except OSError:
+            continue
+        score = score_executable(entry.path, size, directory)
+        if score is None:
+            continue
+        result = ScanResult(os.path.splitext(entry.name)[0], directory, [Candidate(entry.path, size, score)])
+        result.icon = extract_icon(entry.path)
+        results.append(result)
+    return results
+
+# PE resource types
+RT_ICON = 3
+RT_GROUP_ICON = 14
+
+def extract_icon(exe_path, icon_dir=ICON_DIR):
+    # Writes the largest icon embedded in the executable and returns its path, or None
+    try:
+        with open(exe_path, "rb") as f:
+            image = read_largest_icon(f)
+    except (OSError, struct.error, ValueError):
+        return None
+    if image is None:
+        return None
+
+    width, height, bit_count, data = image
+    os.makedirs(icon_dir, exist_ok=True)
+    name = hashlib.sha1(os.path.abspath(exe_path).encode("utf-8")).hexdigest()
+    if data.startswith(b"\x89PNG"):
+        icon_path = os.path.join(icon_dir, f"{name}.png")
+        content = data
+    else:
+        # Single image .ico file around the raw DIB data
+        icon_path = os.path.join(icon_dir, f"{name}.ico")
+        content = struct.pack("<HHH", 0, 1, 1)
+        content += struct.pack("<BBBBHHII", width % 256, height % 256, 0, 0, 1, bit_count, len(data), 22)
+        content += data
+    with open(icon_path, "wb") as f:
+        f.write(content)
+    return icon_path
+
+def read_largest_icon(f):
+    f.seek(0)
+    if f.read(2) != b"MZ":
+        return None
+    f.seek(0x3C)
+    pe_offset = struct.unpack("<I", f.read(4))[0]
+    f.seek(pe_offset)
+    if f.read(4) != b"PE\0\0":
+        return None
+    _, section_count, _, _, _, optional_size, _ = struct.unpack("<HHIIIHH", f.read(20))
+    optional_offset = f.tell()
+    magic = struct.unpack("<H", f.read(2))[0]
+    # Offset of the data directories inside the optional header for PE32 and PE32+
+    directories_offset = {0x10B: 96, 0x20B: 112}.get(magic)
+    if directories_offset is None:
+        return None
+    f.seek(optional_offset + directories_offset + 2 * 8)
+    resource_rva, resource_size = struct.unpack("<II", f.read(8))
+    if not resource_rva:
+        return None
+
+    f.seek(optional_offset + optional_size)
+    sections = []
+    for _ in range(section_count):
+        header = f.read(40)
+        virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack("<IIII", header[8:24])
+        sections.append((virtual_address, max(virtual_size, raw_size), raw_pointer))
+
+    def rva_to_offset(rva):
+        for virtual_address, size, raw_pointer in sections:
+            if virtual_address <= rva < virtual_address + size:
+                return rva - virtual_address + raw_pointer
+        raise ValueError("RVA outside of the sections")
+
+    resource_base = rva_to_offset(resource_rva)
+
+    def directory_entries(offset):
+        f.seek(resource_base + offset)
+        named, ids = struct.unpack("<12xHH", f.read(16))
+        entries = []
+        for _ in range(named + ids):
+            name, target = struct.unpack("<II", f.read(8))
+            entries.append((name, target))
+        return entries
+
+    def first_data(target):
+        # Follow the name and language levels down to the first data entry
+        while target & 0x80000000:
+            entries = directory_entries(target & 0x7FFFFFFF)
+            if not entries:
+                return None
+            target = entries[0][1]
+        f.seek(resource_base + target)
+        data_rva, size = struct.unpack("<II", f.read(8))
+        f.seek(rva_to_offset(data_rva))
+        return f.read(size)
+
+    types = {name: target for name, target in directory_entries(0) if not name & 0x80000000}
+    if RT_GROUP_ICON not in types or RT_ICON not in types:
+        return None
+    icons = {name: target for name, target in directory_entries(types[RT_ICON] & 0x7FFFFFFF) if not name & 0x80000000}
+    groups = directory_entries(types[RT_GROUP_ICON] & 0x7FFFFFFF)
+    if not groups:
+        return None
+    group = first_data(groups[0][1])
+    if not group:
+        return None
+
+    _, _, count = struct.unpack("<HHH", group[:6])
+    best = None
+    for index in range(count):
+        entry = group[6 + index * 14:6 + (index + 1) * 14]
+        width, height, _, _, _, bit_count, _, icon_id = struct.unpack("<BBBBHHIH", entry)
+        # A width of 0 means 256 pixels
+        key = (width or 256, bit_count)
+        if icon_id in icons and (best is None or key > best[0]):
+            best = (key, width or 256, height or 256, bit_count, icon_id)
+    if best is None:
+        return None
+    _, width, height, bit_count, icon_id = best
+    data = first_data(icons[icon_id])
+    if not data:
+        return None
+    return width, height, bit_count, data
@@ -0,0 +1,197 @@
+import os
+import sys
+import time
+import signal
+from game_store import GameStore, DB_PATH
+from game_runtime import read_state, running_states
+
+# Command line entry point used by the shortcuts, it never imports Qt so a launch starts in a few milliseconds.
+# Modules only needed by one command are imported inside it.
+COMMANDS = ("launch", "list", "status", "dedup")
+USAGE = """usage: protonlauncher launch <name|id>
+       protonlauncher list
+       protonlauncher status [<name|id>]
+       protonlauncher dedup [--dry-run]
+"""
+# The first game process is looked for in /proc this often, for at most FIRST_PROCESS_TIMEOUT seconds
+PROBE_INTERVAL = 0.25
+FIRST_PROCESS_TIMEOUT = 600
+
+def find_game(store, key):
+    # Ids first, then the exact name, then the name ignoring case
+    game = store.get_game(key) or store.find_game(key)
+    if game is None:
+        for candidate in store.load_games():
+            if candidate.name.lower() == key.lower():
+                return candidate
+    return game
+
+def shortcut_command():
+    # Command the desktop entries run, the frozen binary or this file under the current interpreter.
+    # main.py is not used from source, the interpreter would compile all of the interface on every launch.
+    if getattr(sys, "frozen", False):
+        return f'"{sys.executable}"'
+    return f'"{sys.executable}" "{os.path.abspath(__file__)}"'
+
+def launch(store, key):
+    from launch_engine import launch_plan, mangohud_logging
+    from proton_registry import ProtonRegistry
+    from launch_history import LaunchRecord, LaunchHistory
+    from game_runtime import RotatingLog, game_log_dir, write_state, clear_state, find_game_processes, exe_name
+    from tuning import launch_settings
+    import subprocess
+
+    game = find_game(store, key)
+    if game is None:
+        sys.stderr.write(f"protonlauncher: no game named {key!r}\n")
+        return 1
+    if read_state(game.id) is not None:
+        sys.stderr.write(f"protonlauncher: {game.name} is already running\n")
+        return 1
+    registry = ProtonRegistry()
+    if not registry.exists(game.proton):
+        sys.stderr.write(f"protonlauncher: {game.proton} is not installed, edit {game.name} to choose another version\n")
+        return 1
+
+    log = RotatingLog(game_log_dir(game.id))
+    log.open()
+    profile, settings = launch_settings(game)
+    record = LaunchRecord(game.id, time.time(), game.proton, profile=profile, tuning=settings)
+    record.mark("script_start")
+    started = time.monotonic()
+    probing = True
+    cancelled = []
+    process = None
+
+    def forward(signum, frame):
+        # Closing the shortcut's process ends the whole game, like Stop Game in the window
+        cancelled.append(signum)
+        if process is not None and process.poll() is None:
+            try:
+                os.killpg(process.pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    try:
+        for step in launch_plan(game, registry):
+            if cancelled:
+                break
+            record.mark(step.phase)
+            environment = dict(os.environ)
+            environment.update(step.environment)
+            # A new session puts the game in its own process group, the same as setsid in the window
+            process = subprocess.Popen(step.argv, env=environment, stdout=log.file, stderr=subprocess.STDOUT,
+                                       stdin=subprocess.DEVNULL, start_new_session=True)
+            write_state(game.id, process.pid, game.name, "shortcut")
+            while process.poll() is None:
+                if probing and time.monotonic() - started > FIRST_PROCESS_TIMEOUT:
+                    probing = False
+                if probing and find_game_processes({process.pid: exe_name(game)}):
+                    record.mark("first_process")
+                    probing = False
+                if not probing:
+                    process.wait()
+                    break
+                time.sleep(PROBE_INTERVAL)
+            if step.done_phase:
+                record.mark(step.done_phase)
+    finally:
+        log.close()
+        clear_state(game.id)
+
+    record.exit_code = process.returncode if process is not None else None
+    record.mark("exit")
+    LaunchHistory(store).record(record)
+    if mangohud_logging(game):
+        # Frame time logs of the session go into the performance reports right away
+        import perf_reports
+        perf_reports.PerfSessions(store).ingest(game, profile, settings)
+    return record.exit_code or 0
+
+def list_games(store):
+    from proton_registry import ProtonRegistry
+
+    registry = ProtonRegistry()
+    running = {state["game_id"] for state in running_states()}
+    for game in store.load_games():
+        proton = game.proton if registry.exists(game.proton) else f"{game.proton} (not installed)"
+        status = "running" if game.id in running else ""
+        sys.stdout.write(f"{game.id}  {game.name:<32} {proton:<28} {status}\n")
+    return 0
+
+def status(store, key=None):
+    if key is None:
+        states = running_states()
+        if not states:
+            sys.stdout.write("No games running\n")
+        for state in states:
+            uptime = time.strftime("%H:%M:%S", time.gmtime(time.time() - state["started"]))
+            sys.stdout.write(f"{state['game_id']}  {state['name']:<32} PID {state['pid']}, uptime {uptime}, started from the {state['source']}\n")
+        return 0
+
+    from launch_history import LaunchHistory
+
+    game = find_game(store, key)
+    if game is None:
+        sys.stderr.write(f"protonlauncher: no game named {key!r}\n")
+        return 1
+    state = read_state(game.id)
+    sys.stdout.write(f"Name: {game.name}\nId: {game.id}\nPath: {game.path}\nPrefix: {game.prefix}\nProton: {game.proton}\n")
+    if state is not None:
+        uptime = time.strftime("%H:%M:%S", time.gmtime(time.time() - state["started"]))
+        sys.stdout.write(f"Status: Running (PID {state['pid']}, uptime {uptime})\n")
+    else:
+        sys.stdout.write("Status: Not running\n")
+    launches, median, p95 = LaunchHistory(store).stats(game.id)
+    if median is not None:
+        sys.stdout.write(f"Time to start: median {median:.1f} s, p95 {p95:.1f} s ({launches} launches)\n")
+    else:
+        sys.stdout.write(f"Time to start: no data ({launches} launches)\n")
+    return 0
+
+def dedup_prefixes(store, dry_run=False):
+    import dedup
+    from storage import format_size
+
+    # Prefixes of running games are left alone, their files may be open or being written
+    running = {state["game_id"] for state in running_states()}
+    games = store.load_games()
+    skipped = [game.name for game in games if game.id in running]
+    if skipped:
+        sys.stdout.write(f"Skipping running games: {', '.join(skipped)}\n")
+    progress = lambda done, total: sys.stderr.write(f"\rCloning duplicates {done}/{total}") if sys.stderr.isatty() else None
+    result = dedup.dedup_games(games, running, dry_run=dry_run, progress=progress)
+    if sys.stderr.isatty():
+        sys.stderr.write("\n")
+    sys.stdout.write(f"{result.files} files checked, {result.hashed} of them hashed\n")
+    if result.unsupported:
+        sys.stdout.write(f"{result.unsupported} duplicates are not deduplicable on this filesystem, it does not support reflinks\n")
+    if dry_run:
+        sys.stdout.write(f"About {format_size(result.saved)} can be freed\n")
+    else:
+        sys.stdout.write(f"{result.reflinked} files reflinked, {result.skipped} changed while running and left as they are\n")
+        sys.stdout.write(f"{format_size(result.saved)} freed\n")
+    return 0
+
+def main(argv):
+    if not argv or argv[0] not in COMMANDS or (argv[0] == "launch" and len(argv) != 2) or len(argv) > 2 \
+            or (argv[0] == "dedup" and argv[1:] not in ([], ["--dry-run"])):
+        sys.stderr.write(USAGE)
+        return 2
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    store = GameStore()
+    try:
+        if argv[0] == "launch":
+            return launch(store, argv[1])
+        if argv[0] == "list":
+            return list_games(store)
+        if argv[0] == "dedup":
+            return dedup_prefixes(store, dry_run=len(argv) > 1)
+        return status(store, argv[1] if len(argv) > 1 else None)
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -19,12 +19,6 @@ if ! dpkg -l | grep -q python3-venv; then
     sudo apt install -y python3-venv
 fi
 
-# Check if tkinter is installed
-if ! dpkg -l | grep -q python3-tk; then
-    echo -e "${YELLOW}python3-tk is not installed and will be installed now${NC}"
-    sudo apt install -y python3-tk
-fi
-
 # Install the necessary libraries if not already installed
 LIBRARIES=("libxcb-xinerama0" "libxcb1" "libx11-xcb1" "libxrender1" "libfontconfig1" "libqt5widgets5" "libqt5gui5" "libqt5core5a")
 
@@ -73,17 +67,45 @@ pip install -r requirements.txt
 export QT_QPA_PLATFORM=xcb
 
 # Compile the application
+# One directory rather than --onefile: a one-file build unpacks itself into a temporary directory on every start,
+# which every shortcut launch and command would pay for
 echo -e "${GREEN}Compiling the application...${NC}"
-pyinstaller --clean --workpath ./temp --noconfirm --onefile --windowed --distpath ./ \
+pyinstaller --clean --workpath ./temp --noconfirm --onedir --windowed --distpath ./dist \
     --add-data icons:icons/ \
     --add-data config.py:. \
     --add-data launcher.py:. \
-    --name ProtonLauncher.bin \
+    --add-data thumbnails.py:. \
+    --add-data games.py:. \
+    --add-data game_model.py:. \
+    --add-data game_store.py:. \
+    --add-data supervisor.py:. \
+    --add-data startup_profile.py:. \
+    --add-data proton_registry.py:. \
+    --add-data proton_watcher.py:. \
+    --add-data prefix_pool.py:. \
+    --add-data prefix_warmer.py:. \
+    --add-data bulk_import.py:. \
+    --add-data launch_history.py:. \
+    --add-data launch_engine.py:. \
+    --add-data game_runtime.py:. \
+    --add-data cli.py:. \
+    --add-data search_index.py:. \
+    --add-data tuning.py:. \
+    --add-data perf_reports.py:. \
+    --add-data storage.py:. \
+    --add-data storage_manager.py:. \
+    --add-data dedup.py:. \
+    --add-data protondb.py:. \
+    --add-data shortcuts.py:. \
+    --name ProtonLauncher \
     main.py
 
+# The binary keeps its usual name in the project directory
+ln -sfn dist/ProtonLauncher/ProtonLauncher ProtonLauncher.bin
+
 # Remove the temporary files
 echo -e "${GREEN}Cleaning up...${NC}"
-rm ProtonLauncher.bin.spec
+rm ProtonLauncher.spec
 rm -rf temp
 
 # Deactivate the virtual environment
@@ -1,30 +1,140 @@
 import os
 import json
+import fcntl
+import atexit
+import tempfile
+import threading
 
 # Create the application directory
 app_dir = os.path.expanduser("~/.protonlauncher")
 
 CONFIG_PATH = os.path.join(app_dir, "config.json")
 
-def save_config(config):
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(config, f)
+# Known settings with their type and default value, unknown keys found in the file are kept as they are
+CONFIG_SCHEMA = {
+    "desktop": (str, None),
+    # Keep an initialised template prefix per Proton build and clone it for new games
+    "prefix_pool": (bool, True),
+    # Named performance profiles, see tuning.py
+    "profiles": (dict, {}),
+    # Games with MangoHud enabled log their frame times for the performance reports
+    "mangohud_logging": (bool, True),
+    # ProtonDB ratings are looked up in the background, cached for protondb_ttl seconds
+    "protondb_lookups": (bool, True),
+    "protondb_ttl": (int, 7 * 24 * 3600),
+    "protondb_url": (str, "https://www.protondb.com"),
+    "steam_store_url": (str, "https://store.steampowered.com"),
+}
+
+# Seconds to wait after the last change before writing the file
+WRITE_DELAY = 1.0
+
+class Config:
+    # Loaded once and kept in memory, changes are written behind with a temp file + rename
+    def __init__(self, path=CONFIG_PATH, schema=CONFIG_SCHEMA):
+        self.path = path
+        self.schema = schema
+        self._lock = threading.RLock()
+        self._timer = None
+        self._changed = set()
+        self._values = self.read()
+
+    def read(self):
+        try:
+            with open(self.path, "r") as f:
+                values = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(values, dict):
+            return {}
+        # Drop known keys with a wrong type so they fall back to the default
+        return {key: value for key, value in values.items() if self.valid(key, value)}
+
+    def valid(self, key, value):
+        if key not in self.schema or value is None:
+            return True
+        expected, _ = self.schema[key]
+        return isinstance(value, expected)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            if key in self.schema:
+                return self.schema[key][1]
+            return None
+
+    def set(self, key, value):
+        if not self.valid(key, value):
+            raise TypeError(f"Invalid value for config key '{key}': {value!r}")
+        with self._lock:
+            if key in self._values and self._values[key] == value:
+                return
+            self._values[key] = value
+            self._changed.add(key)
+            self.schedule_write()
+
+    def update(self, values):
+        with self._lock:
+            for key, value in values.items():
+                self.set(key, value)
+
+    def as_dict(self):
+        with self._lock:
+            values = {key: default for key, (_, default) in self.schema.items()}
+            values.update(self._values)
+            return values
+
+    def schedule_write(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(WRITE_DELAY, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._changed:
+                return
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+
+            # Serialize writers from other launcher instances and merge their changes with ours
+            with open(f"{self.path}.lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                values = self.read()
+                for key in self._changed:
+                    values[key] = self._values[key]
+
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(values, f)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+
+            self._values = values
+            self._changed.clear()
+
+config = Config()
+atexit.register(config.flush)
+
+def save_config(values):
+    config.update(values)
 
 def load_config():
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, "r") as f:
-            return json.load(f)
-    return {}
+    return config.as_dict()
 
 def load_desktop():
-    config = load_config()
-    return config.get("desktop", None)
+    return config.get("desktop")
 
 def set_desktop(desktop_dir):
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, "w") as f:
-            config = load_config()
-            config["desktop"] = desktop_dir
-            json.dump(config, f)
-    else:
-        save_config({"desktop": desktop_dir})
\ No newline at end of file
+    config.set("desktop", desktop_dir)
@@ -0,0 +1,298 @@
+import os
+import errno
+import fcntl
+import shutil
+import sqlite3
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from prefix_pool import prefix_path, POOL_DIR
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+
+# Hashes of the prefix files seen by earlier runs, a file is hashed again only when its inode, size or mtime change.
+# Files reflinked by a run keep the path of their source, the pair is not cloned again while both stay unchanged.
+INDEX_PATH = os.path.join(app_dir, "dedup.db")
+HASH_WORKERS = 8
+# Smaller files are not worth a reflink, it saves at most a few blocks
+MIN_SIZE = 16 * 1024
+# Files are compared on the hash of their first block before the whole file is hashed
+HEAD_BYTES = 64 * 1024
+CHUNK_BYTES = 1024 * 1024
+# ioctl(dest_fd, FICLONE, src_fd) from linux/fs.h, shares every block of src copy-on-write
+FICLONE = 0x40049409
+# Errors meaning the filesystem can not reflink these files
+NO_REFLINK_ERRORS = (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.EPERM)
+TMP_SUFFIX = ".dedup-tmp"
+
+class FileEntry:
+    __slots__ = ("path", "dev", "inode", "size", "mtime", "nlink", "head", "digest", "known", "linked_to")
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.dev = stat.st_dev
+        self.inode = stat.st_ino
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        self.nlink = stat.st_nlink
+        self.head = None
+        self.digest = None
+        # Whether the index holds this file unchanged, and the file it was reflinked from
+        self.known = False
+        self.linked_to = None
+
+class DedupResult:
+    def __init__(self):
+        self.files = 0
+        # Files read because the index had no hash for them
+        self.hashed = 0
+        self.reflinked = 0
+        # Duplicates on filesystems that can not reflink, they are left as separate files
+        self.unsupported = 0
+        self.skipped = 0
+        self.saved = 0
+
+class HashIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, inode INTEGER, size INTEGER, mtime INTEGER, head TEXT, digest TEXT, "
+            "linked_to TEXT)"
+        )
+
+    def load(self, roots):
+        # {path: (inode, size, mtime, head, digest, linked_to)} for the files under the roots
+        known = {}
+        for root in roots:
+            rows = self.conn.execute(
+                "SELECT path, inode, size, mtime, head, digest, linked_to FROM files WHERE path >= ? AND path < ?",
+                (root + os.sep, root + chr(ord(os.sep) + 1)),
+            )
+            for path, *values in rows:
+                known[path] = tuple(values)
+        return known
+
+    def store(self, roots, entries):
+        # Replaces the rows under the roots with the files seen by this run
+        with self.conn:
+            for root in roots:
+                self.conn.execute("DELETE FROM files WHERE path >= ? AND path < ?", (root + os.sep, root + chr(ord(os.sep) + 1)))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files (path, inode, size, mtime, head, digest, linked_to) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(entry.path, entry.inode, entry.size, entry.mtime, entry.head, entry.digest, entry.linked_to)
+                 for entry in entries if entry.head],
+            )
+
+    def close(self):
+        self.conn.close()
+
+def walk_prefix(root):
+    # Regular files worth linking, symlinks are never followed
+    entries = []
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as found:
+                for entry in found:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and not entry.name.endswith(TMP_SUFFIX):
+                            stat = entry.stat(follow_symlinks=False)
+                            if stat.st_size >= MIN_SIZE:
+                                entries.append(FileEntry(entry.path, stat))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return entries
+
+def hash_file(path, limit=None):
+    # blake2b of the file, or of its first limit bytes
+    digest = hashlib.blake2b(digest_size=20)
+    remaining = limit
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_BYTES if remaining is None else min(CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+def group(entries, key):
+    # Groups with files on at least two different inodes, the only ones with something to link
+    groups = {}
+    for entry in entries:
+        groups.setdefault(key(entry), []).append(entry)
+    return [members for members in groups.values() if len({member.inode for member in members}) > 1]
+
+def mark_known(entries, known):
+    # Marks the files the index holds unchanged. A link is kept only while its source is unchanged too, a source
+    # written since then no longer shares its blocks with the clone.
+    for entry in entries:
+        cached = known.get(entry.path)
+        if cached is not None and cached[:3] == (entry.inode, entry.size, entry.mtime):
+            entry.known = True
+            entry.linked_to = cached[5]
+    unchanged_paths = {entry.path for entry in entries if entry.known}
+    for entry in entries:
+        if entry.linked_to not in unchanged_paths:
+            entry.linked_to = None
+
+def fill_hashes(entries, attribute, known, limit, executor):
+    # Reuses the hashes of the index for unchanged files and hashes the rest in parallel, returns the number hashed
+    missing = []
+    for entry in entries:
+        value = None
+        if entry.known:
+            cached = known[entry.path]
+            value = cached[3] if attribute == "head" else cached[4]
+        if value:
+            setattr(entry, attribute, value)
+        else:
+            missing.append(entry)
+    # Each inode is read once, hardlinked paths share the result
+    by_inode = {}
+    for entry in missing:
+        by_inode.setdefault((entry.dev, entry.inode), []).append(entry)
+    paths = [members[0].path for members in by_inode.values()]
+    for members, value in zip(by_inode.values(), executor.map(lambda path: safe_hash(path, limit), paths)):
+        for entry in members:
+            setattr(entry, attribute, value)
+    return len(paths)
+
+def safe_hash(path, limit):
+    try:
+        return hash_file(path, limit)
+    except OSError:
+        return None
+
+def unchanged(entry):
+    try:
+        stat = os.lstat(entry.path)
+    except OSError:
+        return False
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns) == (entry.inode, entry.size, entry.mtime)
+
+def reflink(source, target):
+    # Replaces target with a copy-on-write clone of source, keeping the permissions and times of target
+    tmp_path = f"{target}{TMP_SUFFIX}"
+    try:
+        with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(target, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def probe_reflink(source, target):
+    # Whether the filesystem of target can clone source, tried on a throw-away file next to target
+    tmp_path = f"{target}{TMP_SUFFIX}"
+    try:
+        with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        return False
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def link_duplicate(source, entry, reflinks):
+    # Replaces entry with a reflink of source. Returns "reflink", None if the filesystem can not clone and "changed"
+    # if one of the files changed or could not be replaced. reflinks remembers per device whether the filesystem
+    # can clone. Hardlinks are never used: one prefix writing a shared file in place would change all the others.
+    if not reflinks.get(entry.dev, True):
+        return None
+    if not unchanged(entry) or not unchanged(source):
+        return "changed"
+    try:
+        reflink(source.path, entry.path)
+    except OSError as error:
+        if error.errno not in NO_REFLINK_ERRORS:
+            return "changed"
+        reflinks[entry.dev] = False
+        return None
+    reflinks[entry.dev] = True
+    return "reflink"
+
+def dedup_roots(roots, index_path=INDEX_PATH, dry_run=False, workers=HASH_WORKERS, progress=None):
+    # Reflinks identical files across the prefixes. Files on filesystems without reflink support are counted as
+    # unsupported and left alone.
+    result = DedupResult()
+    roots = sorted({os.path.abspath(root) for root in roots if os.path.isdir(root)})
+    index = HashIndex(index_path)
+    try:
+        known = index.load(roots)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            entries = [entry for found in executor.map(walk_prefix, roots) for entry in found]
+            result.files = len(entries)
+            mark_known(entries, known)
+
+            # Size first, then the first block, then the whole file; each step only keeps files with a possible twin
+            candidates = [entry for members in group(entries, lambda entry: (entry.dev, entry.size)) for entry in members]
+            result.hashed += fill_hashes(candidates, "head", known, HEAD_BYTES, executor)
+            candidates = [entry for members in group([entry for entry in candidates if entry.head], lambda entry: (entry.dev, entry.size, entry.head))
+                          for entry in members]
+            small = [entry for entry in candidates if entry.size <= HEAD_BYTES]
+            for entry in small:
+                entry.digest = entry.head
+            fill_hashes([entry for entry in candidates if entry.size > HEAD_BYTES], "digest", known, None, executor)
+        duplicates = group([entry for entry in candidates if entry.digest], lambda entry: (entry.dev, entry.size, entry.digest))
+
+        reflinks = {}
+        # Several paths of a duplicate can share an inode, the space is counted once per inode
+        replaced = set()
+        for number, members in enumerate(duplicates, 1):
+            # The file earlier runs cloned the others from is kept, then the inode with the most links and the template
+            # copy; everything else becomes a clone of it
+            sources = [entry.linked_to for entry in members]
+            source = max(members, key=lambda entry: (sources.count(entry.path), entry.nlink, entry.path.startswith(POOL_DIR),
+                                                     -len(entry.path)))
+            for entry in members:
+                # Clones made by an earlier run already share their blocks with the source
+                if entry.inode == source.inode or entry.linked_to == source.path:
+                    continue
+                if dry_run:
+                    if entry.dev not in reflinks:
+                        reflinks[entry.dev] = probe_reflink(source.path, entry.path)
+                    if not reflinks[entry.dev]:
+                        result.unsupported += 1
+                        continue
+                else:
+                    method = link_duplicate(source, entry, reflinks)
+                    if method is None:
+                        result.unsupported += 1
+                        continue
+                    if method == "changed":
+                        result.skipped += 1
+                        # Hashed again by the next run
+                        entry.head = None
+                        continue
+                    result.reflinked += 1
+                    entry.linked_to = source.path
+                if (entry.dev, entry.inode) not in replaced:
+                    replaced.add((entry.dev, entry.inode))
+                    result.saved += entry.size
+                if not dry_run:
+                    stat = os.lstat(entry.path)
+                    entry.inode, entry.mtime = stat.st_ino, stat.st_mtime_ns
+            if progress is not None:
+                progress(number, len(duplicates))
+        index.store(roots, entries)
+    finally:
+        index.close()
+    return result
+
+def dedup_games(games, running=(), **options):
+    # Prefixes of the games that are not running, and the prefix templates they were cloned from
+    roots = [prefix_path(game) for game in games if game.id not in running]
+    try:
+        roots += [os.path.join(POOL_DIR, name) for name in os.listdir(POOL_DIR) if not name.startswith(".")]
+    except OSError:
+        pass
+    return dedup_roots(roots, **options)
@@ -0,0 +1,436 @@
+from PyQt5 import QtCore, QtGui
+from search_index import SearchIndex, SearchEntry, scan
+
+GameIdRole = QtCore.Qt.UserRole + 1
+GameRole = QtCore.Qt.UserRole + 2
+RatingRole = QtCore.Qt.UserRole + 3
+# Roles whose data follows each game field, GameRole changes with every field
+FIELD_ROLES = {
+    "name": (QtCore.Qt.DisplayRole,),
+    "icon": (QtCore.Qt.DecorationRole,),
+    "path": (QtCore.Qt.ToolTipRole,),
+    "proton": (QtCore.Qt.ToolTipRole, QtCore.Qt.ForegroundRole),
+}
+
+# Threads of the pool shared by the Python tasks of the window, each kind of task runs one at a time by itself
+WORKER_THREADS = 4
+_worker_pool = None
+
+def worker_pool():
+    # The pool for Python tasks: search index builds, imports, ProtonDB lookups, log ingests and shortcut syncs.
+    # Never QThreadPool.globalInstance(): Qt spreads smooth image scaling over the global pool and waits for it
+    # while the GUI thread holds the GIL, a Python task queued there would never get to run.
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = QtCore.QThreadPool(QtCore.QCoreApplication.instance())
+        _worker_pool.setMaxThreadCount(WORKER_THREADS)
+    return _worker_pool
+
+def row_runs(rows):
+    # [first, last] of every run of adjacent rows, the bottom run first
+    runs = []
+    for row in sorted(rows, reverse=True):
+        if runs and runs[-1][0] == row + 1:
+            runs[-1][0] = row
+        else:
+            runs.append([row, row])
+    return runs
+
+class GameListModel(QtCore.QAbstractListModel):
+    # List model over Game records, indexed by id and by name so lookups never scan the library
+    # Around the row removals of one remove_games call, so the filter updates once for the whole batch
+    removal_started = QtCore.pyqtSignal()
+    removal_finished = QtCore.pyqtSignal()
+
+    def __init__(self, thumbnails, default_icon, proton_registry, parent=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        self.default_icon = default_icon
+        self.proton_registry = proton_registry
+        self._games = []
+        self._rows = {}
+        self._ids_by_name = {}
+        self._ids_by_icon = {}
+        # ProtonDB label per game id
+        self._ratings = {}
+        self.thumbnails.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._games)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._games):
+            return None
+        game = self._games[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            rating = self._ratings.get(game.id)
+            return f"{game.name}\nProtonDB: {rating}" if rating else game.name
+        if role == QtCore.Qt.DecorationRole:
+            return self.thumbnails.icon(self.icon_of(game))
+        if role == QtCore.Qt.ToolTipRole:
+            if not self.proton_registry.exists(game.proton):
+                return f"{game.path}\nProton build '{game.proton}' is not installed"
+            return game.path
+        if role == QtCore.Qt.ForegroundRole:
+            # Games whose Proton build was removed are flagged in the list
+            if not self.proton_registry.exists(game.proton):
+                return QtGui.QBrush(QtGui.QColor("#ff8080"))
+            return None
+        if role == GameIdRole:
+            return game.id
+        if role == GameRole:
+            return game
+        if role == RatingRole:
+            return self._ratings.get(game.id)
+        return None
+
+    def icon_of(self, game):
+        return game.icon or self.default_icon
+
+    def games(self):
+        return self._games
+
+    def game(self, game_id):
+        row = self._rows.get(game_id)
+        if row is None:
+            return None
+        return self._games[row]
+
+    def game_at(self, row):
+        if 0 <= row < len(self._games):
+            return self._games[row]
+        return None
+
+    def game_by_name(self, name):
+        return self.game(self._ids_by_name.get(name))
+
+    def row_of(self, game_id):
+        return self._rows.get(game_id)
+
+    def rows_of(self, game_ids):
+        # Rows of many games at once, without a method call per game
+        return list(map(self._rows.__getitem__, game_ids))
+
+    def index_of(self, game_id):
+        row = self._rows.get(game_id)
+        if row is None:
+            return QtCore.QModelIndex()
+        return self.index(row, 0)
+
+    def set_games(self, games):
+        self.beginResetModel()
+        self._games = list(games)
+        self._rows = {}
+        self._ids_by_name = {}
+        self._ids_by_icon = {}
+        for row, game in enumerate(self._games):
+            self._rows[game.id] = row
+            self.add_to_indexes(game)
+        self.endResetModel()
+
+    def add_game(self, game):
+        row = len(self._games)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._games.append(game)
+        self._rows[game.id] = row
+        self.add_to_indexes(game)
+        self.endInsertRows()
+
+    def add_games(self, games):
+        # One insert notification for a whole batch
+        games = list(games)
+        if not games:
+            return
+        first = len(self._games)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(games) - 1)
+        for row, game in enumerate(games, first):
+            self._games.append(game)
+            self._rows[game.id] = row
+            self.add_to_indexes(game)
+        self.endInsertRows()
+
+    def update_game(self, game_id, data):
+        game = self.game(game_id)
+        if game is None:
+            return None
+        self.remove_from_indexes(game)
+        game.update(data)
+        self.add_to_indexes(game)
+        index = self.index_of(game_id)
+        self.dataChanged.emit(index, index)
+        return game
+
+    def update_games(self, changes):
+        # {game id: data} applied with one change notification per run of adjacent edited rows, carrying the
+        # roles of the edited fields, so two edits far apart do not touch the rows between them
+        roles = {}
+        for game_id, data in changes.items():
+            game = self.game(game_id)
+            if game is None:
+                continue
+            self.remove_from_indexes(game)
+            game.update(data)
+            self.add_to_indexes(game)
+            row_roles = roles.setdefault(self._rows[game_id], {GameRole})
+            for key in data:
+                row_roles.update(FIELD_ROLES.get(key, ()))
+        for first, last in row_runs(roles):
+            run_roles = set().union(*(roles[row] for row in range(first, last + 1)))
+            self.dataChanged.emit(self.index(first), self.index(last), sorted(run_roles))
+
+    def remove_game(self, game_id):
+        row = self._rows.get(game_id)
+        if row is None:
+            return None
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        game = self._games.pop(row)
+        del self._rows[game_id]
+        self.remove_from_indexes(game)
+        # Only the rows after the removed one move
+        for moved_row in range(row, len(self._games)):
+            self._rows[self._games[moved_row].id] = moved_row
+        self.endRemoveRows()
+        return game
+
+    def remove_games(self, game_ids):
+        # Several rows anywhere in the list, removed as contiguous ranges from the bottom up so every
+        # notification refers to rows that have not moved yet. The row index is rebuilt once at the end.
+        ranges = row_runs({self._rows[game_id] for game_id in game_ids if game_id in self._rows})
+        if not ranges:
+            return
+        self.removal_started.emit()
+        for first, last in ranges:
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            removed = self._games[first:last + 1]
+            del self._games[first:last + 1]
+            for game in removed:
+                del self._rows[game.id]
+                self.remove_from_indexes(game)
+            self.endRemoveRows()
+        # The top range is removed last, only the rows from there on moved
+        for moved_row in range(ranges[-1][0], len(self._games)):
+            self._rows[self._games[moved_row].id] = moved_row
+        self.removal_finished.emit()
+
+    def add_to_indexes(self, game):
+        self._ids_by_name[game.name] = game.id
+        self._ids_by_icon.setdefault(self.icon_of(game), set()).add(game.id)
+
+    def remove_from_indexes(self, game):
+        if self._ids_by_name.get(game.name) == game.id:
+            del self._ids_by_name[game.name]
+        icon = self.icon_of(game)
+        ids = self._ids_by_icon.get(icon)
+        if ids is not None:
+            ids.discard(game.id)
+            if not ids:
+                del self._ids_by_icon[icon]
+
+    def refresh_proton_status(self):
+        if self._games:
+            self.dataChanged.emit(self.index(0), self.index(len(self._games) - 1), [QtCore.Qt.ForegroundRole, QtCore.Qt.ToolTipRole])
+
+    def set_ratings(self, ratings):
+        # {game id: label}, only the rows whose label changed are repainted. The rating is not part of the
+        # search fields, so the change is signalled with RatingRole alone and the search index is left as it is.
+        for game_id, label in ratings.items():
+            if self._ratings.get(game_id) == label:
+                continue
+            self._ratings[game_id] = label
+            index = self.index_of(game_id)
+            if index.isValid():
+                self.dataChanged.emit(index, index, [RatingRole])
+
+    def on_thumbnail_ready(self, icon):
+        for game_id in self._ids_by_icon.get(icon, ()):
+            index = self.index_of(game_id)
+            self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
+class _IndexSignals(QtCore.QObject):
+    # finished SearchIndex
+    built = QtCore.pyqtSignal(object)
+
+class _IndexTask(QtCore.QRunnable):
+    def __init__(self, entries, signals):
+        super().__init__()
+        self.entries = entries
+        self.signals = signals
+
+    def run(self):
+        index = SearchIndex()
+        index.rebuild(self.entries)
+        self.signals.built.emit(index)
+
+class GameFilterModel(QtCore.QAbstractProxyModel):
+    # Games matching the search box, best match first. The rows are a plain list of source rows,
+    # so a new search is one list build instead of a Python call per row or per comparison.
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.search_index = SearchIndex()
+        self.query = ""
+        # Ranked game ids of the current search, None when nothing is searched
+        self._ranked = None
+        self._rows = []
+        self._proxy_rows = {}
+        # The index is rebuilt on a worker thread when a reset changed much of the library. Changes made meanwhile
+        # are picked up when it is done, searches scan the library until then.
+        self._building = False
+        self.index_signals = _IndexSignals()
+        self.index_signals.built.connect(self.on_index_built)
+        self._saved = []
+        # Set between the removal_started and removal_finished of the source, the rows are updated once at the end
+        self._removing = False
+        self.setSourceModel(source)
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self.on_source_reset)
+        source.rowsAboutToBeInserted.connect(self.begin_change)
+        source.rowsInserted.connect(self.on_rows_inserted)
+        source.rowsAboutToBeRemoved.connect(self.on_rows_about_to_be_removed)
+        source.rowsRemoved.connect(self.on_rows_removed)
+        source.removal_started.connect(self.on_removal_started)
+        source.removal_finished.connect(self.on_removal_finished)
+        source.dataChanged.connect(self.on_data_changed)
+        self.update_rows()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def index(self, row, column=0, parent=QtCore.QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row < len(self._rows):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        # Without an index this is QObject.parent()
+        if index is None:
+            return QtCore.QObject.parent(self)
+        return QtCore.QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or proxy_index.row() >= len(self._rows):
+            return QtCore.QModelIndex()
+        return self.sourceModel().index(self._rows[proxy_index.row()], 0)
+
+    def mapFromSource(self, source_index):
+        row = self._proxy_rows.get(source_index.row()) if source_index.isValid() else None
+        if row is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(row, 0)
+
+    def game_at(self, row):
+        if 0 <= row < len(self._rows):
+            return self.sourceModel().game_at(self._rows[row])
+        return None
+
+    def set_query(self, text):
+        self.begin_change()
+        self.query = text
+        self.end_change()
+
+    def update_rows(self):
+        source = self.sourceModel()
+        self._ranked = None
+        if self.query.strip():
+            if not self._building:
+                self._ranked = self.search_index.search(self.query)
+            else:
+                # A bounded scan keeps the search box responsive until the index arrives
+                self._ranked = scan(source.games(), self.query)
+        if self._ranked is None:
+            self._rows = list(range(source.rowCount()))
+        else:
+            self._rows = source.rows_of(self._ranked)
+        self._proxy_rows = dict(zip(self._rows, range(len(self._rows))))
+
+    def begin_change(self, *args):
+        # The selection and the current game follow their source rows through a change of the filter
+        self.layoutAboutToBeChanged.emit()
+        self._saved = [(index, QtCore.QPersistentModelIndex(self.mapToSource(index))) for index in self.persistentIndexList()]
+
+    def end_change(self, *args):
+        self.update_rows()
+        old = [index for index, _ in self._saved]
+        new = [self.mapFromSource(QtCore.QModelIndex(source)) for _, source in self._saved]
+        self._saved = []
+        self.changePersistentIndexList(old, new)
+        self.layoutChanged.emit()
+
+    def build_index(self):
+        # A build already running is brought up to date when it is done
+        if self._building:
+            return
+        # A reload that changed a few games, or none, updates the current index in place
+        if self.search_index.sync(self.sourceModel().games()):
+            return
+        self._building = True
+        # The searched fields are copied here, the worker never touches the games themselves
+        entries = [SearchEntry(game) for game in self.sourceModel().games()]
+        worker_pool().start(_IndexTask(entries, self.index_signals))
+
+    def on_index_built(self, index):
+        self._building = False
+        self.search_index = index
+        # Games added, edited or removed during the build, another build if that was most of the library
+        self.build_index()
+        if self.query.strip():
+            self.begin_change()
+            self.end_change()
+
+    def index_game(self, game):
+        if not self._building:
+            self.search_index.update(game)
+
+    def unindex_game(self, game_id):
+        if not self._building:
+            self.search_index.remove(game_id)
+
+    def on_source_reset(self):
+        self.build_index()
+        self.update_rows()
+        self.endResetModel()
+
+    def on_rows_inserted(self, parent, first, last):
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            self.index_game(source.game_at(row))
+        self.end_change()
+
+    def on_rows_about_to_be_removed(self, parent, first, last):
+        if not self._removing:
+            self.begin_change()
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            self.unindex_game(source.game_at(row).id)
+
+    def on_rows_removed(self, parent, first, last):
+        if not self._removing:
+            self.end_change()
+
+    def on_removal_started(self):
+        self._removing = True
+        self.begin_change()
+
+    def on_removal_finished(self):
+        self._removing = False
+        self.end_change()
+
+    def on_data_changed(self, top_left, bottom_right, roles=()):
+        source = self.sourceModel()
+        if not roles or GameRole in roles:
+            # The game itself was edited, only its own index entries are replaced
+            for row in range(top_left.row(), bottom_right.row() + 1):
+                self.index_game(source.game_at(row))
+            if self._ranked is not None:
+                self.begin_change()
+                self.end_change()
+                return
+        rows = [self._proxy_rows[row] for row in range(top_left.row(), bottom_right.row() + 1) if row in self._proxy_rows]
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), roles)
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+
+LOG_DIR = os.path.join(app_dir, "logs")
+# One state file per running game, written by whichever launcher started it (GUI or command line)
+RUN_DIR = os.path.join(app_dir, "run")
+# Rotated log files kept per game
+LOG_BACKUPS = 5
+# A log is rotated when it grows past this size, even in the middle of a session
+MAX_LOG_BYTES = 8 * 1024 * 1024
+
+def game_log_dir(game_id):
+    return os.path.join(LOG_DIR, game_id)
+
+class RotatingLog:
+    def __init__(self, directory, name="game.log", backups=LOG_BACKUPS, max_bytes=MAX_LOG_BYTES):
+        self.directory = directory
+        self.path = os.path.join(directory, name)
+        self.backups = backups
+        self.max_bytes = max_bytes
+        self.file = None
+        self.size = 0
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # Every launch starts a new log, the previous ones are shifted to .1, .2, ...
+        self.rotate()
+
+    def rotate(self):
+        if self.file is not None:
+            self.file.close()
+        for number in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{number}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{number + 1}")
+        if os.path.exists(self.path):
+            os.replace(self.path, f"{self.path}.1")
+        self.file = open(self.path, "wb")
+        self.size = 0
+
+    def write(self, data):
+        if self.file is None:
+            return
+        if self.size + len(data) > self.max_bytes:
+            self.rotate()
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def state_path(game_id):
+    return os.path.join(RUN_DIR, f"{game_id}.json")
+
+def write_state(game_id, pid, name, source):
+    os.makedirs(RUN_DIR, exist_ok=True)
+    path = state_path(game_id)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"game_id": game_id, "pid": pid, "name": name, "source": source, "started": time.time()}, f)
+    os.replace(f"{path}.tmp", path)
+
+def clear_state(game_id):
+    try:
+        os.remove(state_path(game_id))
+    except FileNotFoundError:
+        pass
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def read_state(game_id):
+    # State of a running game, None if it is not running; files left behind by a crashed launcher are removed
+    try:
+        with open(state_path(game_id), "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not pid_alive(state.get("pid", 0)):
+        clear_state(game_id)
+        return None
+    return state
+
+def running_states():
+    try:
+        names = os.listdir(RUN_DIR)
+    except OSError:
+        return []
+    states = []
+    for name in names:
+        if name.endswith(".json"):
+            state = read_state(name[:-len(".json")])
+            if state is not None:
+                states.append(state)
+    return states
+
+def find_game_processes(waiting):
+    # One pass over /proc, waiting maps process groups to the exe name of their game;
+    # returns the process groups where the game itself is running
+    found = set()
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat", "rb") as f:
+                process_group = int(f.read().rsplit(b")", 1)[1].split()[2])
+            exe_name = waiting.get(process_group)
+            if exe_name is None or process_group in found:
+                continue
+            with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                argv0 = f.read().split(b"\0", 1)[0].replace(b"\\", b"/").lower()
+        except (OSError, ValueError, IndexError):
+            continue
+        # proton and the script only have the exe as an argument, the game itself runs as argv[0]
+        if os.path.basename(argv0) == exe_name:
+            found.add(process_group)
+            if len(found) == len(waiting):
+                break
+    return found
+
+def exe_name(game):
+    # Windows executable to look for in /proc, wine shows it as argv[0]
+    return os.path.basename(game.path).lower().encode()
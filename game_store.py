@@ -0,0 +1,188 @@
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+from games import Game
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+
+DB_PATH = os.path.join(app_dir, "games.db")
+LEGACY_PATH = os.path.join(app_dir, "games.json")
+
+# Schema changes, applied in order and tracked with PRAGMA user_version
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS games (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            data TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS games_name ON games(name)",
+    ],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS launches (
+            id INTEGER PRIMARY KEY,
+            game_id TEXT NOT NULL,
+            started REAL NOT NULL,
+            proton TEXT,
+            exit_code INTEGER,
+            phases TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS launches_game ON launches(game_id, started)",
+    ],
+    [
+        # Frame time summary of one MangoHud log, the metrics are NULL for logs that could not be used
+        """
+        CREATE TABLE IF NOT EXISTS perf_sessions (
+            id INTEGER PRIMARY KEY,
+            game_id TEXT NOT NULL,
+            log_path TEXT NOT NULL UNIQUE,
+            started REAL NOT NULL,
+            proton TEXT,
+            profile TEXT,
+            tuning TEXT,
+            frames INTEGER,
+            duration REAL,
+            avg_fps REAL,
+            low_1 REAL,
+            low_01 REAL,
+            p50 REAL,
+            p90 REAL,
+            p95 REAL,
+            p99 REAL,
+            p999 REAL,
+            stutters INTEGER
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS perf_sessions_game ON perf_sessions(game_id, started)",
+    ],
+    [
+        # Steam app id found for a normalized game name, NULL when the store has no match
+        """
+        CREATE TABLE IF NOT EXISTS protondb_apps (
+            name TEXT PRIMARY KEY,
+            appid INTEGER,
+            checked REAL NOT NULL,
+            source TEXT NOT NULL
+        )
+        """,
+        # ProtonDB summary of an app, from the API or from an offline data dump
+        """
+        CREATE TABLE IF NOT EXISTS protondb_summaries (
+            appid INTEGER PRIMARY KEY,
+            tier TEXT,
+            trending_tier TEXT,
+            best_tier TEXT,
+            confidence TEXT,
+            score REAL,
+            reports INTEGER NOT NULL,
+            checked REAL NOT NULL,
+            source TEXT NOT NULL
+        )
+        """,
+    ],
+    [
+        # Profile and tuning a game was launched with, the performance reports file its sessions under them
+        "ALTER TABLE launches ADD COLUMN profile TEXT",
+        "ALTER TABLE launches ADD COLUMN tuning TEXT",
+    ],
+    [
+        # Size and mtime of the log when it was read, a log that changed since then is read again
+        "ALTER TABLE perf_sessions ADD COLUMN log_size INTEGER",
+        "ALTER TABLE perf_sessions ADD COLUMN log_mtime INTEGER",
+    ],
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+class GameStore:
+    # SQLite backed library, every change writes only the affected rows inside a transaction
+    def __init__(self, path=DB_PATH, legacy_path=LEGACY_PATH):
+        self.path = path
+        self._depth = 0
+        # Autocommit mode, transactions are opened explicitly by transaction()
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.create_schema()
+        self.migrate_legacy(legacy_path)
+
+    def create_schema(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], version + 1):
+            with self.transaction():
+                for statement in statements:
+                    self.conn.execute(statement)
+                self.conn.execute(f"PRAGMA user_version={number}")
+
+    @contextmanager
+    def transaction(self):
+        # Nested calls join the outermost transaction so batches commit once
+        if self._depth == 0:
+            self.conn.execute("BEGIN IMMEDIATE")
+        self._depth += 1
+        try:
+            yield self.conn
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute("ROLLBACK")
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self.conn.execute("COMMIT")
+
+    def migrate_legacy(self, legacy_path):
+        # One time import of the games.json file used by older versions
+        if not legacy_path or not os.path.exists(legacy_path):
+            return
+        with open(legacy_path, "r") as f:
+            try:
+                games = [Game.from_dict(game) for game in json.load(f)]
+            except ValueError:
+                games = []
+        with self.transaction():
+            if self.conn.execute("SELECT 1 FROM games LIMIT 1").fetchone() is None:
+                self.save_games(games)
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+
+    def load_games(self):
+        rows = self.conn.execute("SELECT data FROM games ORDER BY rowid")
+        return [Game.from_dict(json.loads(data)) for data, in rows]
+
+    def get_game(self, game_id):
+        row = self.conn.execute("SELECT data FROM games WHERE id = ?", (game_id,)).fetchone()
+        return Game.from_dict(json.loads(row[0])) if row else None
+
+    def find_game(self, name):
+        row = self.conn.execute("SELECT data FROM games WHERE name = ? LIMIT 1", (name,)).fetchone()
+        return Game.from_dict(json.loads(row[0])) if row else None
+
+    def save_game(self, game):
+        # The upsert keeps the rowid of existing games, so the list order is stable
+        with self.transaction():
+            self.conn.execute(
+                "INSERT INTO games (id, name, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, data = excluded.data",
+                (game.id, game.name, json.dumps(game.to_dict())),
+            )
+
+    def save_games(self, games):
+        with self.transaction():
+            for game in games:
+                self.save_game(game)
+
+    def delete_game(self, game_id):
+        with self.transaction():
+            self.conn.execute("DELETE FROM games WHERE id = ?", (game_id,))
+
+    def delete_games(self, game_ids):
+        with self.transaction():
+            self.conn.executemany("DELETE FROM games WHERE id = ?", [(game_id,) for game_id in game_ids])
+
+    def close(self):
+        self.conn.close()
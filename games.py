@@ -0,0 +1,53 @@
+import uuid
+
+GAME_FIELDS = ("id", "name", "path", "prefix", "proton", "icon", "mangohud", "profile", "tuning", "appid")
+
+class Game:
+    # Compact record for one library entry, __slots__ keeps thousands of them cheap
+    __slots__ = GAME_FIELDS
+
+    def __init__(self, name, path, prefix, proton, icon, mangohud=False, id=None, profile=None, tuning=None, appid=None):
+        self.id = id or uuid.uuid4().hex
+        self.name = name
+        self.path = path
+        self.prefix = prefix
+        self.proton = proton
+        self.icon = icon
+        self.mangohud = mangohud
+        # Performance profile the game inherits from (None for the default one) and its own overrides
+        self.profile = profile
+        self.tuning = tuning or {}
+        # Steam app id used for ProtonDB, None to look it up by name
+        self.appid = appid
+
+    @classmethod
+    def from_dict(cls, data):
+        # Older games.json files have no id, a new one is generated for them
+        return cls(
+            name=data["name"],
+            path=data["path"],
+            prefix=data["prefix"],
+            proton=data["proton"],
+            icon=data.get("icon", ""),
+            mangohud=data.get("mangohud", False),
+            id=data.get("id"),
+            profile=data.get("profile"),
+            tuning=data.get("tuning"),
+            appid=data.get("appid"),
+        )
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in GAME_FIELDS}
+
+    def update(self, data):
+        for field, value in data.items():
+            if field in GAME_FIELDS and field != "id":
+                setattr(self, field, value)
+
+    @property
+    def safe_name(self):
+        # Name used for the game directory and the launch script
+        return self.name.replace(' ', '')
+
+    def __repr__(self):
+        return f"Game(id={self.id!r}, name={self.name!r})"
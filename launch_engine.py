@@ -0,0 +1,152 @@
+import os
+import shlex
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from prefix_pool import prefix_path, init_environment
+import tuning
+from config import config
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+
+# MangoHud writes one frame time CSV per session into the directory of the game, perf_reports reads them back
+MANGOHUD_LOG_DIR = os.path.join(app_dir, "mangohud")
+MANGOHUD_LOG_OPTIONS = "output_folder={},autostart_log=1,log_interval=0"
+
+# Bump when the wrapper template changes so every wrapper is written again
+WRAPPER_VERSION = 4
+HASH_FILE = ".wrapper-hash"
+# Threads writing the scripts of a batch of games
+WRAPPER_WORKERS = 4
+
+class LaunchStep:
+    # One process of a launch, phase is recorded when it starts and done_phase when it ends
+    __slots__ = ("phase", "argv", "environment", "done_phase")
+
+    def __init__(self, phase, argv, environment, done_phase=None):
+        self.phase = phase
+        self.argv = argv
+        self.environment = environment
+        self.done_phase = done_phase
+
+def mangohud_log_dir(game_id):
+    return os.path.join(MANGOHUD_LOG_DIR, game_id)
+
+def mangohud_logging(game):
+    return bool(game.mangohud) and config.get("mangohud_logging")
+
+def game_environment(game, settings):
+    # Variables added to the launcher environment for the game
+    environment = init_environment(prefix_path(game))
+    environment.update(tuning.environment(settings, game))
+    if game.mangohud:
+        environment["MANGOHUD"] = "1"
+    if mangohud_logging(game):
+        # Logging is added on top of the user's own MangoHud configuration
+        options = MANGOHUD_LOG_OPTIONS.format(mangohud_log_dir(game.id))
+        user_config = os.environ.get("MANGOHUD_CONFIG")
+        environment["MANGOHUD_CONFIG"] = f"{user_config},{options}" if user_config else options
+    return environment
+
+def launch_plan(game, registry):
+    # Processes to run for a launch, Proton is executed directly without a shell in between
+    proton = registry.proton_path(game.proton)
+    settings = tuning.resolve(game)
+    tuning.prepare(settings, game)
+    if mangohud_logging(game):
+        os.makedirs(mangohud_log_dir(game.id), exist_ok=True)
+    environment = game_environment(game, settings)
+    steps = []
+    if not os.path.isdir(prefix_path(game)):
+        steps.append(LaunchStep("prefix_init", [proton, "init", prefix_path(game)], environment, done_phase="prefix_ready"))
+    steps.append(LaunchStep("proton_start", tuning.command_prefix(settings) + [proton, "run", game.path], environment))
+    return steps
+
+def game_dir(game):
+    return os.path.join(app_dir, game.safe_name)
+
+def wrapper_path(game):
+    return os.path.join(game_dir(game), f"{game.safe_name}.sh")
+
+def wrapper_hash(game, settings):
+    # Hash of everything the wrapper content depends on, the profile is hashed through its resolved settings
+    inputs = (WRAPPER_VERSION, game.id, game.name, game.path, game.prefix, game.proton, bool(game.mangohud),
+              mangohud_logging(game), sorted(settings.items()))
+    return hashlib.sha1(repr(inputs).encode("utf-8")).hexdigest()
+
+def render_wrapper(game, settings):
+    # Standalone script, the launcher and the shortcuts run Proton directly
+    script = f"""#!/bin/bash
+
+# Marcas de tiempo de cada fase del lanzamiento, el launcher las lee de la salida
+phase() {{ echo "@@protonlauncher phase $1 $(date +%s.%N)"; }}
+phase script_start
+
+# Establecer las variables necesarias para Proton
+export STEAM_COMPAT_DATA_PATH="$HOME/{game.prefix}"
+export STEAM_COMPAT_CLIENT_INSTALL_PATH="$HOME/.steam/root"
+export STEAM_COMPAT_LIBRARY_PATHS="$HOME/.steam/steamapps"
+
+# Crear el prefijo si no existe
+if [ ! -d "$STEAM_COMPAT_DATA_PATH" ]; then
+    echo "Creando el prefijo de Proton..."
+    phase prefix_init
+    mkdir -p "$STEAM_COMPAT_DATA_PATH"
+
+    # Inicializar el prefijo de Proton (esto puede tardar un momento)
+    "$HOME/.steam/root/compatibilitytools.d/{game.proton}/proton" init "$STEAM_COMPAT_DATA_PATH"
+    phase prefix_ready
+fi
+
+# Ejecutar el juego con Proton-GE
+phase proton_start
+"""
+    for key, value in sorted(tuning.environment(settings, game).items()):
+        script += f"export {key}={shlex.quote(value)}\n"
+    if game.mangohud:
+        script += "export MANGOHUD=1\n"
+    if mangohud_logging(game):
+        options = shlex.quote(MANGOHUD_LOG_OPTIONS.format(mangohud_log_dir(game.id)))
+        script += f'mkdir -p {shlex.quote(mangohud_log_dir(game.id))}\n'
+        script += f'export MANGOHUD_CONFIG="${{MANGOHUD_CONFIG:+$MANGOHUD_CONFIG,}}"{options}\n'
+    prefix = "".join(f"{shlex.quote(part)} " for part in tuning.command_prefix(settings))
+    script += f"""exec {prefix}"$HOME/.steam/root/compatibilitytools.d/{game.proton}/proton" run "{game.path}"
+"""
+    return script
+
+def ensure_wrapper(game, force=False, all_profiles=None):
+    # Writes the wrapper only if its inputs changed, returns True if it was written
+    directory = game_dir(game)
+    hash_path = os.path.join(directory, HASH_FILE)
+    settings = tuning.resolve(game, all_profiles)
+    digest = wrapper_hash(game, settings)
+    if not force and os.path.exists(wrapper_path(game)):
+        try:
+            with open(hash_path, "r") as f:
+                if f.read().strip() == digest:
+                    return False
+        except OSError:
+            pass
+
+    os.makedirs(directory, exist_ok=True)
+    script_path = wrapper_path(game)
+    tmp_path = f"{script_path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_wrapper(game, settings))
+    os.chmod(tmp_path, 0o755)  # Make the script executable
+    os.replace(tmp_path, script_path)
+    with open(hash_path, "w") as f:
+        f.write(digest)
+    return True
+
+def rebuild_wrappers(games, force=False, workers=1):
+    # Batch pass over the library, e.g. after a Proton build was swapped or a profile edited, returns the number written.
+    # Games sharing a script directory are written by the same worker.
+    all_profiles = tuning.profiles()
+    groups = {}
+    for game in games:
+        groups.setdefault(game_dir(game), []).append(game)
+    write = lambda group: sum(1 for game in group if ensure_wrapper(game, force, all_profiles))
+    if workers <= 1 or len(groups) <= 1:
+        return sum(map(write, groups.values()))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(write, groups.values()))
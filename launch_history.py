@@ -0,0 +1,134 @@
+import csv
+import json
+import math
+import time
+import statistics
+
+# Launch phases in the order they happen, stored as seconds since the launch started
+PHASES = ("script_start", "prefix_init", "prefix_ready", "proton_start", "first_process", "exit")
+# Marker printed by the launch script: "@@protonlauncher phase <name> <unix time>"
+PHASE_MARKER = b"@@protonlauncher phase "
+
+class LaunchRecord:
+    __slots__ = ("game_id", "started", "proton", "exit_code", "phases", "profile", "tuning")
+
+    def __init__(self, game_id, started, proton=None, exit_code=None, phases=None, profile=None, tuning=None):
+        self.game_id = game_id
+        # Wall clock time of the launch
+        self.started = started
+        self.proton = proton
+        self.exit_code = exit_code
+        self.phases = phases or {}
+        # Performance profile and description of the tuning settings of the launch, None for older launches
+        self.profile = profile
+        self.tuning = tuning
+
+    def mark(self, phase, timestamp=None):
+        # Only the first occurrence of a phase is kept
+        if phase not in self.phases:
+            timestamp = time.time() if timestamp is None else timestamp
+            self.phases[phase] = round(max(0.0, timestamp - self.started), 3)
+
+    @property
+    def time_to_start(self):
+        # From the start of the launch until the game process shows up
+        return self.phases.get("first_process")
+
+    @property
+    def prefix_init_time(self):
+        if "prefix_init" in self.phases and "prefix_ready" in self.phases:
+            return self.phases["prefix_ready"] - self.phases["prefix_init"]
+        return None
+
+def parse_marker(line):
+    # Returns (phase, unix time) for a marker line of the launch script, None for other output
+    if not line.startswith(PHASE_MARKER):
+        return None
+    parts = line[len(PHASE_MARKER):].split()
+    if len(parts) != 2:
+        return None
+    try:
+        return parts[0].decode("ascii"), float(parts[1])
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+def percentile(values, fraction):
+    # Nearest rank percentile
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+class LaunchHistory:
+    # Per game launch timings, kept in the launches table of the game store
+    def __init__(self, store):
+        self.store = store
+        self._stats = {}
+
+    def record(self, record):
+        with self.store.transaction() as conn:
+            conn.execute(
+                "INSERT INTO launches (game_id, started, proton, exit_code, phases, profile, tuning) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (record.game_id, record.started, record.proton, record.exit_code, json.dumps(record.phases),
+                 record.profile, record.tuning),
+            )
+        self._stats.pop(record.game_id, None)
+
+    def history(self, game_id=None, limit=None):
+        query = "SELECT game_id, started, proton, exit_code, phases, profile, tuning FROM launches"
+        parameters = []
+        if game_id is not None:
+            query += " WHERE game_id = ?"
+            parameters.append(game_id)
+        query += " ORDER BY started DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        return [
+            LaunchRecord(row_game_id, started, proton, exit_code, json.loads(phases), profile, tuning)
+            for row_game_id, started, proton, exit_code, phases, profile, tuning in self.store.conn.execute(query, parameters)
+        ]
+
+    def stats(self, game_id):
+        # (launch count, median time to start, p95 time to start), cached until the next launch is recorded
+        if game_id not in self._stats:
+            records = self.history(game_id)
+            times = [record.time_to_start for record in records if record.time_to_start is not None]
+            if times:
+                self._stats[game_id] = (len(records), statistics.median(times), percentile(times, 0.95))
+            else:
+                self._stats[game_id] = (len(records), None, None)
+        return self._stats[game_id]
+
+    def forget(self, game_id):
+        with self.store.transaction() as conn:
+            conn.execute("DELETE FROM launches WHERE game_id = ?", (game_id,))
+        self._stats.pop(game_id, None)
+
+    def rows(self, names):
+        # Flat rows for the reports, names maps game ids to game names
+        for record in self.history():
+            row = {
+                "game_id": record.game_id,
+                "game": names.get(record.game_id, ""),
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.started)),
+                "proton": record.proton or "",
+                "exit_code": record.exit_code,
+            }
+            for phase in PHASES:
+                row[phase] = record.phases.get(phase)
+            yield row
+
+    def export(self, path, names):
+        # The format is picked from the extension, .csv or .json
+        rows = list(self.rows(names))
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["game_id", "game", "started", "proton", "exit_code"] + list(PHASES))
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                json.dump(rows, f, indent=2)
+        return len(rows)
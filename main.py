@@ -1,44 +1,225 @@
 import sys
+
+# Command line use (launch, list, status, dedup) is handled before anything else is loaded, it never imports Qt
+if __name__ == "__main__" and len(sys.argv) > 1:
+    import cli
+    if sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.main(sys.argv[1:]))
+
 import os
-import json
-import webbrowser
-from PyQt5 import QtWidgets, QtCore, QtGui
-from tkinter import messagebox
-import requests
-from launcher import create_game_script, create_shortcut
+import time
+import shutil
+from startup_profile import profiler
 
-# Create the ~/.protonlauncher directory if it doesn't exist
-if not os.path.exists(os.path.expanduser("~/.protonlauncher")):
-    os.makedirs(os.path.expanduser("~/.protonlauncher"))
-    # Download the default icon to the ~/.protonlauncher directory
-    try:
-        icon_url = "https://raw.githubusercontent.com/CesarGarza55/ProtonLauncher/refs/heads/main/icons/icon.png"
-        icon_path = os.path.expanduser("~/.protonlauncher/icon.png")
-        response = requests.get(icon_url)
-        with open(icon_path, 'wb') as f:
-            f.write(response.content)
-    except:
-        # If the icon can't be downloaded, use the default icon from the folder
-        icon_path = os.path.join(os.path.dirname(__file__), "icons/icon.png")
+with profiler.phase("imports"):
+    from PyQt5 import QtWidgets, QtCore, QtGui
+    from launcher import desktop_directory, get_desktop_directory
+    from launch_engine import ensure_wrapper, rebuild_wrappers, launch_plan, mangohud_logging, game_dir, WRAPPER_WORKERS
+    from thumbnails import ThumbnailCache
+    from games import Game
+    from game_model import GameListModel, GameFilterModel, worker_pool
+    from game_store import GameStore
+    from supervisor import GameSupervisor
+    from game_runtime import game_log_dir, read_state
+    from launch_history import LaunchHistory
+    from proton_registry import ProtonRegistry, COMPAT_DIR
+    from proton_watcher import ProtonWatcher
+    from prefix_warmer import PrefixWarmer
+    from storage_manager import StorageManager
+    from config import config, load_desktop
+    import bulk_import
+    import protondb
+    import storage
+    import tuning
 
 app_dir = os.path.expanduser("~/.protonlauncher")
 icon_path = os.path.join(app_dir, "icon.png")
 
+# Create the ~/.protonlauncher directory if it doesn't exist
+os.makedirs(app_dir, exist_ok=True)
+# Copy the default icon shipped with the application, no network access at startup
+if not os.path.exists(icon_path):
+    bundled_icon = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons", "icon.png")
+    if os.path.exists(bundled_icon):
+        shutil.copyfile(bundled_icon, icon_path)
+
+# Time given to each running game to exit when the launcher is closed
+STOP_WAIT_MS = 3000
+# Stale ProtonDB ratings are looked up this long after startup, away from the cold start
+PROTONDB_FIRST_CHECK_MS = 10 * 1000
+
+class TuningForm(QtWidgets.QWidget):
+    # Editor for the tuning settings of a profile or a game, "Inherit" leaves the setting to the parent profile
+    def __init__(self, values, parent=None):
+        super().__init__(parent)
+        layout = QtWidgets.QFormLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.editors = {}
+        for key, (kind, _, label) in tuning.SETTINGS.items():
+            if kind is bool:
+                editor = QtWidgets.QComboBox()
+                editor.addItem("Inherit", None)
+                editor.addItem("On", True)
+                editor.addItem("Off", False)
+            elif key == "sync":
+                editor = QtWidgets.QComboBox()
+                editor.addItem("Inherit", None)
+                for mode in tuning.SYNC_MODES:
+                    editor.addItem(mode, mode)
+            elif key == "io_priority":
+                editor = QtWidgets.QComboBox()
+                editor.addItem("Inherit", None)
+                editor.addItem("normal", "")
+                for priority in tuning.IO_PRIORITIES[1:]:
+                    editor.addItem(priority, priority)
+            elif key == "nice":
+                # The lowest value stands for "Inherit"
+                editor = QtWidgets.QSpinBox()
+                editor.setRange(-1, 19)
+                editor.setSpecialValueText("Inherit")
+            else:
+                editor = QtWidgets.QLineEdit()
+                editor.setPlaceholderText("Inherit (e.g. 0-7 or 0,2,4,6)")
+            self.editors[key] = editor
+            layout.addRow(f"{label}:", editor)
+        self.set_values(values)
+
+    def set_values(self, values):
+        values = tuning.clean(values)
+        for key, editor in self.editors.items():
+            value = values.get(key)
+            if isinstance(editor, QtWidgets.QComboBox):
+                position = editor.findData(value) if key in values else 0
+                editor.setCurrentIndex(max(position, 0))
+            elif isinstance(editor, QtWidgets.QSpinBox):
+                editor.setValue(value if key in values else -1)
+            else:
+                editor.setText(value or "")
+
+    def values(self):
+        # Only the settings that are not inherited
+        values = {}
+        for key, editor in self.editors.items():
+            if isinstance(editor, QtWidgets.QComboBox):
+                if editor.currentIndex() > 0:
+                    values[key] = editor.currentData()
+            elif isinstance(editor, QtWidgets.QSpinBox):
+                if editor.value() >= 0:
+                    values[key] = editor.value()
+            elif editor.text().strip():
+                values[key] = editor.text().strip()
+        return values
+
+class ProfilesDialog(QtWidgets.QDialog):
+    # Named performance profiles, every game using a profile (or a profile inheriting from it) follows its changes
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance Profiles")
+        self.setGeometry(100, 100, 700, 500)
+        self.profiles = tuning.profiles()
+        self.current = None
+
+        layout = QtWidgets.QHBoxLayout(self)
+        left = QtWidgets.QVBoxLayout()
+        self.profile_list = QtWidgets.QListWidget()
+        self.profile_list.addItems(list(self.profiles))
+        self.profile_list.currentTextChanged.connect(self.show_profile)
+        left.addWidget(self.profile_list)
+        buttons = QtWidgets.QHBoxLayout()
+        self.add_button = QtWidgets.QPushButton("Add")
+        self.add_button.clicked.connect(self.add_profile)
+        buttons.addWidget(self.add_button)
+        self.remove_button = QtWidgets.QPushButton("Remove")
+        self.remove_button.clicked.connect(self.remove_profile)
+        buttons.addWidget(self.remove_button)
+        left.addLayout(buttons)
+        layout.addLayout(left, 1)
+
+        right = QtWidgets.QVBoxLayout()
+        inherits_layout = QtWidgets.QFormLayout()
+        self.inherits_edit = QtWidgets.QComboBox()
+        inherits_layout.addRow("Inherits from:", self.inherits_edit)
+        right.addLayout(inherits_layout)
+        self.form = TuningForm({})
+        right.addWidget(self.form)
+        right.addStretch(1)
+        self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        right.addWidget(self.button_box)
+        layout.addLayout(right, 2)
+
+        self.profile_list.setCurrentRow(0)
+
+    def store_current(self):
+        if self.current is None or self.current not in self.profiles:
+            return
+        profile = self.form.values()
+        inherits = self.inherits_edit.currentText()
+        if self.current != tuning.DEFAULT_PROFILE and inherits != tuning.DEFAULT_PROFILE:
+            profile["inherits"] = inherits
+        self.profiles[self.current] = profile
+
+    def show_profile(self, name):
+        self.store_current()
+        self.current = name or None
+        if self.current is None:
+            return
+        profile = self.profiles[name]
+        # A profile can not inherit from itself, the default profile inherits from nothing
+        self.inherits_edit.clear()
+        if name != tuning.DEFAULT_PROFILE:
+            self.inherits_edit.addItems([other for other in self.profiles if other != name])
+            self.inherits_edit.setCurrentText(profile.get("inherits") or tuning.DEFAULT_PROFILE)
+        self.inherits_edit.setEnabled(name != tuning.DEFAULT_PROFILE)
+        self.remove_button.setEnabled(name != tuning.DEFAULT_PROFILE)
+        self.form.set_values(profile)
+
+    def add_profile(self):
+        name, ok = QtWidgets.QInputDialog.getText(self, "Add Profile", "Profile name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name in self.profiles:
+            QtWidgets.QMessageBox.warning(self, "Add Profile", "A profile with this name already exists.")
+            return
+        self.store_current()
+        self.profiles[name] = {}
+        self.current = None
+        self.profile_list.addItem(name)
+        self.profile_list.setCurrentRow(self.profile_list.count() - 1)
+
+    def remove_profile(self):
+        # Games and profiles using it fall back to the default profile
+        if self.current in (None, tuning.DEFAULT_PROFILE):
+            return
+        del self.profiles[self.current]
+        self.current = None
+        self.profile_list.takeItem(self.profile_list.currentRow())
+
+    def accept(self):
+        self.store_current()
+        tuning.save_profiles(self.profiles)
+        super().accept()
+
 class EditGameDialog(QtWidgets.QDialog):
     def __init__(self, game_data, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Edit Game")
-        self.setGeometry(100, 100, 500, 200)
+        self.setGeometry(100, 100, 500, 560)
         self.game_data = game_data
 
         layout = QtWidgets.QFormLayout(self)
 
-        self.name_edit = QtWidgets.QLineEdit(self.game_data["name"])
-        self.path_edit = QtWidgets.QLineEdit(self.game_data["path"])
-        self.icon_edit = QtWidgets.QLineEdit(self.game_data["icon"])
+        self.name_edit = QtWidgets.QLineEdit(self.game_data.name)
+        self.path_edit = QtWidgets.QLineEdit(self.game_data.path)
+        self.icon_edit = QtWidgets.QLineEdit(self.game_data.icon)
         self.proton_edit = QtWidgets.QComboBox()
         self.proton_edit.addItems(parent.get_installed_proton_versions())
-        self.proton_edit.setCurrentText(self.game_data["proton"])
+        # Keep the configured build selectable even if it was uninstalled
+        if not parent.proton_registry.exists(self.game_data.proton):
+            self.proton_edit.insertItem(0, self.game_data.proton)
+        self.proton_edit.setCurrentText(self.game_data.proton)
 
         layout.addRow("Name:", self.name_edit)
 
@@ -60,9 +241,15 @@ class EditGameDialog(QtWidgets.QDialog):
 
         layout.addRow("Proton Version:", self.proton_edit)
 
+        # Steam app id for ProtonDB, found from the name when left empty
+        self.appid_edit = QtWidgets.QLineEdit(str(self.game_data.appid or ""))
+        self.appid_edit.setValidator(QtGui.QIntValidator(1, 2 ** 31 - 1, self.appid_edit))
+        self.appid_edit.setPlaceholderText("Look up by name")
+        layout.addRow("Steam App ID:", self.appid_edit)
+
         # MangoHud checkbox
         self.mangohud_checkbox = QtWidgets.QCheckBox("Enable MangoHud")
-        self.mangohud_checkbox.setChecked(self.game_data.get("mangohud", False))
+        self.mangohud_checkbox.setChecked(self.game_data.mangohud)
         self.mangohud_checkbox.setStyleSheet("""
             QCheckBox {
                 color: white;
@@ -81,6 +268,17 @@ class EditGameDialog(QtWidgets.QDialog):
         """)
         layout.addRow(self.mangohud_checkbox)
 
+        # Performance profile and the settings this game changes on top of it
+        self.profile_edit = QtWidgets.QComboBox()
+        self.profile_edit.addItems(list(tuning.profiles()))
+        self.profile_edit.setCurrentText(self.game_data.profile or tuning.DEFAULT_PROFILE)
+        layout.addRow("Performance Profile:", self.profile_edit)
+        tuning_box = QtWidgets.QGroupBox("Game Overrides")
+        tuning_layout = QtWidgets.QVBoxLayout(tuning_box)
+        self.tuning_form = TuningForm(self.game_data.tuning)
+        tuning_layout.addWidget(self.tuning_form)
+        layout.addRow(tuning_box)
+
         self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
         self.button_box.accepted.connect(self.accept)
         self.button_box.rejected.connect(self.reject)
@@ -102,14 +300,502 @@ class EditGameDialog(QtWidgets.QDialog):
             "path": self.path_edit.text(),
             "icon": self.icon_edit.text(),
             "proton": self.proton_edit.currentText(),
-            "mangohud": self.mangohud_checkbox.isChecked()
+            "mangohud": self.mangohud_checkbox.isChecked(),
+            "profile": None if self.profile_edit.currentText() == tuning.DEFAULT_PROFILE else self.profile_edit.currentText(),
+            "tuning": self.tuning_form.values(),
+            "appid": int(self.appid_edit.text()) if self.appid_edit.text() else None,
         }
     
+class ScanSignals(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int, int)
+    finished = QtCore.pyqtSignal(object)
+
+class ScanTask(QtCore.QRunnable):
+    def __init__(self, directories, known_paths, signals):
+        super().__init__()
+        self.directories = directories
+        self.known_paths = known_paths
+        self.signals = signals
+
+    def run(self):
+        # finished is always emitted, the dialog re-enables its buttons on it
+        results = []
+        try:
+            results = bulk_import.scan(self.directories, self.known_paths, progress=self.signals.progress.emit)
+        finally:
+            self.signals.finished.emit(results)
+
+class BulkImportDialog(QtWidgets.QDialog):
+    def __init__(self, known_paths, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Import Games")
+        self.setGeometry(100, 100, 900, 600)
+        self.known_paths = known_paths
+        self.results = []
+
+        layout = QtWidgets.QVBoxLayout(self)
+
+        # Directories to scan
+        layout.addWidget(QtWidgets.QLabel("Directories to scan:"))
+        self.directory_list = QtWidgets.QListWidget()
+        self.directory_list.setMaximumHeight(100)
+        layout.addWidget(self.directory_list)
+
+        directory_buttons = QtWidgets.QHBoxLayout()
+        self.add_directory_button = QtWidgets.QPushButton("Add Directory")
+        self.add_directory_button.clicked.connect(self.add_directory)
+        directory_buttons.addWidget(self.add_directory_button)
+        self.remove_directory_button = QtWidgets.QPushButton("Remove Directory")
+        self.remove_directory_button.clicked.connect(self.remove_directory)
+        directory_buttons.addWidget(self.remove_directory_button)
+        self.scan_button = QtWidgets.QPushButton("Scan")
+        self.scan_button.clicked.connect(self.scan)
+        directory_buttons.addWidget(self.scan_button)
+        layout.addLayout(directory_buttons)
+
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setVisible(False)
+        layout.addWidget(self.progress)
+
+        # Review table, the checkbox on the name decides if the game is imported
+        self.table = QtWidgets.QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Name", "Executable", "Icon"])
+        self.table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        self.table.verticalHeader().setDefaultSectionSize(40)
+        self.table.setIconSize(QtCore.QSize(32, 32))
+        layout.addWidget(self.table)
+
+        self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        self.button_box.button(QtWidgets.QDialogButtonBox.Ok).setText("Import")
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+
+        self.signals = ScanSignals()
+        self.signals.progress.connect(self.on_scan_progress)
+        self.signals.finished.connect(self.on_scan_finished)
+
+    def add_directory(self):
+        directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Games Directory")
+        if directory and not self.directory_list.findItems(directory, QtCore.Qt.MatchExactly):
+            self.directory_list.addItem(directory)
+
+    def remove_directory(self):
+        for item in self.directory_list.selectedItems():
+            self.directory_list.takeItem(self.directory_list.row(item))
+
+    def scan(self):
+        directories = [self.directory_list.item(row).text() for row in range(self.directory_list.count())]
+        if not directories:
+            QtWidgets.QMessageBox.information(self, "Import Games", "Add at least one directory to scan.")
+            return
+        self.scan_button.setEnabled(False)
+        self.progress.setVisible(True)
+        self.progress.setValue(0)
+        worker_pool().start(ScanTask(directories, self.known_paths, self.signals))
+
+    def on_scan_progress(self, done, total):
+        self.progress.setMaximum(total)
+        self.progress.setValue(done)
+
+    def on_scan_finished(self, results):
+        self.scan_button.setEnabled(True)
+        self.progress.setVisible(False)
+        self.results = results
+        self.table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            name_item = QtWidgets.QTableWidgetItem(result.name)
+            name_item.setFlags(name_item.flags() | QtCore.Qt.ItemIsUserCheckable)
+            name_item.setCheckState(QtCore.Qt.Checked)
+            self.table.setItem(row, 0, name_item)
+
+            # The best ranked executable is selected, the other candidates stay available
+            executable = QtWidgets.QComboBox()
+            for candidate in result.candidates:
+                executable.addItem(os.path.relpath(candidate.path, result.directory), candidate.path)
+            self.table.setCellWidget(row, 1, executable)
+
+            icon_item = QtWidgets.QTableWidgetItem()
+            icon_item.setFlags(QtCore.Qt.ItemIsEnabled)
+            if result.icon:
+                icon_item.setIcon(QtGui.QIcon(result.icon))
+            self.table.setItem(row, 2, icon_item)
+        self.table.resizeColumnToContents(0)
+
+    def selected_entries(self):
+        entries = []
+        for row, result in enumerate(self.results):
+            name_item = self.table.item(row, 0)
+            if name_item.checkState() != QtCore.Qt.Checked or not name_item.text().strip():
+                continue
+            path = self.table.cellWidget(row, 1).currentData()
+            # The extracted icon belongs to the best candidate only
+            icon = result.icon if path == result.best.path else None
+            entries.append((name_item.text().strip(), path, icon))
+        return entries
+
+class IngestSignals(QtCore.QObject):
+    # game id, number of new sessions, error message (empty on success)
+    finished = QtCore.pyqtSignal(str, int, str)
+
+class IngestTask(QtCore.QRunnable):
+    # Reads the MangoHud logs of a game on a worker thread, with its own connection to the game store
+    def __init__(self, game, profile, tuning_description, signals):
+        super().__init__()
+        self.game = game
+        self.profile = profile
+        self.tuning_description = tuning_description
+        self.signals = signals
+
+    def run(self):
+        added = 0
+        error = ""
+        try:
+            import perf_reports
+            store = GameStore()
+            try:
+                added = perf_reports.PerfSessions(store).ingest(self.game, self.profile, self.tuning_description)
+            finally:
+                store.close()
+        except Exception as exception:
+            error = str(exception) or type(exception).__name__
+        finally:
+            # The window reads the logs of this game again only once this arrives
+            self.signals.finished.emit(self.game.id, added, error)
+
+class ProtonDBSignals(QtCore.QObject):
+    # {game id: summary} of the cached data, number of failed lookups
+    finished = QtCore.pyqtSignal(object, int)
+    failed = QtCore.pyqtSignal(str)
+
+class ProtonDBTask(QtCore.QRunnable):
+    # Looks up ProtonDB ratings, imports a data dump or only reads the cache, on a worker thread with its own
+    # connection to the game store
+    def __init__(self, games, signals, force=False, dump_path=None, lookups=True):
+        super().__init__()
+        self.games = games
+        self.signals = signals
+        self.force = force
+        self.dump_path = dump_path
+        self.lookups = lookups
+
+    def run(self):
+        summaries = None
+        failed = 0
+        error = "the lookup stopped unexpectedly"
+        try:
+            store = GameStore()
+            try:
+                if self.dump_path:
+                    protondb.ingest_dump(store, self.dump_path)
+                elif self.lookups:
+                    client = protondb.ProtonDBClient(store)
+                    try:
+                        _, failed = client.refresh(self.games, self.force)
+                    finally:
+                        client.close()
+                summaries = protondb.ProtonDBCache(store).summaries(self.games)
+            finally:
+                store.close()
+        except Exception as exception:
+            error = str(exception) or type(exception).__name__
+        finally:
+            # The window starts no other batch until one of the two arrives
+            if summaries is not None:
+                self.signals.finished.emit(summaries, failed)
+            else:
+                self.signals.failed.emit(error)
+
+class WrapperSignals(QtCore.QObject):
+    # scripts written, error message (empty on success), title of the report to show (empty for none)
+    finished = QtCore.pyqtSignal(int, str, str)
+
+class WrapperTask(QtCore.QRunnable):
+    # Writes the launch scripts of a batch of games on a worker thread
+    def __init__(self, games, force, report, signals):
+        super().__init__()
+        self.games = games
+        self.force = force
+        self.report = report
+        self.signals = signals
+
+    def run(self):
+        try:
+            written = rebuild_wrappers(self.games, self.force, WRAPPER_WORKERS)
+        except OSError as error:
+            self.signals.finished.emit(0, str(error), self.report)
+            return
+        self.signals.finished.emit(written, "", self.report)
+
+class ShortcutSignals(QtCore.QObject):
+    # SyncResult, whether the user asked for the sync
+    finished = QtCore.pyqtSignal(object, bool)
+
+class ShortcutTask(QtCore.QRunnable):
+    # Writes the desktop entries and renders their icons on a worker thread
+    def __init__(self, games, desktop_dir, targets, report, signals):
+        super().__init__()
+        self.games = games
+        self.desktop_dir = desktop_dir
+        self.targets = targets
+        self.report = report
+        self.signals = signals
+
+    def run(self):
+        import shortcuts
+        result = shortcuts.SyncResult()
+        try:
+            result = shortcuts.sync_shortcuts(self.games, self.desktop_dir, self.targets)
+        except Exception as exception:
+            result.failed.append(str(exception) or type(exception).__name__)
+        finally:
+            # The window starts no other sync until this arrives
+            self.signals.finished.emit(result, self.report)
+
+class PerfReportDialog(QtWidgets.QDialog):
+    # MangoHud sessions of one game, compared across Proton builds and performance profiles
+    def __init__(self, game_data, perf_sessions, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Performance Report - {game_data.name}")
+        self.setGeometry(100, 100, 1000, 600)
+        self.game_data = game_data
+        self.perf_sessions = perf_sessions
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(QtWidgets.QLabel("By Proton build and profile:"))
+        self.summary_table = QtWidgets.QTableWidget(0, 9)
+        self.summary_table.setHorizontalHeaderLabels(["Proton", "Profile", "Sessions", "Hours", "Avg FPS", "1% Low", "0.1% Low", "p99 Frame Time (ms)", "Stutters/h"])
+        layout.addWidget(self.summary_table)
+        layout.addWidget(QtWidgets.QLabel("Sessions:"))
+        self.sessions_table = QtWidgets.QTableWidget(0, 10)
+        self.sessions_table.setHorizontalHeaderLabels(["Started", "Proton", "Profile", "Duration", "Avg FPS", "1% Low", "0.1% Low", "p50 (ms)", "p99 (ms)", "Stutters"])
+        layout.addWidget(self.sessions_table, 1)
+        self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+        self.reload()
+
+    def fill(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                item.setFlags(QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable)
+                table.setItem(row, column, item)
+        table.resizeColumnsToContents()
+
+    def reload(self):
+        self.fill(self.summary_table, [
+            (row["proton"], row["profile"], str(row["sessions"]), f"{row['hours']:.1f}", f"{row['avg_fps']:.1f}", f"{row['low_1']:.1f}",
+             f"{row['low_01']:.1f}", f"{row['p99']:.1f}", f"{row['stutters_per_hour']:.0f}")
+            for row in self.perf_sessions.report(self.game_data.id)
+        ])
+        self.fill(self.sessions_table, [
+            (time.strftime("%Y-%m-%d %H:%M", time.localtime(session["started"])), session["proton"] or "", session["profile"] or "",
+             time.strftime("%H:%M:%S", time.gmtime(session["duration"])), f"{session['avg_fps']:.1f}", f"{session['low_1']:.1f}",
+             f"{session['low_01']:.1f}", f"{session['p50']:.2f}", f"{session['p99']:.2f}", str(session["stutters"]))
+            for session in self.perf_sessions.sessions(self.game_data.id)
+        ])
+
+class StorageDialog(QtWidgets.QDialog):
+    # Disk usage of every game and the data left behind by games that are no longer in the library
+    def __init__(self, manager, games, is_running, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Storage")
+        self.setGeometry(100, 100, 1000, 650)
+        self.manager = manager
+        self.games = games
+        self.is_running = is_running
+        self.orphans = []
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(QtWidgets.QLabel("Games:"))
+        self.games_table = QtWidgets.QTableWidget(0, 6)
+        self.games_table.setHorizontalHeaderLabels(["Game", "Prefix", "Shader cache", "Logs", "MangoHud logs", "Total"])
+        self.games_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.games_table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        layout.addWidget(self.games_table, 2)
+
+        game_buttons = QtWidgets.QHBoxLayout()
+        self.rescan_button = QtWidgets.QPushButton("Rescan")
+        self.rescan_button.setToolTip("Measure the data of every game again")
+        self.rescan_button.clicked.connect(lambda: self.scan())
+        game_buttons.addWidget(self.rescan_button)
+        self.delete_data_button = QtWidgets.QPushButton("Delete Prefix and Caches")
+        self.delete_data_button.setToolTip("The selected games keep their entry, a new prefix is created on their next launch")
+        self.delete_data_button.clicked.connect(self.delete_game_data)
+        game_buttons.addWidget(self.delete_data_button)
+        game_buttons.addStretch(1)
+        layout.addLayout(game_buttons)
+
+        layout.addWidget(QtWidgets.QLabel("Not used by any game:"))
+        self.orphans_table = QtWidgets.QTableWidget(0, 3)
+        self.orphans_table.setHorizontalHeaderLabels(["Kind", "Path", "Size"])
+        self.orphans_table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        layout.addWidget(self.orphans_table, 1)
+
+        orphan_buttons = QtWidgets.QHBoxLayout()
+        self.delete_orphans_button = QtWidgets.QPushButton("Delete Checked")
+        self.delete_orphans_button.clicked.connect(self.delete_orphans)
+        orphan_buttons.addWidget(self.delete_orphans_button)
+        orphan_buttons.addStretch(1)
+        layout.addLayout(orphan_buttons)
+
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setVisible(False)
+        layout.addWidget(self.progress)
+
+        self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+
+        self.manager.scan_progress.connect(self.on_scan_progress)
+        self.manager.scanned.connect(self.reload)
+        self.manager.removed.connect(self.on_removed)
+        self.scan()
+
+    def scan(self):
+        self.orphans = [(category, path) for category, path in storage.orphans(self.games) if path not in self.manager.removing]
+        self.manager.scan_games(self.games)
+        self.manager.scan([path for _, path in self.orphans])
+        self.reload()
+
+    def on_scan_progress(self, done, total):
+        self.progress.setVisible(done < total)
+        self.progress.setMaximum(total)
+        self.progress.setValue(done)
+
+    def size_text(self, usage):
+        if usage is None:
+            return "..."
+        if usage.shared:
+            return f"{storage.format_size(usage.size)} ({storage.format_size(usage.shared)} shared)"
+        return storage.format_size(usage.size)
+
+    def reload(self):
+        rows = []
+        for game in self.games:
+            usage = self.manager.game_usage(game)
+            total = None if usage is None else sum(usage.values(), storage.DiskUsage())
+            rows.append((game, usage, total))
+        # Biggest first, the games that were not measured yet at the end
+        rows.sort(key=lambda row: (row[2] is None, -(row[2].size if row[2] else 0), row[0].name.lower()))
+
+        self.games_table.setRowCount(len(rows))
+        for row, (game, usage, total) in enumerate(rows):
+            values = [game.name] + [self.size_text(usage and usage[category]) for category in ("prefix", "shader_cache", "logs", "mangohud")]
+            values.append(self.size_text(total))
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                item.setFlags(QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable)
+                item.setData(QtCore.Qt.UserRole, game.id)
+                self.games_table.setItem(row, column, item)
+
+        checked = {self.orphans_table.item(row, 1).text() for row in range(self.orphans_table.rowCount())
+                   if self.orphans_table.item(row, 0).checkState() == QtCore.Qt.Checked}
+        self.orphans_table.setRowCount(len(self.orphans))
+        for row, (category, path) in enumerate(self.orphans):
+            kind_item = QtWidgets.QTableWidgetItem(storage.CATEGORIES[category])
+            kind_item.setFlags(QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsUserCheckable)
+            kind_item.setCheckState(QtCore.Qt.Checked if path in checked else QtCore.Qt.Unchecked)
+            self.orphans_table.setItem(row, 0, kind_item)
+            for column, value in ((1, path), (2, self.size_text(self.manager.usage.get(path)))):
+                item = QtWidgets.QTableWidgetItem(value)
+                item.setFlags(QtCore.Qt.ItemIsEnabled)
+                self.orphans_table.setItem(row, column, item)
+        self.games_table.resizeColumnsToContents()
+        self.orphans_table.resizeColumnToContents(0)
+
+    def delete_game_data(self):
+        game_ids = {self.games_table.item(index.row(), 0).data(QtCore.Qt.UserRole) for index in self.games_table.selectionModel().selectedRows()}
+        games = [game for game in self.games if game.id in game_ids]
+        if not games:
+            QtWidgets.QMessageBox.information(self, "Storage", "Select the games whose prefix and caches should be deleted.")
+            return
+        running = [game.name for game in games if self.is_running(game)]
+        if running:
+            QtWidgets.QMessageBox.warning(self, "Storage", f"Close these games first: {', '.join(running)}")
+            return
+        names = ", ".join(game.name for game in games[:10])
+        if QtWidgets.QMessageBox.question(self, "Delete Prefix and Caches", f"Delete the prefix, shader cache and logs of {names}? Saved games stored in the prefix are lost.",
+                                          QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No) != QtWidgets.QMessageBox.Yes:
+            return
+        self.manager.remove([path for game in games for category, path in storage.game_paths(game).items() if category != "wrapper"])
+        self.reload()
+
+    def delete_orphans(self):
+        paths = [self.orphans_table.item(row, 1).text() for row in range(self.orphans_table.rowCount())
+                 if self.orphans_table.item(row, 0).checkState() == QtCore.Qt.Checked]
+        if not paths:
+            return
+        if QtWidgets.QMessageBox.question(self, "Delete", f"Delete {len(paths)} directories that no game uses?",
+                                          QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No) != QtWidgets.QMessageBox.Yes:
+            return
+        self.manager.remove(paths)
+        self.orphans = [(category, path) for category, path in self.orphans if path not in paths]
+        self.reload()
+
+    def on_removed(self, paths, failed):
+        self.scan()
+
 class ProtonLauncher(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
-        self.initUI()
-        self.load_games()
+        with profiler.phase("thumbnail cache"):
+            self.thumbnails = ThumbnailCache(os.path.expanduser(icon_path), self)
+        with profiler.phase("proton registry"):
+            self.proton_registry = ProtonRegistry()
+        self.proton_watcher = ProtonWatcher(self.proton_registry, self)
+        self.proton_watcher.changed.connect(self.on_proton_builds_changed)
+        self.model = GameListModel(self.thumbnails, os.path.expanduser(icon_path), self.proton_registry, self)
+        self.filter_model = GameFilterModel(self.model, self)
+        with profiler.phase("game store"):
+            self.store = GameStore()
+        self.history = LaunchHistory(self.store)
+        self.supervisor = GameSupervisor(self.history, self)
+        self.supervisor.state_changed.connect(self.on_game_state_changed)
+        self._perf_sessions = None
+        self.ingesting = set()
+        self.report_dialog = None
+        self.ingest_signals = IngestSignals()
+        self.ingest_signals.finished.connect(self.on_perf_ingested)
+        self.prefix_warmer = PrefixWarmer(self.proton_registry, self.supervisor, self.model.games, self)
+        self.prefix_warmer.enabled = config.get("prefix_pool")
+        self.prefix_warmer.prefix_cloned.connect(self.on_game_state_changed)
+        self.storage_manager = StorageManager(self)
+        self.storage_manager.scanned.connect(self.update_game_details)
+        self.storage_manager.remove_progress.connect(self.on_remove_progress)
+        self.storage_manager.removed.connect(self.on_storage_removed)
+        # ProtonDB summary per game id, filled from the cache once the window is up and refreshed in the background
+        self.protondb_summaries = {}
+        self.protondb_checking = False
+        self.protondb_force = False
+        self.protondb_reporting = False
+        self.protondb_queue = {}
+        self.protondb_signals = ProtonDBSignals()
+        self.protondb_signals.finished.connect(self.on_protondb_finished)
+        self.protondb_signals.failed.connect(self.on_protondb_failed)
+        # Shortcut syncs run one at a time, requests made meanwhile are merged into the next one
+        self.shortcut_syncing = False
+        self.shortcut_pending = False
+        self.shortcut_targets = set()
+        self.shortcut_reporting = False
+        self.shortcut_signals = ShortcutSignals()
+        self.shortcut_signals.finished.connect(self.on_shortcuts_synced)
+        # Script batches are written one after the other, each one spread over WRAPPER_WORKERS threads
+        self.wrapper_pool = QtCore.QThreadPool(self)
+        self.wrapper_pool.setMaxThreadCount(1)
+        self.wrapper_signals = WrapperSignals()
+        self.wrapper_signals.finished.connect(self.on_scripts_rebuilt)
+        with profiler.phase("initUI"):
+            self.initUI()
+        with profiler.phase("load_games"):
+            self.load_games()
+        QtCore.QTimer.singleShot(0, self.load_protondb_cache)
+        QtCore.QTimer.singleShot(PROTONDB_FIRST_CHECK_MS, self.check_protondb)
+        # Build a template for the Proton version selected for new games as well
+        self.prefix_warmer.want(self.proton_dropdown.currentText())
+        self.proton_dropdown.currentTextChanged.connect(self.prefix_warmer.want)
 
     def initUI(self):
         self.setWindowTitle("ProtonLauncher")
@@ -122,6 +808,10 @@ class ProtonLauncher(QtWidgets.QWidget):
         self.add_game_action.triggered.connect(self.add_game)
         self.toolbar.addAction(self.add_game_action)
 
+        self.import_games_action = QtWidgets.QAction(QtGui.QIcon("icons/add.png"), "Import Games", self)
+        self.import_games_action.triggered.connect(self.import_games)
+        self.toolbar.addAction(self.import_games_action)
+
         self.modify_game_action = QtWidgets.QAction(QtGui.QIcon("icons/edit.png"), "Modify Game", self)
         self.modify_game_action.triggered.connect(self.modify_game)
         self.toolbar.addAction(self.modify_game_action)
@@ -142,32 +832,65 @@ class ProtonLauncher(QtWidgets.QWidget):
         self.create_shortcut_action.triggered.connect(self.create_shortcut)
         self.toolbar.addAction(self.create_shortcut_action)
 
+        self.sync_shortcuts_action = QtWidgets.QAction("Sync Shortcuts", self)
+        self.sync_shortcuts_action.triggered.connect(self.sync_all_shortcuts)
+        self.toolbar.addAction(self.sync_shortcuts_action)
+
         self.launch_game_action = QtWidgets.QAction(QtGui.QIcon("icons/play.png"), "Launch Game", self)
         self.launch_game_action.triggered.connect(self.launch_game)
         self.toolbar.addAction(self.launch_game_action)
 
+        self.profiles_action = QtWidgets.QAction("Performance Profiles", self)
+        self.profiles_action.triggered.connect(self.edit_profiles)
+        self.toolbar.addAction(self.profiles_action)
+
+        self.storage_action = QtWidgets.QAction("Storage", self)
+        self.storage_action.triggered.connect(self.show_storage)
+        self.toolbar.addAction(self.storage_action)
+
+        self.stop_game_action = QtWidgets.QAction(self.style().standardIcon(QtWidgets.QStyle.SP_MediaStop), "Stop Game", self)
+        self.stop_game_action.triggered.connect(self.stop_game)
+        self.toolbar.addAction(self.stop_game_action)
+
         # Select Proton version
         self.proton_label = QtWidgets.QLabel("Select Proton Version:")
         self.proton_dropdown = QtWidgets.QComboBox()
-        self.proton_dropdown.addItems(self.get_installed_proton_versions())
+        with profiler.phase("get_installed_proton_versions"):
+            self.proton_dropdown.addItems(self.get_installed_proton_versions())
+
+        # Search box, filters the list as you type
+        self.search_edit = QtWidgets.QLineEdit()
+        self.search_edit.setPlaceholderText("Search games by name, executable or Proton version")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.filter_model.set_query)
 
         # Games list
-        self.game_list = QtWidgets.QListWidget()
-        self.game_list.itemSelectionChanged.connect(self.update_game_details)
+        self.game_list = QtWidgets.QListView()
+        self.game_list.setModel(self.filter_model)
+        self.game_list.setUniformItemSizes(True)
+        # Shift and Ctrl select several games, the bulk actions apply to all of them
+        self.game_list.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.game_list.selectionModel().currentChanged.connect(self.update_game_details)
         self.game_list.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.game_list.customContextMenuRequested.connect(self.show_context_menu)
         self.game_list.setIconSize(QtCore.QSize(70, 70))
-        self.game_list.setStyleSheet("QListWidget::item { height: 70px; }")
+        self.game_list.setStyleSheet("QListView::item { height: 70px; }")
 
         # Game details
         self.game_details = QtWidgets.QTextEdit()
         self.game_details.setReadOnly(True)
 
+        # Refresh the uptime of the selected game while it is running
+        self.details_timer = QtCore.QTimer(self)
+        self.details_timer.setInterval(1000)
+        self.details_timer.timeout.connect(self.update_game_details)
+
         # Main layout
         main_layout = QtWidgets.QVBoxLayout()
         main_layout.addWidget(self.toolbar)
         main_layout.addWidget(self.proton_label)
         main_layout.addWidget(self.proton_dropdown)
+        main_layout.addWidget(self.search_edit)
 
         # Layout for the games list and details
         splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
@@ -179,26 +902,156 @@ class ProtonLauncher(QtWidgets.QWidget):
         main_layout.addWidget(splitter)
         main_layout.setStretchFactor(splitter, 1)
 
+        # Shown while game data is deleted in the background
+        self.storage_progress = QtWidgets.QProgressBar()
+        self.storage_progress.setVisible(False)
+        main_layout.addWidget(self.storage_progress)
+
+        # Short notices that do not need a dialog, hidden again after a few seconds
+        self.status_label = QtWidgets.QLabel()
+        self.status_label.setVisible(False)
+        main_layout.addWidget(self.status_label)
+        self.status_timer = QtCore.QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.setInterval(5000)
+        self.status_timer.timeout.connect(self.status_label.hide)
+
         self.setLayout(main_layout)
 
         # Create a shortcut to delete a game
         delete_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_Delete), self)
         delete_shortcut.activated.connect(self.delete_game)
 
+        # Ctrl+F jumps to the search box
+        search_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence.Find, self)
+        search_shortcut.activated.connect(self.search_edit.setFocus)
+
+    def selected_game(self):
+        index = self.game_list.currentIndex()
+        if not index.isValid():
+            return None
+        return self.filter_model.game_at(index.row())
+
+    def selected_games(self):
+        # Selected games in list order, the current game when nothing is selected
+        rows = sorted(index.row() for index in self.game_list.selectionModel().selectedRows())
+        games = [game for game in (self.filter_model.game_at(row) for row in rows) if game is not None]
+        if not games:
+            game_data = self.selected_game()
+            return [game_data] if game_data else []
+        return games
+
+    def update_games(self, games, data):
+        # Applies the same change to a batch of games with one transaction and one model update,
+        # their scripts are written in the background. Returns the number of games changed.
+        games = [game for game in games if any(getattr(game, field) != value for field, value in data.items())]
+        if not games:
+            return 0
+        self.model.update_games({game.id: data for game in games})
+        self.store.save_games(games)
+        self.rebuild_scripts(games)
+        self.update_game_details()
+        return len(games)
+
+    def rebuild_scripts(self, games, force=False, report=""):
+        # The worker gets copies, the games may be edited again while their scripts are written
+        games = [Game.from_dict(game.to_dict()) for game in games]
+        if games:
+            self.wrapper_pool.start(WrapperTask(games, force, report, self.wrapper_signals))
+
+    def on_scripts_rebuilt(self, written, error, report):
+        if error:
+            QtWidgets.QMessageBox.warning(self, "Launch Scripts", f"Launch scripts could not be written: {error}")
+        elif report:
+            QtWidgets.QMessageBox.information(self, report, f"{written} launch scripts rebuilt.")
+
     def protondb(self):
-        selected_game = self.game_list.currentItem()
-        if selected_game:
-            game_name = selected_game.text()
-            webbrowser.open(f"https://www.protondb.com/search?q={game_name}")
+        game_data = self.selected_game()
+        if game_data:
+            summary = self.protondb_summaries.get(game_data.id)
+            base_url = config.get("protondb_url").rstrip("/")
+            if summary is not None and summary["appid"]:
+                url = QtCore.QUrl(f"{base_url}/app/{summary['appid']}")
+            else:
+                url = QtCore.QUrl(f"{base_url}/search")
+                query = QtCore.QUrlQuery()
+                query.addQueryItem("q", game_data.name)
+                url.setQuery(query)
+            QtGui.QDesktopServices.openUrl(url)
         else:
-            messagebox.showinfo("ProtonDB", "Select a game to search on ProtonDB")
+            QtWidgets.QMessageBox.information(self, "ProtonDB", "Select a game to search on ProtonDB")
+
+    def load_protondb_cache(self):
+        # Read on the worker too, an imported data dump puts every app on ProtonDB into the cache
+        self.protondb_checking = True
+        self.protondb_reporting = False
+        worker_pool().start(ProtonDBTask(list(self.model.games()), self.protondb_signals, lookups=False))
+
+    def apply_protondb(self, summaries):
+        self.protondb_summaries.update(summaries)
+        self.model.set_ratings({game_id: protondb.short_label(summary) for game_id, summary in summaries.items()})
+        self.update_game_details()
+
+    def check_protondb(self, games=None, force=False):
+        # Background lookup of the games without fresh ratings, forced lookups ignore the cache and the setting
+        if not force and not config.get("protondb_lookups"):
+            return
+        for game in self.model.games() if games is None else games:
+            self.protondb_queue[game.id] = game
+        self.protondb_force = self.protondb_force or force
+        self.start_protondb_batch()
+
+    def start_protondb_batch(self):
+        # One batch at a time, games queued meanwhile go into the next one
+        if self.protondb_checking or not self.protondb_queue:
+            return
+        batch = list(self.protondb_queue.values())
+        self.protondb_queue = {}
+        self.protondb_checking = True
+        worker_pool().start(ProtonDBTask(batch, self.protondb_signals, self.protondb_force))
+        # Only lookups asked for by the user report failures, background ones retry on the next start
+        self.protondb_reporting = self.protondb_force
+        self.protondb_force = False
+
+    def refresh_protondb(self):
+        self.check_protondb(force=True)
+
+    def import_protondb_dump(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Import ProtonDB Data Dump", "", "ProtonDB reports (*.tar.gz *.json *.json.gz)")
+        if not path:
+            return
+        if self.protondb_checking:
+            QtWidgets.QMessageBox.information(self, "ProtonDB", "ProtonDB ratings are being looked up, try again when they are done.")
+            return
+        self.protondb_checking = True
+        self.protondb_reporting = True
+        worker_pool().start(ProtonDBTask(list(self.model.games()), self.protondb_signals, dump_path=path))
+
+    def on_protondb_finished(self, summaries, failed):
+        self.protondb_checking = False
+        self.apply_protondb(summaries)
+        if failed and self.protondb_reporting:
+            QtWidgets.QMessageBox.warning(self, "ProtonDB", f"{failed} games could not be looked up, check the network connection.")
+        self.start_protondb_batch()
+
+    def on_protondb_failed(self, message):
+        self.protondb_checking = False
+        QtWidgets.QMessageBox.warning(self, "ProtonDB", f"ProtonDB data could not be loaded: {message}")
+        self.start_protondb_batch()
 
     def get_installed_proton_versions(self):
-        # Check if the compatibilitytools.d directory exists and return the installed Proton-GE versions
-        if not os.path.exists(os.path.expanduser("~/.steam/root/compatibilitytools.d")):
-            return []
-        proton_dir = os.path.expanduser("~/.steam/root/compatibilitytools.d")
-        return [d for d in os.listdir(proton_dir) if os.path.isdir(os.path.join(proton_dir, d))]
+        # Installed Proton builds, newest first, served from the registry without touching the disk
+        return self.proton_registry.names()
+
+    def on_proton_builds_changed(self):
+        current = self.proton_dropdown.currentText()
+        self.proton_dropdown.clear()
+        self.proton_dropdown.addItems(self.get_installed_proton_versions())
+        if self.proton_registry.exists(current):
+            self.proton_dropdown.setCurrentText(current)
+        self.model.refresh_proton_status()
+        self.prefix_warmer.builds_changed()
+        self.update_game_details()
 
     def add_game(self):
         game_path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Seleccionar Juego", "", "Ejecutables (*.exe)")
@@ -206,11 +1059,11 @@ class ProtonLauncher(QtWidgets.QWidget):
             game_name = os.path.basename(game_path).replace('.exe', '')
             
             # Verifies if the game is already in the list
-            if any(game["name"] == game_name for game in self.games):
+            if self.model.game_by_name(game_name):
                 QtWidgets.QMessageBox.warning(self, "Warning", "This game is already in the list")
                 return
             
-            messagebox.showinfo("Icon", "Select an icon for the game, it's recommended to use an image with a 1:1 aspect ratio, if you don't select an icon, the default icon will be used.")
+            QtWidgets.QMessageBox.information(self, "Icon", "Select an icon for the game, it's recommended to use an image with a 1:1 aspect ratio, if you don't select an icon, the default icon will be used.")
             icon, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Select Icon", "", "Images (*.png *.jpg *.jpeg)")
             if not icon:  # If the user doesn't select an icon, use the default icon
                 global icon_path
@@ -228,144 +1081,383 @@ class ProtonLauncher(QtWidgets.QWidget):
             safe_game_name = game_name.replace(' ', '')
             
             prefix = f".proton-{safe_game_name}-prefix"
-            game_dir = os.path.join(app_dir, safe_game_name)
-            script_path = os.path.join(game_dir, f"{safe_game_name}.sh")
             
-            game_data = {
-                "name": game_name,
-                "path": game_path,
-                "prefix": prefix,
-                "proton": self.proton_dropdown.currentText(),
-                "icon": icon,
-                "mangohud": False
-            }
-
-            if enable_mangohud:
-                game_data["mangohud"] = True
+            game_data = Game(
+                name=game_name,
+                path=game_path,
+                prefix=prefix,
+                proton=self.proton_dropdown.currentText(),
+                icon=icon,
+                mangohud=enable_mangohud
+            )
 
             # Create the script for the game
-            create_game_script(game_data)
+            ensure_wrapper(game_data)
 
             # Add the game to the list
-            self.games.append(game_data)
-            self.save_games()
-            self.update_game_list()
+            self.store.save_game(game_data)
+            self.model.add_game(game_data)
+
+            # Give the game a copy of the template prefix so the first launch skips "proton init"
+            self.prefix_warmer.provision(game_data)
+            self.check_protondb([game_data])
+
+    def import_games(self):
+        dialog = BulkImportDialog({game.path for game in self.model.games()}, self)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return
+
+        games = []
+        used_names = set()
+        for name, path, icon in dialog.selected_entries():
+            # Names identify the game directory, keep them unique
+            unique_name = name
+            number = 2
+            while unique_name in used_names or self.model.game_by_name(unique_name):
+                unique_name = f"{name} {number}"
+                number += 1
+            used_names.add(unique_name)
+            safe_game_name = unique_name.replace(' ', '')
+            games.append(Game(
+                name=unique_name,
+                path=path,
+                prefix=f".proton-{safe_game_name}-prefix",
+                proton=self.proton_dropdown.currentText(),
+                icon=icon or os.path.expanduser(icon_path)
+            ))
+
+        # One transaction and one model update for the whole import, the scripts are written in the background
+        self.store.save_games(games)
+        self.model.add_games(games)
+        self.rebuild_scripts(games)
+        for game_data in games:
+            self.prefix_warmer.provision(game_data)
+        self.check_protondb(games)
 
     def modify_game(self):
-        selected_game = self.game_list.currentItem()
-        if selected_game:
-            game_name = selected_game.text()
-            game_data = next((g for g in self.games if g["name"] == game_name), None)
-            if game_data:
-                dialog = EditGameDialog(game_data, self)
-                if dialog.exec_() == QtWidgets.QDialog.Accepted:
-                    updated_game_data = dialog.get_game_data()
-                    old_game_name = game_data["name"]
-                    game_data.update(updated_game_data)
-
-                    # Verifies if the game name has changed
-                    if old_game_name != updated_game_data["name"]:
-                        # Delete the old game directory
-                        old_game_dir = os.path.join(app_dir, old_game_name.replace(' ', ''))
-                        os.system(f"rm -rf {old_game_dir}")
-
-                    # Update the game script
-                    create_game_script(game_data)
-
-                    # Update the game list
-                    self.save_games()
-                    self.update_game_list()
-                    self.update_game_details()
-
-    def delete_game(self, confirm="yes"):
-        selected_game = self.game_list.currentItem()
-        if selected_game:
-            game_name = selected_game.text()
-            if confirm != "no":
-                if not QtWidgets.QMessageBox.question(self, "Delete Game", "Are you sure you want to delete this game from the launcher? This will not delete the game from your system.", QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No) == QtWidgets.QMessageBox.Yes:
-                    return
-
-            # Delete the game from the list
-            self.games = [g for g in self.games if g["name"] != game_name]
-            self.save_games()
-            self.update_game_list()
-            self.game_details.clear()
-
-            # Delete the game directory
-            game_dir = os.path.join(app_dir, game_name.replace(' ', ''))
-            os.system(f"rm -rf {game_dir}")
-
-    def save_games(self):
-        with open(os.path.join(app_dir, "games.json"), "w") as f:
-            json.dump(self.games, f)
+        game_data = self.selected_game()
+        if game_data:
+            dialog = EditGameDialog(game_data, self)
+            if dialog.exec_() == QtWidgets.QDialog.Accepted:
+                updated_game_data = dialog.get_game_data()
+                old_game_dir = game_dir(game_data)
+                old_lookup = (game_data.name, game_data.appid)
+                self.thumbnails.invalidate(updated_game_data["icon"])
+                self.model.update_game(game_data.id, updated_game_data)
 
-    def load_games(self):
-        if os.path.exists(os.path.join(app_dir, "games.json")):
-            with open(os.path.join(app_dir, "games.json"), "r") as f:
-                self.games = json.load(f)
+                # A new name gets a new script directory, the old one is removed in the background
+                if game_dir(game_data) != old_game_dir:
+                    self.storage_manager.remove([old_game_dir])
+
+                # Update the game script
+                ensure_wrapper(game_data)
+
+                # A new name or app id may point at another ProtonDB entry
+                if (game_data.name, game_data.appid) != old_lookup:
+                    self.protondb_summaries.pop(game_data.id, None)
+                    self.model.set_ratings({game_data.id: None})
+                    self.check_protondb([game_data])
+
+                self.store.save_game(game_data)
+                self.update_game_details()
+                # Existing shortcuts pick up the new name and icon
+                self.sync_shortcuts()
+
+    def delete_game(self):
+        games = self.selected_games()
+        if not games:
+            return
+        if len(games) == 1:
+            text = "Are you sure you want to delete this game from the launcher? This will not delete the game from your system."
+            label = "Also delete its Proton prefix, shader cache and logs"
         else:
-            self.games = []
-        self.update_game_list()
+            text = f"Are you sure you want to delete these {len(games)} games from the launcher? This will not delete them from your system."
+            label = "Also delete their Proton prefixes, shader caches and logs"
+        question = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Question, "Delete Game", text, QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, self)
+        usages = [self.storage_manager.game_usage(game_data) for game_data in games]
+        if all(usages):
+            label += f" ({storage.format_size(sum((value for usage in usages for value in usage.values()), storage.DiskUsage()).reclaimable)})"
+        delete_data_checkbox = QtWidgets.QCheckBox(label)
+        question.setCheckBox(delete_data_checkbox)
+        if question.exec_() != QtWidgets.QMessageBox.Yes:
+            return
+        delete_data = delete_data_checkbox.isChecked()
+        running = [game_data.name for game_data in games if self.supervisor.is_running(game_data.id) or read_state(game_data.id) is not None]
+        if delete_data and running:
+            QtWidgets.QMessageBox.warning(self, "Delete Game", f"{', '.join(running)} is running, close it before deleting its data.")
+            return
 
-    def update_game_list(self):
-        self.game_list.clear()
-        for game in self.games:
-            item = QtWidgets.QListWidgetItem(game["name"])
-            icon = QtGui.QIcon(game.get("icon", os.path.expanduser(icon_path)))
-            pixmap = icon.pixmap(128, 128)  # Resize the icon to 128x128
-            item.setIcon(QtGui.QIcon(pixmap))
-            self.game_list.addItem(item)
+        # Delete the games from the list in one transaction and one model update
+        game_ids = [game_data.id for game_data in games]
+        with self.store.transaction():
+            self.store.delete_games(game_ids)
+            for game_id in game_ids:
+                self.history.forget(game_id)
+                self.perf_sessions().forget(game_id)
+        self.model.remove_games(game_ids)
+        self.game_details.clear()
+
+        self.delete_game_dirs(games, delete_data)
+        # Removes the shortcuts of the deleted games
+        self.sync_shortcuts()
+
+    def delete_game_dirs(self, games, delete_data=False):
+        paths = set()
+        for game_data in games:
+            game_paths = storage.game_paths(game_data)
+            paths.update(game_paths.values() if delete_data else [game_paths["wrapper"]])
+        # Another entry may still use the same prefix or script directory
+        in_use = {path for game in self.model.games() for path in storage.game_paths(game).values()}
+        self.storage_manager.remove(sorted(path for path in paths if path not in in_use))
+
+    def on_remove_progress(self, done, expected, path):
+        self.storage_progress.setVisible(True)
+        self.storage_progress.setMaximum(max(expected, done))
+        self.storage_progress.setValue(done)
+        self.storage_progress.setFormat(f"Deleting {os.path.basename(path)}: %v files")
+
+    def on_storage_removed(self, paths, failed):
+        if not self.storage_manager.removing:
+            self.storage_progress.setVisible(False)
+        if failed:
+            QtWidgets.QMessageBox.warning(self, "Storage", f"{len(failed)} files could not be deleted, for example {failed[0]}")
+
+    def show_storage(self):
+        dialog = StorageDialog(self.storage_manager, self.model.games(), lambda game: self.supervisor.is_running(game.id) or read_state(game.id) is not None, self)
+        dialog.exec_()
+        dialog.deleteLater()
+        self.update_game_details()
+
+    def load_games(self):
+        self.model.set_games(self.store.load_games())
 
     def update_game_details(self):
-        selected_game = self.game_list.currentItem()
-        if selected_game:
-            game_name = selected_game.text()
-            game_data = next((g for g in self.games if g["name"] == game_name), None)
-            if game_data:
-                details = f"Nombre: {game_data['name']}\n"
-                details += f"Ruta: {game_data['path']}\n"
-                details += f"Prefijo: {game_data['prefix']}\n"
-                details += f"Proton: {game_data['proton']}\n"
-                details += f"Icono: {game_data['icon']}\n"
-                details += f"MangoHud: {'Enabled' if game_data.get('mangohud', False) else 'Disabled'}"
-                self.game_details.setText(details)
+        game_data = self.selected_game()
+        if game_data:
+            details = f"Nombre: {game_data.name}\n"
+            details += f"Ruta: {game_data.path}\n"
+            if game_data.id in self.prefix_warmer.cloning:
+                details += f"Prefijo: {game_data.prefix} (preparing...)\n"
+            else:
+                details += f"Prefijo: {game_data.prefix}\n"
+            if self.proton_registry.exists(game_data.proton):
+                details += f"Proton: {game_data.proton}\n"
+            else:
+                details += f"Proton: {game_data.proton} (not installed)\n"
+            details += f"Icono: {game_data.icon}\n"
+            details += f"MangoHud: {'Enabled' if game_data.mangohud else 'Disabled'}\n"
+            details += f"Performance profile: {game_data.profile or tuning.DEFAULT_PROFILE}"
+            if game_data.tuning:
+                details += f" with {len(game_data.tuning)} game overrides"
+            details += f"\nTuning: {tuning.describe(tuning.resolve(game_data))}\n"
+            details += f"ProtonDB: {protondb.describe(self.protondb_summaries.get(game_data.id))}\n"
+            details += f"Status: {self.supervisor.describe(game_data.id)}\n"
+            launches, median, p95 = self.history.stats(game_data.id)
+            if median is not None:
+                details += f"Time to start: median {median:.1f} s, p95 {p95:.1f} s ({launches} launches)\n"
+            else:
+                details += f"Time to start: no data ({launches} launches)\n"
+            if game_data.mangohud:
+                session = self.perf_sessions().latest(game_data.id)
+                if session is not None:
+                    details += f"Last session: {session['avg_fps']:.0f} fps average, 1% low {session['low_1']:.0f} fps, 0.1% low {session['low_01']:.0f} fps, {session['stutters']} stutters\n"
+            usage = self.storage_manager.game_usage(game_data)
+            # The sizes saved by the last run are shown right away and measured again in the background, once per run;
+            # the details are refreshed when they are known
+            self.storage_manager.refresh_games([game_data])
+            if usage is None:
+                details += "Disk usage: measuring...\n"
+            else:
+                details += f"Disk usage: prefix {storage.format_size(usage['prefix'].size)}"
+                if usage["prefix"].shared:
+                    details += f" ({storage.format_size(usage['prefix'].shared)} shared with the template)"
+                details += f", shader cache {storage.format_size(usage['shader_cache'].size)}, logs {storage.format_size(usage['logs'].size + usage['mangohud'].size)}\n"
+            details += f"Logs: {game_log_dir(game_data.id)}"
+            self.game_details.setText(details)
+
+            if self.supervisor.is_running(game_data.id):
+                self.details_timer.start()
+            else:
+                self.details_timer.stop()
 
     def launch_game(self):
-        selected_game = self.game_list.currentItem()
-        if selected_game:
-            messagebox.showinfo("Launch Game", "The game will be launched, it's normal for the game to take a few seconds to start, press OK to start the game.")
-            game_name = selected_game.text()
-            game_data = next((g for g in self.games if g["name"] == game_name), None)
-            if game_data:
-                game_dir = os.path.join(app_dir, game_data["name"].replace(' ', ''))
-                script_path = os.path.join(game_dir, game_data["name"].replace(' ', '') + ".sh")
-                os.system(f"bash {script_path}")
+        game_data = self.selected_game()
+        if game_data:
+            if self.supervisor.is_running(game_data.id) or read_state(game_data.id) is not None:
+                QtWidgets.QMessageBox.information(self, "Launch Game", "This game is already running.")
+                return
+            # Proton is started directly in the background, its state and logs are shown in the details pane
+            self.supervisor.launch(game_data, launch_plan(game_data, self.proton_registry))
+
+    def stop_game(self, force=False):
+        game_data = self.selected_game()
+        if game_data and self.supervisor.is_running(game_data.id):
+            if force:
+                self.supervisor.kill(game_data.id)
+            else:
+                self.supervisor.stop(game_data.id)
+
+    def kill_game(self):
+        self.stop_game(force=True)
+
+    def export_launch_history(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Launch History", "launch-history.csv", "CSV (*.csv);;JSON (*.json)")
+        if path:
+            names = {game.id: game.name for game in self.model.games()}
+            count = self.history.export(path, names)
+            QtWidgets.QMessageBox.information(self, "Export Launch History", f"{count} launches exported to {path}")
+
+    def on_game_state_changed(self, game_id):
+        running = self.supervisor.running(game_id)
+        if running is not None and not running.active:
+            game = self.model.game(game_id)
+            if game is not None and mangohud_logging(game):
+                self.ingest_perf_logs(game)
+            if game is not None:
+                # The prefix and the caches grow while playing
+                self.storage_manager.scan_games([game])
+        game_data = self.selected_game()
+        if game_data and game_data.id == game_id:
+            self.update_game_details()
+
+    def perf_sessions(self):
+        # numpy is slow to import, it is only loaded once performance data is needed
+        if self._perf_sessions is None:
+            import perf_reports
+            self._perf_sessions = perf_reports.PerfSessions(self.store)
+        return self._perf_sessions
+
+    def ingest_perf_logs(self, game_data):
+        if game_data.id in self.ingesting:
+            return
+        self.ingesting.add(game_data.id)
+        # Logs of launches recorded without their settings are filed under the current ones
+        profile, settings = tuning.launch_settings(game_data)
+        worker_pool().start(IngestTask(game_data, profile, settings, self.ingest_signals))
+
+    def on_perf_ingested(self, game_id, added, error):
+        self.ingesting.discard(game_id)
+        if error:
+            self.show_status(f"Performance logs could not be read: {error}")
+        if self.report_dialog is not None and self.report_dialog.game_data.id == game_id:
+            self.report_dialog.reload()
+        game_data = self.selected_game()
+        if added and game_data and game_data.id == game_id:
+            self.update_game_details()
+
+    def show_performance_report(self):
+        game_data = self.selected_game()
+        if not game_data:
+            QtWidgets.QMessageBox.information(self, "Performance Report", "Select a game to see its performance report.")
+            return
+        # Logs of sessions started from a shortcut are picked up now, the dialog refreshes when they are read. The log
+        # of a running game is still being written, it is read once the game exits.
+        running = self.supervisor.running(game_data.id)
+        if running is None or not running.active:
+            self.ingest_perf_logs(game_data)
+        self.report_dialog = PerfReportDialog(game_data, self.perf_sessions(), self)
+        self.report_dialog.exec_()
+        self.report_dialog = None
 
     def set_mangohud(self):
-        selected_game = self.game_list.currentItem()
-        if selected_game:
-            game_name = selected_game.text()
-            game_data = next((g for g in self.games if g["name"] == game_name), None)
-            if game_data:
-                if game_data.get("mangohud", False):
-                    game_data["mangohud"] = False
-                else:
-                    game_data["mangohud"] = True
-                self.save_games()
-                self.update_game_list()
-                self.update_game_details()
-                self.delete_game("no")
-                create_game_script(game_data)
+        games = self.selected_games()
+        if games:
+            # A mixed selection is switched on, otherwise the selection is toggled
+            self.update_games(games, {"mangohud": not all(game_data.mangohud for game_data in games)})
         else:
-            messagebox.showinfo("MangoHud", "Select a game to enable/disable MangoHud, if you don't have MangoHud installed, you can install it from https://github.com/flightlessmango/MangoHud")
+            QtWidgets.QMessageBox.information(self, "MangoHud", "Select a game to enable/disable MangoHud, if you don't have MangoHud installed, you can install it from https://github.com/flightlessmango/MangoHud")
 
     def create_shortcut(self):
-        selected_game = self.game_list.currentItem()
-        if selected_game:
-            game_name = selected_game.text()
-            game_data = next((g for g in self.games if g["name"] == game_name), None)
-            if game_data:
-                create_shortcut(game_data)
+        games = self.selected_games()
+        if games:
+            self.sync_shortcuts([game_data.id for game_data in games], report=True)
+
+    def set_proton_version(self):
+        games = self.selected_games()
+        versions = self.get_installed_proton_versions()
+        if not games or not versions:
+            return
+        current = versions.index(games[0].proton) if games[0].proton in versions else 0
+        build, ok = QtWidgets.QInputDialog.getItem(self, "Set Proton Version", f"Proton build for {len(games)} games:", versions, current, False)
+        if ok:
+            self.update_games(games, {"proton": build})
+
+    def set_profile(self):
+        games = self.selected_games()
+        if not games:
+            return
+        names = list(tuning.profiles())
+        current = games[0].profile or tuning.DEFAULT_PROFILE
+        name, ok = QtWidgets.QInputDialog.getItem(self, "Set Performance Profile", f"Performance profile for {len(games)} games:", names,
+                                                  names.index(current) if current in names else 0, False)
+        if ok:
+            self.update_games(games, {"profile": None if name == tuning.DEFAULT_PROFILE else name})
+
+    def sync_all_shortcuts(self):
+        self.sync_shortcuts(None, report=True)
+
+    def sync_shortcuts(self, targets=(), report=False):
+        # Writes shortcuts for the target game ids (every game when None) and brings the existing ones up to date;
+        # with no targets it only refreshes and prunes the entries already there
+        if targets is None or self.shortcut_targets is None:
+            self.shortcut_targets = None
+        else:
+            self.shortcut_targets.update(targets)
+        self.shortcut_reporting = self.shortcut_reporting or report
+        self.shortcut_pending = True
+        if report:
+            # Only asked for when the user created shortcuts, background refreshes skip the desktop if it is unknown
+            desktop_directory(self)
+        self.start_shortcut_sync()
+
+    def start_shortcut_sync(self):
+        if self.shortcut_syncing or not self.shortcut_pending:
+            return
+        task = ShortcutTask(list(self.model.games()), load_desktop() or get_desktop_directory(), self.shortcut_targets, self.shortcut_reporting, self.shortcut_signals)
+        self.shortcut_pending = False
+        self.shortcut_targets = set()
+        self.shortcut_reporting = False
+        self.shortcut_syncing = True
+        worker_pool().start(task)
+
+    def on_shortcuts_synced(self, result, report):
+        self.shortcut_syncing = False
+        if report:
+            if result.failed:
+                QtWidgets.QMessageBox.warning(self, "Shortcuts", f"{len(result.failed)} shortcuts could not be written: {result.failed[0]}")
+            else:
+                self.show_status(f"Shortcuts: {len(result.written)} written, {len(result.removed)} removed, {result.unchanged} up to date")
+        self.start_shortcut_sync()
+
+    def show_status(self, message):
+        self.status_label.setText(message)
+        self.status_label.setVisible(True)
+        self.status_timer.start()
+
+    def swap_proton_build(self):
+        # Move every game using one Proton build to another one
+        used = sorted({game.proton for game in self.model.games()})
+        if not used:
+            return
+        old_build, ok = QtWidgets.QInputDialog.getItem(self, "Switch Proton Build", "Games using this build:", used, 0, False)
+        if not ok:
+            return
+        new_build, ok = QtWidgets.QInputDialog.getItem(self, "Switch Proton Build", "Switch them to:", self.get_installed_proton_versions(), 0, False)
+        if not ok or new_build == old_build:
+            return
+
+        changed = self.update_games([game for game in self.model.games() if game.proton == old_build], {"proton": new_build})
+        QtWidgets.QMessageBox.information(self, "Switch Proton Build", f"{changed} games now use {new_build}.")
+
+    def edit_profiles(self):
+        dialog = ProfilesDialog(self)
+        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            # Only the games whose resolved settings changed get a new script
+            self.rebuild_scripts(self.model.games())
+            self.update_game_details()
+
+    def rebuild_launch_scripts(self):
+        self.rebuild_scripts(self.model.games(), force=True, report="Rebuild Launch Scripts")
 
     def show_context_menu(self, position):
         menu = QtWidgets.QMenu()
@@ -375,6 +1467,27 @@ class ProtonLauncher(QtWidgets.QWidget):
         shortcut_action = menu.addAction(QtGui.QIcon("icons/shortcut.png"), "Create Shortcut")
         proton_db_action = menu.addAction(QtGui.QIcon("icons/protondb.png"), "Search on ProtonDB")
         mangohud_action = menu.addAction("Enable/Disable MangoHud")
+        proton_version_action = menu.addAction("Set Proton Version")
+        profile_action = menu.addAction("Set Performance Profile")
+        stop_action = menu.addAction(self.style().standardIcon(QtWidgets.QStyle.SP_MediaStop), "Stop Game")
+        kill_action = menu.addAction("Kill Game")
+        perf_report_action = menu.addAction("Performance Report")
+        protondb_refresh_action = menu.addAction("Check ProtonDB Ratings for All Games")
+        protondb_dump_action = menu.addAction("Import ProtonDB Data Dump")
+        export_history_action = menu.addAction("Export Launch History")
+        swap_proton_action = menu.addAction("Switch Proton Build for All Games")
+        rebuild_scripts_action = menu.addAction("Rebuild All Launch Scripts")
+        game_data = self.selected_game()
+        running = game_data is not None and self.supervisor.is_running(game_data.id)
+        stop_action.setEnabled(running)
+        kill_action.setEnabled(running)
+        # Editing, launching and reports are about one game, the other actions apply to the whole selection
+        selected = len(self.selected_games())
+        for action in (launch_action, modify_action, proton_db_action, perf_report_action):
+            action.setEnabled(selected <= 1)
+        if selected > 1:
+            delete_action.setText(f"Delete {selected} Games")
+            shortcut_action.setText(f"Create {selected} Shortcuts")
 
         launch_action.triggered.connect(self.launch_game)
         modify_action.triggered.connect(self.modify_game)
@@ -382,22 +1495,74 @@ class ProtonLauncher(QtWidgets.QWidget):
         shortcut_action.triggered.connect(self.create_shortcut)
         proton_db_action.triggered.connect(self.protondb)
         mangohud_action.triggered.connect(self.set_mangohud)
+        proton_version_action.triggered.connect(self.set_proton_version)
+        profile_action.triggered.connect(self.set_profile)
+        stop_action.triggered.connect(self.stop_game)
+        kill_action.triggered.connect(self.kill_game)
+        perf_report_action.triggered.connect(self.show_performance_report)
+        protondb_refresh_action.triggered.connect(self.refresh_protondb)
+        protondb_dump_action.triggered.connect(self.import_protondb_dump)
+        export_history_action.triggered.connect(self.export_launch_history)
+        swap_proton_action.triggered.connect(self.swap_proton_build)
+        rebuild_scripts_action.triggered.connect(self.rebuild_launch_scripts)
 
         menu.exec_(self.game_list.viewport().mapToGlobal(position))
 
+    def closeEvent(self, event):
+        # Closing the launcher ends the process group of every game it started
+        running = self.supervisor.active_games()
+        if running:
+            names = ", ".join(game.name for game in running)
+            answer = QtWidgets.QMessageBox.question(self, "Games Running", f"The following games are still running: {names}. Closing the launcher will stop them, do you want to continue?", QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+            if answer != QtWidgets.QMessageBox.Yes:
+                event.ignore()
+                return
+            for game in running:
+                self.supervisor.stop(game.game_id)
+                game.process.waitForFinished(STOP_WAIT_MS)
+                self.supervisor.kill(game.game_id)
+        event.accept()
+
     def showWarnings(self):
-        if not os.path.exists(os.path.expanduser("~/.steam/root/compatibilitytools.d")):
+        if not os.path.exists(COMPAT_DIR):
             QtWidgets.QMessageBox.warning(self, "Proton Not Found", "Proton not found in ~/.steam/root/compatibilitytools.d, please install Proton-GE or another version of Proton.")
 
+        missing = self.proton_registry.missing(self.model.games())
+        if missing and os.path.exists(COMPAT_DIR):
+            names = ", ".join(game.name for game in missing[:10])
+            QtWidgets.QMessageBox.warning(self, "Proton Build Missing", f"The Proton build configured for these games is no longer installed: {names}. Edit them to choose another version.")
+
         if not os.path.exists(os.path.expanduser(icon_path)):
             QtWidgets.QMessageBox.warning(self, "Icon Not Found", "Icon not found in ~/.protonlauncher, please add an icon.png file to this directory.")
 
-        if not self.games:
+        if not self.model.rowCount():
             QtWidgets.QMessageBox.information(self, "Welcome to ProtonLauncher", "You don't have any games added to the launcher, click on 'Add Game' to add a game.")
 
+class FirstPaintFilter(QtCore.QObject):
+    # Records the first paint of the main window and prints the startup profile
+    def eventFilter(self, watched, event):
+        if event.type() == QtCore.QEvent.Paint:
+            watched.removeEventFilter(self)
+            profiler.mark("first paint")
+            QtCore.QTimer.singleShot(0, self.finish)
+        return False
+
+    def finish(self):
+        profiler.report()
+        QtWidgets.QApplication.quit()
+
 if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
+    with profiler.phase("QApplication"):
+        app = QtWidgets.QApplication(sys.argv)
     launcher = ProtonLauncher()
-    launcher.show()
-    launcher.showWarnings()
+    if profiler.enabled:
+        # Profiling mode: report the time to the first painted window and exit
+        first_paint_filter = FirstPaintFilter()
+        launcher.installEventFilter(first_paint_filter)
+    with profiler.phase("show"):
+        launcher.show()
+    if not profiler.enabled:
+        launcher.showWarnings()
+    app.aboutToQuit.connect(launcher.thumbnails.save_index)
+    app.aboutToQuit.connect(launcher.store.close)
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,217 @@
+import io
+import os
+import re
+import time
+import numpy as np
+from launch_engine import mangohud_log_dir
+
+# Logs are parsed this many bytes at a time, a multi-hour log is never held as text or Python objects
+CHUNK_BYTES = 4 * 1024 * 1024
+# A frame is a stutter when it takes STUTTER_FACTOR times the average of the STUTTER_WINDOW frames
+# before it, and at least STUTTER_MIN_MS more
+STUTTER_FACTOR = 2.0
+STUTTER_MIN_MS = 8.0
+STUTTER_WINDOW = 60
+# Sessions shorter than this are launches that crashed or were closed right away
+MIN_FRAMES = 100
+# "<exe>_2024-05-01_20-15-33.csv"
+LOG_TIME_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})")
+
+def parse_column(text, column):
+    try:
+        return np.loadtxt(io.StringIO(text), delimiter=",", usecols=(column,), dtype=np.float32, ndmin=1)
+    except ValueError:
+        # Broken rows, e.g. the last one of a game that crashed while writing, are skipped
+        values = np.genfromtxt(io.StringIO(text), delimiter=",", usecols=(column,), dtype=np.float32, invalid_raise=False)
+        values = np.atleast_1d(values)
+        return values[~np.isnan(values)]
+
+def read_frametimes(path, chunk_bytes=CHUNK_BYTES):
+    # Frame times in milliseconds as a float32 array, parsed in chunks of whole lines
+    with open(path, "rb") as f:
+        # The system information lines come first, then the column names
+        for _ in range(10):
+            line = f.readline()
+            if not line:
+                return np.empty(0, dtype=np.float32)
+            fields = [field.strip() for field in line.decode("utf-8", "replace").lower().split(",")]
+            if "frametime" in fields:
+                column = fields.index("frametime")
+                break
+        else:
+            raise ValueError(f"{path} is not a MangoHud log")
+
+        chunks = []
+        rest = b""
+        while True:
+            block = f.read(chunk_bytes)
+            data = rest + block
+            if block:
+                cut = data.rfind(b"\n")
+                if cut < 0:
+                    rest = data
+                    continue
+                data, rest = data[:cut + 1], data[cut + 1:]
+            if data.strip():
+                chunks.append(parse_column(data.decode("utf-8", "replace"), column))
+            if not block:
+                break
+    if not chunks:
+        return np.empty(0, dtype=np.float32)
+    return np.concatenate(chunks)
+
+def count_stutters(frametimes, window=STUTTER_WINDOW):
+    if len(frametimes) <= window:
+        return 0
+    times = frametimes.astype(np.float64)
+    # Average of the previous window frames for every frame after the first window
+    sums = np.cumsum(times)
+    previous = (sums[window - 1:-1] - np.concatenate(([0.0], sums[:-window - 1]))) / window
+    current = times[window:]
+    return int(np.count_nonzero((current > previous * STUTTER_FACTOR) & (current - previous > STUTTER_MIN_MS)))
+
+def summarize(frametimes):
+    # Session metrics, None for logs with too few frames to mean anything
+    frametimes = frametimes[frametimes > 0]
+    if len(frametimes) < MIN_FRAMES:
+        return None
+    times = frametimes.astype(np.float64)
+    duration = float(times.sum()) / 1000
+    p50, p90, p95, p99, p999 = np.percentile(times, (50, 90, 95, 99, 99.9))
+    return {
+        "frames": int(len(times)),
+        "duration": duration,
+        "avg_fps": len(times) / duration,
+        # Lows are the frame rate of the 99th and 99.9th percentile frame time
+        "low_1": 1000 / p99,
+        "low_01": 1000 / p999,
+        "p50": float(p50),
+        "p90": float(p90),
+        "p95": float(p95),
+        "p99": float(p99),
+        "p999": float(p999),
+        "stutters": count_stutters(frametimes),
+    }
+
+def log_started(path):
+    match = LOG_TIME_PATTERN.search(os.path.basename(path))
+    if match:
+        try:
+            return time.mktime(time.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S"))
+        except ValueError:
+            pass
+    return os.path.getmtime(path)
+
+SESSION_COLUMNS = ("game_id", "log_path", "started", "proton", "profile", "tuning", "frames", "duration", "avg_fps",
+                   "low_1", "low_01", "p50", "p90", "p95", "p99", "p999", "stutters")
+
+class PerfSessions:
+    # Summaries of the MangoHud logs of every game, kept in the perf_sessions table of the game store
+    def __init__(self, store):
+        self.store = store
+
+    def pending_logs(self, game_id):
+        # [(path, size, mtime)] of the logs that are new or changed since they were read, e.g. the log of a game
+        # that was still running then
+        try:
+            names = os.listdir(mangohud_log_dir(game_id))
+        except OSError:
+            return []
+        known = {path: (size, mtime) for path, size, mtime in self.store.conn.execute(
+            "SELECT log_path, log_size, log_mtime FROM perf_sessions WHERE game_id = ?", (game_id,))}
+        pending = []
+        for name in names:
+            # MangoHud also writes a "_summary.csv" per session, only the frame logs are read
+            if not name.endswith(".csv") or name.endswith("_summary.csv"):
+                continue
+            path = os.path.join(mangohud_log_dir(game_id), name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+                pending.append((path, stat.st_size, stat.st_mtime_ns))
+        return sorted(pending)
+
+    def launch_settings(self, game_id, started):
+        # (Proton build, profile, tuning) of the launch the log belongs to, the last one that started before the log
+        row = self.store.conn.execute(
+            "SELECT proton, profile, tuning FROM launches WHERE game_id = ? AND started <= ? ORDER BY started DESC LIMIT 1",
+            (game_id, started + 60),
+        ).fetchone()
+        return row or (None, None, None)
+
+    def ingest(self, game, profile, tuning_description):
+        # Parses the new and changed logs of a game, returns the number of sessions added or updated.
+        # Sessions are filed under the settings their launch recorded; profile and tuning_description are only
+        # used for launches recorded before the settings were.
+        added = 0
+        for path, size, mtime in self.pending_logs(game.id):
+            try:
+                summary = summarize(read_frametimes(path))
+                started = log_started(path)
+            except (OSError, ValueError):
+                summary = None
+                started = 0
+            launch_proton, launch_profile, launch_tuning = self.launch_settings(game.id, started)
+            row = {
+                "game_id": game.id,
+                "log_path": path,
+                "started": started,
+                "proton": launch_proton or game.proton,
+                "profile": launch_profile or profile,
+                "tuning": launch_tuning if launch_profile else tuning_description,
+                "log_size": size,
+                "log_mtime": mtime,
+            }
+            # Unreadable and too short logs are recorded without metrics so they are only parsed again once they change
+            row.update(summary or {})
+            with self.store.transaction() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO perf_sessions ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+                    list(row.values()),
+                )
+            if summary is not None:
+                added += 1
+        return added
+
+    def latest(self, game_id):
+        row = self.store.conn.execute(
+            f"SELECT {', '.join(SESSION_COLUMNS)} FROM perf_sessions WHERE game_id = ? AND frames IS NOT NULL ORDER BY started DESC LIMIT 1",
+            (game_id,),
+        ).fetchone()
+        return dict(zip(SESSION_COLUMNS, row)) if row else None
+
+    def sessions(self, game_id):
+        rows = self.store.conn.execute(
+            f"SELECT {', '.join(SESSION_COLUMNS)} FROM perf_sessions WHERE game_id = ? AND frames IS NOT NULL ORDER BY started DESC",
+            (game_id,),
+        )
+        return [dict(zip(SESSION_COLUMNS, row)) for row in rows]
+
+    def report(self, game_id):
+        # One row per Proton build and profile, the frame rates are weighted by session length
+        groups = {}
+        for session in self.sessions(game_id):
+            groups.setdefault((session["proton"] or "", session["profile"] or ""), []).append(session)
+        report = []
+        for (proton, profile), sessions in groups.items():
+            durations = np.array([session["duration"] for session in sessions])
+            total = float(durations.sum())
+            report.append({
+                "proton": proton,
+                "profile": profile,
+                "sessions": len(sessions),
+                "hours": total / 3600,
+                "avg_fps": float(sum(session["frames"] for session in sessions) / total),
+                "low_1": float(np.average([session["low_1"] for session in sessions], weights=durations)),
+                "low_01": float(np.average([session["low_01"] for session in sessions], weights=durations)),
+                "p99": float(np.average([session["p99"] for session in sessions], weights=durations)),
+                "stutters_per_hour": sum(session["stutters"] for session in sessions) / (total / 3600),
+            })
+        report.sort(key=lambda row: row["avg_fps"], reverse=True)
+        return report
+
+    def forget(self, game_id):
+        with self.store.transaction() as conn:
+            conn.execute("DELETE FROM perf_sessions WHERE game_id = ?", (game_id,))
@@ -0,0 +1,125 @@
+import os
+import shutil
+import subprocess
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+home = os.path.expanduser("~")
+
+POOL_DIR = os.path.join(app_dir, "prefix-templates")
+READY_MARKER = ".template-ready"
+
+def template_path(proton_name):
+    return os.path.join(POOL_DIR, proton_name)
+
+def building_path(proton_name):
+    return os.path.join(POOL_DIR, f".build-{proton_name}")
+
+def prefix_path(game):
+    return os.path.join(home, game.prefix)
+
+def is_ready(proton_name):
+    return os.path.exists(os.path.join(template_path(proton_name), READY_MARKER))
+
+def is_initialized(prefix_dir):
+    # Proton writes the version file and the wine registry once the prefix is set up
+    return os.path.exists(os.path.join(prefix_dir, "version")) and os.path.exists(os.path.join(prefix_dir, "pfx", "system.reg"))
+
+def init_environment(prefix_dir):
+    return {
+        "STEAM_COMPAT_DATA_PATH": prefix_dir,
+        "STEAM_COMPAT_CLIENT_INSTALL_PATH": os.path.join(home, ".steam", "root"),
+        "STEAM_COMPAT_LIBRARY_PATHS": os.path.join(home, ".steam", "steamapps"),
+    }
+
+def init_command(registry, proton_name, prefix_dir):
+    # Same initialisation the launch script runs for a missing prefix, at the lowest CPU and IO priority
+    return ["nice", "-n", "19", "ionice", "-c", "3", registry.proton_path(proton_name), "init", prefix_dir]
+
+def start_template(proton_name):
+    os.makedirs(POOL_DIR, exist_ok=True)
+    build_dir = building_path(proton_name)
+    if os.path.exists(build_dir):
+        shutil.rmtree(build_dir)
+    os.makedirs(build_dir)
+    return build_dir
+
+def finish_template(proton_name):
+    # Returns True if the freshly built prefix became the template for this build
+    build_dir = building_path(proton_name)
+    if not is_initialized(build_dir):
+        shutil.rmtree(build_dir, ignore_errors=True)
+        return False
+    lock_path = os.path.join(build_dir, "pfx.lock")
+    if os.path.exists(lock_path):
+        os.remove(lock_path)
+    open(os.path.join(build_dir, READY_MARKER), "w").close()
+
+    target = template_path(proton_name)
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.replace(build_dir, target)
+    return True
+
+def remove_template(proton_name):
+    shutil.rmtree(template_path(proton_name), ignore_errors=True)
+
+def clone_prefix(proton_name, destination):
+    # Clone the template of a Proton build into a new game prefix, returns True on success
+    source = template_path(proton_name)
+    if not is_ready(proton_name) or os.path.exists(destination):
+        return False
+
+    tmp_destination = f"{destination}.cloning"
+    if os.path.exists(tmp_destination):
+        shutil.rmtree(tmp_destination)
+    try:
+        clone_tree(source, tmp_destination)
+        fixup_prefix(source, tmp_destination, destination)
+        # The game may have been launched (and its prefix created) while cloning
+        if os.path.exists(destination):
+            shutil.rmtree(tmp_destination)
+            return False
+        os.rename(tmp_destination, destination)
+    except OSError:
+        shutil.rmtree(tmp_destination, ignore_errors=True)
+        return False
+    return True
+
+def clone_tree(source, destination):
+    # Reflinks share every block copy-on-write (btrfs, xfs, bcachefs...), that is the cheapest clone
+    result = subprocess.run(["cp", "-a", "--reflink=always", source, destination], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if result.returncode == 0:
+        return
+    shutil.rmtree(destination, ignore_errors=True)
+
+    for root, dirs, files in os.walk(source):
+        relative_root = os.path.relpath(root, source)
+        target_root = os.path.normpath(os.path.join(destination, relative_root))
+        os.makedirs(target_root, exist_ok=True)
+        shutil.copystat(root, target_root)
+
+        for name in dirs + files:
+            source_path = os.path.join(root, name)
+            target_path = os.path.join(target_root, name)
+            if os.path.islink(source_path):
+                os.symlink(os.readlink(source_path), target_path)
+            elif name in files:
+                # A real copy, never a hardlink: Wine installers (vcredist, winetricks) rewrite system DLLs in place,
+                # which would change the template and every prefix cloned from it
+                shutil.copy2(source_path, target_path)
+
+def fixup_prefix(template, prefix_dir, final_dir):
+    # Per game fixups: links pointing into the template are retargeted to final_dir and the template marker is dropped
+    marker = os.path.join(prefix_dir, READY_MARKER)
+    if os.path.exists(marker):
+        os.remove(marker)
+    template = os.path.abspath(template)
+    for root, dirs, files in os.walk(prefix_dir):
+        for name in dirs + files:
+            path = os.path.join(root, name)
+            if not os.path.islink(path):
+                continue
+            target = os.readlink(path)
+            if os.path.isabs(target) and (target == template or target.startswith(template + os.sep)):
+                os.remove(path)
+                os.symlink(final_dir + target[len(template):], path)
@@ -0,0 +1,131 @@
+import os
+from PyQt5 import QtCore
+import prefix_pool
+
+# Wait this long after startup before building templates, then check again periodically
+FIRST_CHECK_MS = 30 * 1000
+CHECK_INTERVAL_MS = 5 * 60 * 1000
+
+class _CloneSignals(QtCore.QObject):
+    # game id, True if the prefix was cloned
+    finished = QtCore.pyqtSignal(str, bool)
+
+class _CloneTask(QtCore.QRunnable):
+    def __init__(self, game_id, proton_name, destination, signals):
+        super().__init__()
+        self.game_id = game_id
+        self.proton_name = proton_name
+        self.destination = destination
+        self.signals = signals
+
+    def run(self):
+        cloned = prefix_pool.clone_prefix(self.proton_name, self.destination)
+        self.signals.finished.emit(self.game_id, cloned)
+
+class PrefixWarmer(QtCore.QObject):
+    # Keeps one initialised template prefix per Proton build used by the library and clones it for new games
+    prefix_cloned = QtCore.pyqtSignal(str)
+
+    def __init__(self, registry, supervisor, games, parent=None):
+        super().__init__(parent)
+        self.registry = registry
+        self.supervisor = supervisor
+        # Callable returning the games of the library
+        self.games = games
+        self.enabled = True
+        self.process = None
+        self.building = None
+        self.cloning = set()
+        self.extra_builds = set()
+        # Builds whose template could not be built, not tried again until the installed builds change
+        self.failed_builds = set()
+
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.signals = _CloneSignals()
+        self.signals.finished.connect(self.on_clone_finished)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.warm)
+        QtCore.QTimer.singleShot(FIRST_CHECK_MS, self.start)
+
+    def start(self):
+        self.timer.start(CHECK_INTERVAL_MS)
+        self.warm()
+
+    def want(self, proton_name):
+        # Builds not used by any game yet (e.g. the one selected for new games) can be requested explicitly
+        if proton_name:
+            self.extra_builds.add(proton_name)
+
+    def wanted_builds(self):
+        builds = {game.proton for game in self.games()} | self.extra_builds
+        return sorted(name for name in builds - self.failed_builds if self.registry.exists(name) and not prefix_pool.is_ready(name))
+
+    def builds_changed(self):
+        # A build installed again or updated may initialise prefixes now
+        self.failed_builds.clear()
+
+    def idle(self):
+        return self.process is None and not self.supervisor.active_games() and not self.cloning
+
+    def warm(self):
+        # Templates are only built while no game is running, one at a time
+        if not self.enabled or not self.idle():
+            return
+        wanted = self.wanted_builds()
+        if wanted:
+            self.build_template(wanted[0])
+
+    def build_template(self, proton_name):
+        build_dir = prefix_pool.start_template(proton_name)
+        environment = QtCore.QProcessEnvironment.systemEnvironment()
+        for key, value in prefix_pool.init_environment(build_dir).items():
+            environment.insert(key, value)
+
+        command = prefix_pool.init_command(self.registry, proton_name, build_dir)
+        self.building = proton_name
+        self.process = QtCore.QProcess(self)
+        self.process.setProcessEnvironment(environment)
+        self.process.setProcessChannelMode(QtCore.QProcess.ForwardedChannels)
+        self.process.finished.connect(self.on_build_finished)
+        self.process.errorOccurred.connect(self.on_build_error)
+        self.process.start(command[0], command[1:])
+
+    def on_build_finished(self, code, status):
+        # "proton init" exits with an error once the prefix is set up, the prefix itself is checked instead
+        proton_name = self.building
+        self.process.deleteLater()
+        self.process = None
+        self.building = None
+        if prefix_pool.finish_template(proton_name):
+            self.provision_missing(proton_name)
+        else:
+            # Do not retry a failing build on every check
+            self.failed_builds.add(proton_name)
+
+    def on_build_error(self, error):
+        if error == QtCore.QProcess.FailedToStart:
+            self.on_build_finished(-1, QtCore.QProcess.CrashExit)
+
+    def provision(self, game):
+        # Clone the template into the game prefix in the background, if there is one for its build
+        destination = prefix_pool.prefix_path(game)
+        if game.id in self.cloning or os.path.exists(destination):
+            return False
+        if not prefix_pool.is_ready(game.proton):
+            self.want(game.proton)
+            return False
+        self.cloning.add(game.id)
+        self.pool.start(_CloneTask(game.id, game.proton, destination, self.signals))
+        return True
+
+    def provision_missing(self, proton_name):
+        for game in self.games():
+            if game.proton == proton_name and not self.supervisor.is_running(game.id):
+                self.provision(game)
+
+    def on_clone_finished(self, game_id, cloned):
+        self.cloning.discard(game_id)
+        if cloned:
+            self.prefix_cloned.emit(game_id)
@@ -0,0 +1,102 @@
+import os
+import re
+
+COMPAT_DIR = os.path.expanduser("~/.steam/root/compatibilitytools.d")
+
+def version_key(text):
+    # Natural order, so GE-Proton9-10 sorts after GE-Proton9-9
+    key = []
+    for part in re.split(r"(\d+)", text.lower()):
+        if part.isdigit():
+            key.append((0, int(part), ""))
+        elif part:
+            key.append((1, 0, part))
+    return key
+
+def build_family(text):
+    # "GE-Proton9-10" -> "ge-proton", builds of the same family are compared by version
+    return re.split(r"\d", text.lower(), maxsplit=1)[0].rstrip("-_. ")
+
+def read_version(build_dir):
+    # The version file holds "<timestamp> <version>", e.g. "1698183200 GE-Proton8-25"
+    try:
+        with open(os.path.join(build_dir, "version"), "r") as f:
+            content = f.read().split()
+    except OSError:
+        return None
+    return content[-1] if content else None
+
+class ProtonBuild:
+    __slots__ = ("name", "path", "version", "mtime")
+
+    def __init__(self, name, path, version, mtime):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.mtime = mtime
+
+    @property
+    def proton(self):
+        return os.path.join(self.path, "proton")
+
+    @property
+    def sort_key(self):
+        return version_key(self.version or self.name)
+
+class ProtonRegistry:
+    # Installed Proton builds, scanned once and refreshed only when the directory changes
+    def __init__(self, compat_dir=COMPAT_DIR):
+        self.compat_dir = compat_dir
+        self._builds = {}
+        self._ordered = []
+        self.scan()
+
+    def scan(self):
+        # Returns True if the set of installed builds changed
+        builds = {}
+        try:
+            entries = list(os.scandir(self.compat_dir))
+        except OSError:
+            entries = []
+        for entry in entries:
+            try:
+                if not entry.is_dir():
+                    continue
+                mtime = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            # Builds whose directory did not change keep the version read on the previous scan
+            known = self._builds.get(entry.name)
+            if known is not None and known.mtime == mtime:
+                builds[entry.name] = known
+            else:
+                builds[entry.name] = ProtonBuild(entry.name, entry.path, read_version(entry.path), mtime)
+
+        changed = builds.keys() != self._builds.keys() or any(builds[name] is not self._builds[name] for name in builds)
+        self._builds = builds
+        # Grouped by family, newest build first inside each family
+        ordered = sorted(builds.values(), key=lambda build: build.sort_key, reverse=True)
+        self._ordered = sorted(ordered, key=lambda build: build_family(build.version or build.name))
+        return changed
+
+    def builds(self):
+        return self._ordered
+
+    def names(self):
+        return [build.name for build in self._ordered]
+
+    def get(self, name):
+        return self._builds.get(name)
+
+    def exists(self, name):
+        return name in self._builds
+
+    def proton_path(self, name):
+        build = self._builds.get(name)
+        if build is None:
+            return os.path.join(self.compat_dir, name, "proton")
+        return build.proton
+
+    def missing(self, games):
+        # Games configured with a Proton build that is no longer installed
+        return [game for game in games if game.proton not in self._builds]
@@ -0,0 +1,35 @@
+import os
+from PyQt5 import QtCore
+
+class ProtonWatcher(QtCore.QObject):
+    # Keeps a ProtonRegistry current through a QFileSystemWatcher
+    changed = QtCore.pyqtSignal()
+
+    def __init__(self, registry, parent=None):
+        super().__init__(parent)
+        self.registry = registry
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_scan)
+
+        # Extracting a build creates many entries, scan once things settle down
+        self.scan_timer = QtCore.QTimer(self)
+        self.scan_timer.setSingleShot(True)
+        self.scan_timer.setInterval(500)
+        self.scan_timer.timeout.connect(self.rescan)
+        self.watch()
+
+    def watch(self):
+        # Watch the parent as well, so a compatibilitytools.d created later is noticed
+        paths = [self.registry.compat_dir, os.path.dirname(self.registry.compat_dir)]
+        paths += [build.path for build in self.registry.builds()]
+        paths = [path for path in paths if os.path.isdir(path) and path not in self.watcher.directories()]
+        if paths:
+            self.watcher.addPaths(paths)
+
+    def schedule_scan(self, path):
+        self.scan_timer.start()
+
+    def rescan(self):
+        if self.registry.scan():
+            self.changed.emit()
+        self.watch()
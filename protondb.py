@@ -0,0 +1,351 @@
+import io
+import re
+import gzip
+import json
+import time
+import difflib
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from config import config
+
+LOOKUP_WORKERS = 8
+REQUEST_TIMEOUT = 10
+# A name search result is accepted below an exact match only when it is this close to the game name
+MIN_NAME_SIMILARITY = 0.8
+# Tiers from best to worst, as ProtonDB names them
+TIERS = ("platinum", "gold", "silver", "bronze", "borked")
+# Dump files are decoded this many characters at a time
+DUMP_CHUNK = 1024 * 1024
+
+SUMMARY_COLUMNS = ("appid", "tier", "trending_tier", "best_tier", "confidence", "score", "reports", "checked", "source")
+# Values per "IN (...)" query, below the parameter limit of older SQLite versions
+QUERY_BATCH = 500
+
+def normalize(name):
+    # Key used to match game names with Steam titles: lower case letters and digits only
+    return re.sub(r"[^0-9a-z]+", "", name.lower().replace("&", "and"))
+
+def search_key(game):
+    return normalize(game.name)
+
+def fresh(checked, ttl=None):
+    ttl = config.get("protondb_ttl") if ttl is None else ttl
+    return checked is not None and time.time() - checked < ttl
+
+def describe(summary):
+    # One line for the details pane
+    if summary is None:
+        return "not checked yet"
+    if summary["appid"] is None:
+        return "no matching Steam game, set its Steam App ID"
+    if not summary["reports"]:
+        return "no reports"
+    if summary["tier"]:
+        text = f"{summary['tier'].title()}"
+        if summary["confidence"]:
+            text += f" ({summary['confidence']} confidence)"
+        if summary["trending_tier"] and summary["trending_tier"] != summary["tier"]:
+            text += f", trending {summary['trending_tier'].title()}"
+    else:
+        text = f"{summary['score'] * 100:.0f}% say it runs"
+    text += f", {summary['reports']} reports"
+    if summary["source"] == "dump":
+        text += " (offline data)"
+    return text
+
+def short_label(summary):
+    # Text shown under the name in the game list
+    if summary is None or not summary["reports"]:
+        return None
+    if summary["tier"]:
+        return summary["tier"].title()
+    return f"{summary['score'] * 100:.0f}% runs"
+
+class ProtonDBCache:
+    # Steam app ids and ProtonDB summaries kept in the game store, online results expire after protondb_ttl seconds
+    def __init__(self, store):
+        self.store = store
+
+    def appid(self, game):
+        # (app id or None, checked) for the name of a game, (None, None) if it was never looked up
+        if game.appid:
+            return game.appid, time.time()
+        row = self.store.conn.execute("SELECT appid, checked FROM protondb_apps WHERE name = ?", (search_key(game),)).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def summary(self, appid):
+        row = self.store.conn.execute(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM protondb_summaries WHERE appid = ?", (appid,)).fetchone()
+        return dict(zip(SUMMARY_COLUMNS, row)) if row else None
+
+    def game_summary(self, game):
+        appid, _ = self.appid(game)
+        return self.summary(appid) if appid else None
+
+    def select_in(self, query, values):
+        # Rows of a query with one "IN ({})" over the values, a batch of them at a time
+        values = list(values)
+        for start in range(0, len(values), QUERY_BATCH):
+            batch = values[start:start + QUERY_BATCH]
+            yield from self.store.conn.execute(query.format(", ".join("?" * len(batch))), batch)
+
+    def summaries(self, games):
+        # {game id: summary} for every game with cached data. Only the rows of these games are read, the tables
+        # also hold every app of an imported data dump. Games whose name matched no Steam game get a summary
+        # without app id.
+        keys = {search_key(game) for game in games if not game.appid}
+        rows = self.select_in("SELECT name, appid, checked FROM protondb_apps WHERE name IN ({})", keys)
+        names = {row[0]: (row[1], row[2]) for row in rows}
+        appids = {game.appid for game in games if game.appid} | {appid for appid, _ in names.values() if appid}
+        rows = self.select_in(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM protondb_summaries WHERE appid IN ({{}})", appids)
+        by_appid = {row[0]: dict(zip(SUMMARY_COLUMNS, row)) for row in rows}
+        result = {}
+        for game in games:
+            appid, checked = (game.appid, None) if game.appid else names.get(search_key(game), (None, None))
+            if appid:
+                summary = by_appid.get(appid)
+            elif checked is not None:
+                summary = dict(dict.fromkeys(SUMMARY_COLUMNS), reports=0, checked=checked, source="api")
+            else:
+                summary = None
+            if summary is not None:
+                result[game.id] = summary
+        return result
+
+    def stale(self, games, ttl=None):
+        # Games whose app id or summary is missing or expired
+        result = []
+        for game in games:
+            appid, checked = self.appid(game)
+            if not fresh(checked, ttl):
+                result.append(game)
+                continue
+            if appid is None:
+                continue
+            summary = self.summary(appid)
+            if summary is None or summary["source"] == "dump" or not fresh(summary["checked"], ttl):
+                result.append(game)
+        return result
+
+    def store_appid(self, key, appid, source="api"):
+        self.store.conn.execute(
+            "INSERT INTO protondb_apps (name, appid, checked, source) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET appid = excluded.appid, checked = excluded.checked, source = excluded.source",
+            (key, appid, time.time(), source),
+        )
+
+    def store_summary(self, summary):
+        # Online data always wins, offline data only replaces older offline data
+        columns = ", ".join(SUMMARY_COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in SUMMARY_COLUMNS[1:])
+        self.store.conn.execute(
+            f"INSERT INTO protondb_summaries ({columns}) VALUES ({', '.join('?' for _ in SUMMARY_COLUMNS)}) "
+            f"ON CONFLICT(appid) DO UPDATE SET {updates} WHERE excluded.source = 'api' OR protondb_summaries.source = 'dump'",
+            [summary[column] for column in SUMMARY_COLUMNS],
+        )
+
+class ProtonDBClient:
+    # Resolves game names to Steam app ids and fetches their ProtonDB summaries, many at a time over one pooled session
+    def __init__(self, store, workers=LOOKUP_WORKERS, session=None):
+        self.cache = ProtonDBCache(store)
+        self.workers = workers
+        self.session = session or make_session(workers)
+        self.protondb_url = config.get("protondb_url").rstrip("/")
+        self.steam_url = config.get("steam_store_url").rstrip("/")
+
+    def get_json(self, url, params=None):
+        # Parsed JSON, None for a 404 (ProtonDB has no summary for games without reports)
+        response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def resolve(self, name):
+        # Steam app id of the store item matching the name, None if nothing is close enough
+        data = self.get_json(f"{self.steam_url}/api/storesearch/", {"term": name, "l": "english", "cc": "US"}) or {}
+        key = normalize(name)
+        best = None
+        best_ratio = MIN_NAME_SIMILARITY
+        for item in data.get("items") or []:
+            item_key = normalize(item.get("name", ""))
+            if item_key == key:
+                return int(item["id"])
+            ratio = difflib.SequenceMatcher(None, key, item_key).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = int(item["id"]), ratio
+        return best
+
+    def fetch_summary(self, appid):
+        data = self.get_json(f"{self.protondb_url}/api/v1/reports/summaries/{appid}.json") or {}
+        return {
+            "appid": appid,
+            "tier": data.get("tier") if data.get("tier") in TIERS else None,
+            "trending_tier": data.get("trendingTier") if data.get("trendingTier") in TIERS else None,
+            "best_tier": data.get("bestReportedTier") if data.get("bestReportedTier") in TIERS else None,
+            "confidence": data.get("confidence"),
+            "score": data.get("score"),
+            "reports": int(data.get("total") or 0),
+            "checked": time.time(),
+            "source": "api",
+        }
+
+    def lookup(self, game, appid, resolved):
+        # Runs on a worker thread, network only; returns (game, app id, resolved now, summary)
+        resolved_now = False
+        if appid is None and not resolved:
+            appid = self.resolve(game.name)
+            resolved_now = True
+        summary = self.fetch_summary(appid) if appid else None
+        return game, appid, resolved_now, summary
+
+    def refresh(self, games, force=False, progress=None):
+        # Looks up the games without fresh data in parallel, returns {game id: summary} and the number of failed lookups.
+        # The store is only used from the calling thread.
+        games = list(games) if force else self.cache.stale(games)
+        jobs = []
+        for game in games:
+            appid, checked = self.cache.appid(game)
+            # Name lookups are cached like summaries, a game without a Steam page is not searched again until they expire
+            resolved = checked is not None and fresh(checked) and not force
+            jobs.append((game, appid, resolved))
+        results = {}
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.lookup, *job) for job in jobs]
+            for done, future in enumerate(futures, 1):
+                try:
+                    game, appid, resolved_now, summary = future.result()
+                except Exception:
+                    failed += 1
+                else:
+                    with self.cache.store.transaction():
+                        if resolved_now:
+                            self.cache.store_appid(search_key(game), appid)
+                        if summary is not None:
+                            self.cache.store_summary(summary)
+                    results[game.id] = summary
+                if progress is not None:
+                    progress(done, len(futures))
+        return results, failed
+
+    def close(self):
+        self.session.close()
+
+def make_session(workers=LOOKUP_WORKERS):
+    # requests is only imported once a lookup is made, it is not needed to start the launcher
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    # One connection per worker and host, kept alive between lookups; rate limits and server errors are retried
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "ProtonLauncher"
+    return session
+
+def open_dump(path):
+    # Text stream of the reports of a ProtonDB data dump: the .tar.gz release, a .json.gz or a plain .json file
+    if tarfile.is_tarfile(path):
+        archive = tarfile.open(path, "r:*")
+        for member in archive:
+            if member.isfile() and member.name.endswith(".json"):
+                return io.TextIOWrapper(archive.extractfile(member), encoding="utf-8")
+        raise ValueError(f"{path} has no reports file")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def iter_reports(stream, chunk_size=DUMP_CHUNK):
+    # Reports of the JSON array one at a time, the dump is never loaded as a whole
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+    while True:
+        # Skip the separators between items
+        while position < len(buffer) and buffer[position] in " \t\r\n,[":
+            started = started or buffer[position] == "["
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        if position < len(buffer):
+            try:
+                report, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                position = end
+                if started and isinstance(report, dict):
+                    yield report
+                continue
+        if eof:
+            return
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+def report_fields(report):
+    # (app id, title, timestamp, verdict, rating) of a report in the current or the older dump format
+    app = report.get("app") or {}
+    responses = report.get("responses") or {}
+    appid = (app.get("steam") or {}).get("appId") or report.get("appId")
+    title = app.get("title") or report.get("title")
+    verdict = responses.get("verdict")
+    rating = report.get("rating")
+    try:
+        appid = int(appid)
+    except (TypeError, ValueError):
+        appid = None
+    return appid, title, report.get("timestamp") or 0, verdict, rating.lower() if isinstance(rating, str) else None
+
+def ingest_dump(store, path, progress=None):
+    # Offline summaries from a ProtonDB dump. Reports are counted per app; older dumps also carry a tier per report,
+    # the median one is used. Returns the number of apps stored.
+    apps = {}
+    with open_dump(path) as stream:
+        for count, report in enumerate(iter_reports(stream), 1):
+            appid, title, timestamp, verdict, rating = report_fields(report)
+            if appid is None:
+                continue
+            app = apps.setdefault(appid, {"title": None, "timestamp": 0, "reports": 0, "works": 0, "tiers": [0] * len(TIERS)})
+            app["reports"] += 1
+            if title and timestamp >= app["timestamp"]:
+                app["title"], app["timestamp"] = title, timestamp
+            if rating in TIERS:
+                app["tiers"][TIERS.index(rating)] += 1
+                app["works"] += rating != "borked"
+            elif verdict == "yes":
+                app["works"] += 1
+            if progress is not None and count % 10000 == 0:
+                progress(count)
+
+    cache = ProtonDBCache(store)
+    checked = time.time()
+    with store.transaction():
+        for appid, app in apps.items():
+            tier = None
+            rated = sum(app["tiers"])
+            if rated:
+                middle = rated // 2
+                for position, number in enumerate(app["tiers"]):
+                    middle -= number
+                    if middle < 0:
+                        tier = TIERS[position]
+                        break
+            cache.store_summary({
+                "appid": appid, "tier": tier, "trending_tier": None, "best_tier": None, "confidence": None,
+                "score": app["works"] / app["reports"], "reports": app["reports"], "checked": checked, "source": "dump",
+            })
+            if app["title"]:
+                # Titles from the dump resolve names offline, names found online are kept
+                store.conn.execute(
+                    "INSERT OR IGNORE INTO protondb_apps (name, appid, checked, source) VALUES (?, ?, ?, 'dump')",
+                    (normalize(app["title"]), appid, checked),
+                )
+    return len(apps)
@@ -0,0 +1,245 @@
+import os
+import re
+from bisect import bisect_left, insort
+from functools import lru_cache
+
+# Weight of a match in each field, the name counts the most
+NAME_WEIGHT = 3.0
+OTHER_WEIGHT = 1.0
+# Share of the trigrams of a search term that must match for a fuzzy hit, lets "witcer" find "The Witcher".
+# Trigrams are only used for terms that are not the start of any word.
+MIN_SIMILARITY = 0.5
+# Terms shorter than this match through a table of word prefixes kept up to date with the index, a one or two letter
+# search matches most of the library and a scan of the sorted words would visit all of them on every keystroke
+SHORT_TERM = 3
+# Most games a search without the index returns
+SCAN_LIMIT = 500
+# A reloaded library with at most this many changed games updates the index in place instead of rebuilding it
+SYNC_LIMIT = 200
+
+def tokenize(text):
+    return [token for token in re.split(r"[^0-9a-z]+", text.lower()) if token]
+
+# Words repeat a lot across a library ("the", "exe", the Proton builds), their trigrams are worked out once
+@lru_cache(maxsize=65536)
+def trigrams(token):
+    # Padded so the start and the end of a word count as well
+    padded = f" {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def game_fields(game):
+    # (tokens, weight) for every searchable field
+    return (
+        (tokenize(game.name), NAME_WEIGHT),
+        (tokenize(os.path.basename(game.path)), OTHER_WEIGHT),
+        (tokenize(game.proton), OTHER_WEIGHT),
+    )
+
+class SearchEntry:
+    # Copy of the searched fields of a game, so a whole index can be built on another thread
+    __slots__ = ("id", "name", "path", "proton")
+
+    def __init__(self, game):
+        self.id = game.id
+        self.name = game.name
+        self.path = game.path
+        self.proton = game.proton
+
+class SearchIndex:
+    # Trigram and word prefix index over name, executable and Proton build, updated one game at a time
+    def __init__(self):
+        # gram -> {game id: weight}
+        self._grams = {}
+        # Sorted (token, game id, weight) entries for prefix lookups
+        self._tokens = []
+        # prefix shorter than SHORT_TERM -> {game id: score}
+        self._short = {}
+        # prefix -> game ids ranked for a search of that prefix alone, kept in order as games are added and removed
+        self._short_ranked = {}
+        # game id -> (grams, token entries, name, short prefixes, searched fields) so a game can be removed without a scan
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, game):
+        if game.id in self._entries:
+            self.remove(game.id)
+        for entry in self.index_game(game):
+            insort(self._tokens, entry)
+
+    def index_game(self, game):
+        # Indexes the trigrams of the game and returns its prefix entries, still to be put into self._tokens
+        grams = {}
+        tokens = []
+        prefixes = {}
+        # The name comes first, so a trigram keeps the weight of the best field it appears in
+        for field_tokens, weight in game_fields(game):
+            for token in field_tokens:
+                tokens.append((token, game.id, weight))
+                for gram in trigrams(token):
+                    grams.setdefault(gram, weight)
+                for length in range(1, min(SHORT_TERM, len(token) + 1)):
+                    prefix = token[:length]
+                    score = weight * (2 if token == prefix else 1)
+                    if score > prefixes.get(prefix, 0.0):
+                        prefixes[prefix] = score
+        for gram, weight in grams.items():
+            self._grams.setdefault(gram, {})[game.id] = weight
+        self._entries[game.id] = (grams, tokens, game.name.lower(), tuple(prefixes), (game.name, game.path, game.proton))
+        for prefix, score in prefixes.items():
+            scores = self._short.setdefault(prefix, {})
+            scores[game.id] = score
+            ranked = self._short_ranked.get(prefix)
+            if ranked is not None:
+                insort(ranked, game.id, key=self.rank_key(scores))
+        return tokens
+
+    def remove(self, game_id):
+        entry = self._entries.get(game_id)
+        if entry is None:
+            return
+        grams, tokens, _, prefixes, _ = entry
+        for prefix in prefixes:
+            ids = self._short[prefix]
+            ranked = self._short_ranked.get(prefix)
+            if ranked is not None:
+                # The key needs the entry of the game, it is dropped below
+                key = self.rank_key(ids)
+                del ranked[bisect_left(ranked, key(game_id), key=key)]
+            del ids[game_id]
+            if not ids:
+                del self._short[prefix]
+                self._short_ranked.pop(prefix, None)
+        for gram in grams:
+            ids = self._grams[gram]
+            del ids[game_id]
+            if not ids:
+                del self._grams[gram]
+        for token in tokens:
+            position = bisect_left(self._tokens, token)
+            if position < len(self._tokens) and self._tokens[position] == token:
+                del self._tokens[position]
+        del self._entries[game_id]
+
+    def update(self, game):
+        self.add(game)
+
+    def clear(self):
+        self._grams = {}
+        self._tokens = []
+        self._short = {}
+        self._short_ranked = {}
+        self._entries = {}
+
+    def rebuild(self, games):
+        # Whole library at once, the prefix entries are sorted a single time
+        self.clear()
+        for game in games:
+            self._tokens.extend(self.index_game(game))
+        self._tokens.sort()
+        # One and two letter searches are ranked up front, typing the first letters never sorts the library
+        for prefix in self._short:
+            self.short_ranked(prefix)
+
+    def sync(self, games, limit=SYNC_LIMIT):
+        # Brings the index in line with the games by adding, replacing and removing single games. Nothing is changed
+        # and False is returned when more than limit games differ, a rebuild is cheaper then.
+        seen = set()
+        changed = []
+        for game in games:
+            seen.add(game.id)
+            entry = self._entries.get(game.id)
+            if entry is None or entry[4] != (game.name, game.path, game.proton):
+                changed.append(game)
+        removed = [game_id for game_id in self._entries if game_id not in seen]
+        if len(changed) + len(removed) > limit:
+            return False
+        for game_id in removed:
+            self.remove(game_id)
+        for game in changed:
+            self.add(game)
+        return True
+
+    def term_scores(self, term):
+        # {game id: score} of a term, callers must not modify it
+        if len(term) < SHORT_TERM:
+            return self._short.get(term, {})
+        scores = {}
+        # Word prefix matches, an exact word scores twice
+        position = bisect_left(self._tokens, (term,))
+        while position < len(self._tokens) and self._tokens[position][0].startswith(term):
+            token, game_id, weight = self._tokens[position]
+            score = weight * (2 if token == term else 1)
+            if score > scores.get(game_id, 0.0):
+                scores[game_id] = score
+            position += 1
+        if scores:
+            return scores
+
+        # Fuzzy matches on the trigrams of the term, also finds words in the middle of a name
+        grams = trigrams(term)
+        counts = {}
+        weights = {}
+        for gram in grams:
+            for game_id, weight in self._grams.get(gram, {}).items():
+                counts[game_id] = counts.get(game_id, 0) + 1
+                weights[game_id] = weights.get(game_id, 0.0) + weight
+        needed = len(grams) * MIN_SIMILARITY
+        for game_id, count in counts.items():
+            if count >= needed:
+                score = weights[game_id] / len(grams)
+                if score > scores.get(game_id, 0.0):
+                    scores[game_id] = score
+        return scores
+
+    def search(self, text, limit=None):
+        # Game ids ranked by score, every word of the search has to match; None for an empty search
+        terms = tokenize(text)
+        if not terms:
+            return None
+        if len(set(terms)) == 1 and len(terms[0]) < SHORT_TERM:
+            ranked = self.short_ranked(terms[0])
+            return ranked[:limit] if limit is not None else ranked
+        scores = None
+        # Longer words first, they usually match fewer games so the candidate set shrinks quickly
+        for term in sorted(set(terms), key=len, reverse=True):
+            found = self.term_scores(term)
+            if scores is None:
+                scores = found
+            else:
+                scores = {game_id: score + found[game_id] for game_id, score in scores.items() if game_id in found}
+            if not scores:
+                return []
+        ranked = self.rank(scores)
+        return ranked[:limit] if limit is not None else ranked
+
+    def rank_key(self, scores):
+        # Best score first, then by name
+        return lambda game_id: (-scores[game_id], self._entries[game_id][2], game_id)
+
+    def rank(self, scores):
+        return sorted(scores, key=self.rank_key(scores))
+
+    def short_ranked(self, prefix):
+        # Ranked once per prefix and then kept in order by add and remove, the list must not be modified
+        ranked = self._short_ranked.get(prefix)
+        if ranked is None:
+            ranked = self.rank(self._short.get(prefix, {}))
+            self._short_ranked[prefix] = ranked
+        return ranked
+
+def scan(games, text, limit=SCAN_LIMIT):
+    # Search without an index, used while a new index is being built: every word has to appear in one of the
+    # fields, the games keep their library order and at most limit of them are returned
+    terms = tokenize(text)
+    if not terms:
+        return None
+    found = []
+    for game in games:
+        haystack = f"{game.name} {os.path.basename(game.path)} {game.proton}".lower()
+        if all(term in haystack for term in terms):
+            found.append(game.id)
+            if len(found) >= limit:
+                break
+    return found
@@ -0,0 +1,291 @@
+import os
+import re
+import json
+from PyQt5 import QtCore, QtGui
+from thumbnails import thumbnail_key
+from cli import shortcut_command
+from launch_engine import wrapper_path
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+
+APPLICATIONS_DIR = os.path.expanduser("~/.local/share/applications")
+ICON_THEME_DIR = os.path.expanduser("~/.local/share/icons/hicolor")
+# Sizes rendered into the icon theme, the desktop picks one of them instead of decoding the full cover
+ICON_SIZES = (32, 48, 64, 128, 256)
+# {game id: [source key, rendered sizes]} of the icons in the theme, they are rendered again only when the image changes
+ICON_INDEX_PATH = os.path.join(app_dir, "shortcut-icons.json")
+# Entries written by the launcher carry the game id, so stale ones can be found and removed
+ID_KEY = "X-ProtonLauncher-Id"
+NAME_PREFIX = "protonlauncher-"
+# Only the start of an entry is read, a desktop entry is a few hundred bytes
+MAX_ENTRY_BYTES = 64 * 1024
+LAUNCH_PATTERN = re.compile(r" launch (\S+)$")
+# Entries of earlier versions carry no id key and ran bash with the launch script of the game, only those of games
+# in the library are taken over
+LEGACY_SCRIPT_PATTERN = re.compile(r'^Exec=bash "([^"]+\.sh)"$')
+
+class SyncResult:
+    def __init__(self):
+        self.written = []
+        self.removed = []
+        self.unchanged = 0
+        # Games whose icons were rendered by this sync
+        self.icons = 0
+        self.failed = []
+
+def icon_name(game_id):
+    return f"{NAME_PREFIX}{game_id}"
+
+def icon_file(size, game_id):
+    return os.path.join(ICON_THEME_DIR, f"{size}x{size}", "apps", f"{icon_name(game_id)}.png")
+
+def escape_value(value):
+    # Desktop entry strings are a single line with escaped backslashes
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace("\t", "\\t").replace("\r", "")
+
+def safe_file_name(name):
+    name = name.replace("/", "-").replace("\n", " ").strip().lstrip(".")
+    return name[:200]
+
+def desktop_entry(game, icon):
+    lines = [
+        "[Desktop Entry]",
+        "Version=1.0",
+        "Type=Application",
+        f"Name={escape_value(game.name)}",
+        f"Exec={shortcut_command()} launch {game.id}",
+    ]
+    if icon:
+        lines.append(f"Icon={icon}")
+    lines += ["Terminal=false", "Categories=Game;", f"{ID_KEY}={game.id}"]
+    return "\n".join(lines) + "\n"
+
+def read_entry(path, scripts=None):
+    # (game id, content) of a desktop entry, the id is None if the launcher did not write it.
+    # scripts ({launch script: game id}) identifies the entries of earlier versions.
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read(MAX_ENTRY_BYTES)
+    except OSError:
+        return None, None
+    lines = text.splitlines()
+    for line in lines:
+        if line.startswith(f"{ID_KEY}="):
+            return line[len(ID_KEY) + 1:].strip(), text
+    # Shortcuts created before the entries were marked are recognised by their command
+    for line in lines:
+        line = line.rstrip()
+        if line.startswith(f"Exec={shortcut_command()} "):
+            match = LAUNCH_PATTERN.search(line)
+            if match:
+                return match.group(1), text
+        match = LEGACY_SCRIPT_PATTERN.match(line)
+        if match and scripts and match.group(1) in scripts:
+            return scripts[match.group(1)], text
+    return None, text
+
+def scan_entries(directory, prefix="", scripts=None):
+    # {path: (game id, content)} of the entries the launcher wrote in a directory
+    found = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return found
+    for name in names:
+        if not name.endswith(".desktop") or not name.startswith(prefix):
+            continue
+        path = os.path.join(directory, name)
+        if os.path.islink(path) or not os.path.isfile(path):
+            continue
+        game_id, text = read_entry(path, scripts)
+        if game_id is not None:
+            found[path] = (game_id, text)
+    return found
+
+def write_entry(path, content):
+    # Written to a temporary file first so the desktop never reads a half written entry
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    # Desktop launchers are only trusted when executable
+    os.chmod(tmp_path, 0o755)
+    os.replace(tmp_path, path)
+
+def is_current(path, content, existing):
+    if path not in existing or existing[path][1] != content:
+        return False
+    try:
+        return os.stat(path).st_mode & 0o111 == 0o111
+    except OSError:
+        return False
+
+def render_icon(path):
+    # {size: QImage} square renditions of an image, decoded once at the largest size needed
+    reader = QtGui.QImageReader(path)
+    reader.setAutoTransform(True)
+    largest = max(ICON_SIZES)
+    source_size = reader.size()
+    if source_size.isValid() and (source_size.width() > largest or source_size.height() > largest):
+        reader.setScaledSize(source_size.scaled(largest, largest, QtCore.Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    image = image.convertToFormat(QtGui.QImage.Format_ARGB32)
+    renditions = {}
+    for size in ICON_SIZES:
+        # Small images are not scaled up past the next size, the theme scales them when needed
+        if size > max(image.width(), image.height()) and renditions:
+            break
+        scaled = image.scaled(size, size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        canvas = QtGui.QImage(size, size, QtGui.QImage.Format_ARGB32)
+        canvas.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(canvas)
+        painter.drawImage((size - scaled.width()) // 2, (size - scaled.height()) // 2, scaled)
+        painter.end()
+        renditions[size] = canvas
+    return renditions
+
+class IconRenditions:
+    # Icons of the games rendered into the hicolor theme of the user
+    def __init__(self, path=ICON_INDEX_PATH):
+        self.path = path
+        self.index = self.load()
+        self.changed = False
+        # Icon= values resolved by this sync
+        self._names = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.path)
+        # GTK compares the theme directory mtime against its icon cache
+        try:
+            os.utime(ICON_THEME_DIR)
+        except OSError:
+            pass
+        self.changed = False
+
+    def icon(self, game, result):
+        # Icon= value of a game, the theme name when its renditions exist, otherwise the image itself
+        if game.id in self._names:
+            return self._names[game.id]
+        name = self.resolve(game, result)
+        self._names[game.id] = name
+        return name
+
+    def resolve(self, game, result):
+        key = thumbnail_key(game.icon) if game.icon else None
+        if key is None:
+            self.remove(game.id)
+            return None
+        cached = self.index.get(game.id)
+        if cached and cached[0] == key and all(os.path.exists(icon_file(size, game.id)) for size in cached[1]):
+            return icon_name(game.id)
+
+        renditions = render_icon(game.icon)
+        if not renditions:
+            self.remove(game.id)
+            return game.icon
+        self.remove(game.id)
+        try:
+            for size, image in renditions.items():
+                path = icon_file(size, game.id)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                if not image.save(tmp_path, "PNG"):
+                    raise OSError(f"Could not write {path}")
+                os.replace(tmp_path, path)
+        except OSError as error:
+            result.failed.append(str(error))
+            return game.icon
+        self.index[game.id] = [key, sorted(renditions)]
+        self.changed = True
+        result.icons += 1
+        return icon_name(game.id)
+
+    def remove(self, game_id):
+        cached = self.index.pop(game_id, None)
+        if cached is None:
+            return
+        self.changed = True
+        for size in cached[1]:
+            try:
+                os.remove(icon_file(size, game_id))
+            except OSError:
+                pass
+
+    def prune(self, game_ids):
+        for game_id in [game_id for game_id in self.index if game_id not in game_ids]:
+            self.remove(game_id)
+
+def entry_path(directory, prefix, game, existing, wanted):
+    if prefix:
+        return os.path.join(directory, f"{prefix}{game.id}.desktop")
+    # Desktop entries are named after the game, a file of the user or another game with the same name is kept
+    name = safe_file_name(game.name) or game.id
+    path = os.path.join(directory, f"{name}.desktop")
+    if path in wanted or (os.path.lexists(path) and path not in existing):
+        path = os.path.join(directory, f"{name} ({game.id}).desktop")
+    return path
+
+def sync_shortcuts(games, desktop_dir=None, targets=None, applications_dir=APPLICATIONS_DIR):
+    # Brings the shortcuts of the library up to date. The games in targets (all of them when None) get an entry
+    # on the desktop and in the applications menu; games that already have one get it refreshed, and entries of
+    # games no longer in the library are removed. Entries that did not change are not written again.
+    result = SyncResult()
+    by_id = {game.id: game for game in games}
+    targets = set(by_id) if targets is None else set(targets) & set(by_id)
+    icons = IconRenditions()
+    # Earlier versions named the desktop entries after the game and left the id out, they are rewritten in place
+    scripts = {wrapper_path(game): game.id for game in games}
+
+    locations = [(applications_dir, NAME_PREFIX)]
+    if desktop_dir:
+        locations.append((desktop_dir, ""))
+    for directory, prefix in locations:
+        existing = scan_entries(directory, prefix, scripts)
+        present = {game_id for game_id, _ in existing.values()}
+        wanted = {}
+        for game_id in sorted(targets | (present & set(by_id))):
+            game = by_id[game_id]
+            wanted[entry_path(directory, prefix, game, existing, wanted)] = game
+
+        if wanted:
+            os.makedirs(directory, exist_ok=True)
+        for path, game in wanted.items():
+            content = desktop_entry(game, icons.icon(game, result))
+            if is_current(path, content, existing):
+                result.unchanged += 1
+                continue
+            try:
+                write_entry(path, content)
+                result.written.append(path)
+            except OSError as error:
+                result.failed.append(f"{path}: {error}")
+
+        for path in existing:
+            if path in wanted:
+                continue
+            try:
+                os.remove(path)
+                result.removed.append(path)
+            except OSError as error:
+                result.failed.append(f"{path}: {error}")
+
+    icons.prune(set(by_id))
+    try:
+        icons.save()
+    except OSError as error:
+        result.failed.append(str(error))
+    return result
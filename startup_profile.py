@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+def process_age():
+    # Seconds since the process was created, covers the interpreter and PyInstaller bootloader startup
+    try:
+        with open("/proc/self/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        start_ticks = int(fields[19])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class StartupProfiler:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.before_origin = process_age() if enabled else None
+        self.phases = []
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        self._depth += 1
+        entry = [name, self._depth - 1, start - self.origin, None]
+        self.phases.append(entry)
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            entry[3] = time.perf_counter() - start
+
+    def mark(self, name):
+        # Records a point in time, like the first paint of the window
+        self.phases.append([name, 0, time.perf_counter() - self.origin, None])
+
+    def report(self, stream=None):
+        stream = stream or sys.stderr
+        stream.write("ProtonLauncher startup profile\n")
+        if self.before_origin is not None:
+            stream.write(f"  {'process start -> main.py':<40} {self.before_origin * 1000:9.1f} ms\n")
+        for name, depth, offset, duration in self.phases:
+            label = "  " * depth + name
+            if duration is not None:
+                stream.write(f"  {label:<40} {duration * 1000:9.1f} ms  (at {offset * 1000:.1f} ms)\n")
+            else:
+                stream.write(f"  {label:<40} {'':>9}     (at {offset * 1000:.1f} ms)\n")
+        total = time.perf_counter() - self.origin + (self.before_origin or 0)
+        stream.write(f"  {'total':<40} {total * 1000:9.1f} ms\n")
+        stream.flush()
+
+profiler = StartupProfiler("--profile-startup" in sys.argv)
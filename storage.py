@@ -0,0 +1,294 @@
+import os
+import re
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from prefix_pool import prefix_path
+from launch_engine import game_dir, mangohud_log_dir, MANGOHUD_LOG_DIR, HASH_FILE
+from game_runtime import game_log_dir, LOG_DIR
+import tuning
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+home = os.path.expanduser("~")
+
+CACHE_PATH = os.path.join(app_dir, "disk-usage.json")
+SCAN_WORKERS = 8
+# Directory trees being removed are first renamed with this suffix, so the original path is free right away
+DELETING_SUFFIX = ".deleting-"
+# Prefixes created by the launcher, with the leftovers of an interrupted clone or removal
+PREFIX_PATTERN = re.compile(r"^\.proton-.+-prefix(\.cloning|\.deleting-[0-9a-f]+)?$")
+# Removal progress is reported every this many files
+PROGRESS_FILES = 256
+
+# Data kept for every game, with the label shown for it
+CATEGORIES = {
+    "prefix": "Prefix",
+    "shader_cache": "Shader cache",
+    "logs": "Logs",
+    "mangohud": "MangoHud logs",
+    "wrapper": "Launch script",
+}
+
+class DiskUsage:
+    __slots__ = ("size", "shared", "files")
+
+    def __init__(self, size=0, shared=0, files=0):
+        self.size = size
+        # Bytes in files hardlinked elsewhere (e.g. the prefix template), removing the tree does not free them
+        self.shared = shared
+        self.files = files
+
+    @property
+    def reclaimable(self):
+        return self.size - self.shared
+
+    def __add__(self, other):
+        return DiskUsage(self.size + other.size, self.shared + other.shared, self.files + other.files)
+
+def format_size(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def game_paths(game):
+    return {
+        "prefix": prefix_path(game),
+        "shader_cache": tuning.shader_cache_dir(game.id),
+        "logs": game_log_dir(game.id),
+        "mangohud": mangohud_log_dir(game.id),
+        "wrapper": game_dir(game),
+    }
+
+def file_usage(stat):
+    # [ctime, bytes, shared bytes] of a file. The ctime changes with every write and with the link count.
+    used = stat.st_blocks * 512
+    return [stat.st_ctime_ns, used, used if stat.st_nlink > 1 else 0]
+
+def read_dir(path, mtime):
+    # [mtime, bytes, shared bytes, files, sub directory names, {file name: file usage}] of the files directly
+    # inside a directory
+    size = shared = 0
+    subdirs = []
+    found = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # Symlinks are never followed, prefixes link to / through dosdevices
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                        continue
+                    usage = file_usage(entry.stat(follow_symlinks=False))
+                except OSError:
+                    continue
+                found[entry.name] = usage
+                size += usage[1]
+                shared += usage[2]
+    except OSError:
+        return None
+    return [mtime, size, shared, len(found), subdirs, found]
+
+def refresh_dir(path, entry):
+    # The entry of a directory whose mtime did not change, so no file was added, removed or renamed in it. It is
+    # not listed again, only its files are looked at to catch the ones written in place (logs, shader caches, saves).
+    # None if a file is gone after all.
+    found = entry[5]
+    changed = {}
+    for name, usage in found.items():
+        try:
+            current = file_usage(os.lstat(os.path.join(path, name)))
+        except OSError:
+            return None
+        if current != usage:
+            changed[name] = current
+    if not changed:
+        return entry
+    found = {**found, **changed}
+    return [entry[0], sum(usage[1] for usage in found.values()), sum(usage[2] for usage in found.values()), len(found),
+            entry[4], found]
+
+def scan_tree(root, previous=None):
+    # Usage of a directory tree and its per-directory entries. Directories whose mtime changed since the previous
+    # entries are listed again, the others keep their file list and only have their files checked.
+    previous = previous or {}
+    entries = {}
+    usage = DiskUsage()
+    pending = [""]
+    while pending:
+        relative = pending.pop()
+        path = os.path.join(root, relative) if relative else root
+        try:
+            mtime = os.lstat(path).st_mtime_ns
+        except OSError:
+            continue
+        entry = previous.get(relative)
+        if entry is not None and entry[0] == mtime:
+            entry = refresh_dir(path, entry)
+        else:
+            entry = None
+        if entry is None:
+            entry = read_dir(path, mtime)
+        if entry is None:
+            continue
+        entries[relative] = entry
+        usage.size += entry[1]
+        usage.shared += entry[2]
+        usage.files += entry[3]
+        pending.extend(os.path.join(relative, name) for name in entry[4])
+    return usage, entries
+
+class DiskUsageCache:
+    # Per-directory sizes of every scanned tree, stored between runs: the sizes of the last run are shown until a
+    # tree is measured again, and a removal knows how many files to expect. Only one thread may use it at a time.
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.loaded = False
+        # root -> {relative directory: entry}
+        self.trees = {}
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.path, "r") as f:
+                self.trees = json.load(f).get("trees", {})
+        except (OSError, ValueError):
+            self.trees = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"trees": self.trees}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def usage(self):
+        # {root: DiskUsage} of every tree as it was last measured
+        self.load()
+        results = {}
+        for root, entries in self.trees.items():
+            results[root] = DiskUsage(sum(entry[1] for entry in entries.values()), sum(entry[2] for entry in entries.values()),
+                                      sum(entry[3] for entry in entries.values()))
+        return results
+
+    def scan(self, roots, workers=SCAN_WORKERS, progress=None):
+        # {root: DiskUsage} for the trees, scanned in parallel starting from their cached entries
+        self.load()
+        roots = sorted(set(roots))
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(scan_tree, root, self.trees.get(root)) for root in roots]
+            for done, (root, future) in enumerate(zip(roots, futures), 1):
+                usage, entries = future.result()
+                # Missing trees are kept as empty ones, a game without logs is fully known on the next run too
+                self.trees[root] = entries
+                results[root] = usage
+                if progress is not None:
+                    progress(done, len(roots))
+        return results
+
+    def forget(self, path):
+        self.load()
+        for root in [root for root in self.trees if root == path or root.startswith(path + os.sep)]:
+            del self.trees[root]
+
+    def files(self, path):
+        # Number of files last seen in a tree, 0 if it was never scanned
+        self.load()
+        return sum(entry[3] for entry in self.trees.get(path, {}).values())
+
+def orphans(games):
+    # (category, path) of the data no game in the library uses any more
+    found = []
+    prefixes = {prefix_path(game) for game in games}
+    prefixes |= {f"{path}.cloning" for path in prefixes}
+    try:
+        names = sorted(os.listdir(home))
+    except OSError:
+        names = []
+    for name in names:
+        path = os.path.join(home, name)
+        if PREFIX_PATTERN.match(name) and path not in prefixes and os.path.isdir(path) and not os.path.islink(path):
+            found.append(("prefix", path))
+
+    # Launch script directories are recognised by their content, other directories of the app are left alone
+    wrappers = {game_dir(game) for game in games}
+    try:
+        entries = sorted(os.scandir(app_dir), key=lambda entry: entry.name)
+    except OSError:
+        entries = []
+    for entry in entries:
+        if entry.path in wrappers or not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            names = os.listdir(entry.path)
+        except OSError:
+            continue
+        if HASH_FILE in names or any(name.endswith(".sh") for name in names):
+            found.append(("wrapper", entry.path))
+
+    ids = {game.id for game in games}
+    for category, directory in (("shader_cache", tuning.SHADER_CACHE_DIR), ("logs", LOG_DIR), ("mangohud", MANGOHUD_LOG_DIR)):
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for name in names:
+            if name not in ids:
+                found.append((category, os.path.join(directory, name)))
+    return found
+
+def move_aside(path):
+    # Renames a tree before it is removed, returns the new path or None if there is nothing to remove
+    if not os.path.lexists(path):
+        return None
+    if DELETING_SUFFIX in os.path.basename(path):
+        return path
+    target = f"{path}{DELETING_SUFFIX}{uuid.uuid4().hex[:8]}"
+    try:
+        os.rename(path, target)
+    except OSError:
+        return path
+    return target
+
+def remove_tree(path, progress=None, removed=0):
+    # Deletes a tree bottom up without following symlinks, returns (files removed, paths that could not be removed)
+    failed = []
+    if os.path.islink(path) or not os.path.isdir(path):
+        try:
+            os.unlink(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError:
+            failed.append(path)
+        return removed, failed
+
+    for root, dirs, files in os.walk(path, topdown=False):
+        for name in files:
+            try:
+                os.unlink(os.path.join(root, name))
+            except OSError:
+                failed.append(os.path.join(root, name))
+                continue
+            removed += 1
+            if progress is not None and removed % PROGRESS_FILES == 0:
+                progress(removed)
+        for name in dirs:
+            directory = os.path.join(root, name)
+            try:
+                if os.path.islink(directory):
+                    os.unlink(directory)
+                else:
+                    os.rmdir(directory)
+            except OSError:
+                failed.append(directory)
+    try:
+        os.rmdir(path)
+    except OSError:
+        failed.append(path)
+    if progress is not None:
+        progress(removed)
+    return removed, failed
@@ -0,0 +1,147 @@
+from PyQt5 import QtCore
+import storage
+
+class _StorageSignals(QtCore.QObject):
+    # {root: DiskUsage} saved by an earlier run
+    loaded = QtCore.pyqtSignal(object)
+    scan_progress = QtCore.pyqtSignal(int, int)
+    # {root: DiskUsage}
+    scanned = QtCore.pyqtSignal(object)
+    # files removed, files expected (0 if unknown), path being removed
+    remove_progress = QtCore.pyqtSignal(int, int, str)
+    # original paths, paths that could not be removed
+    removed = QtCore.pyqtSignal(object, object)
+
+class _LoadTask(QtCore.QRunnable):
+    def __init__(self, cache, signals):
+        super().__init__()
+        self.cache = cache
+        self.signals = signals
+
+    def run(self):
+        self.signals.loaded.emit(self.cache.usage())
+
+class _ScanTask(QtCore.QRunnable):
+    def __init__(self, cache, roots, signals):
+        super().__init__()
+        self.cache = cache
+        self.roots = roots
+        self.signals = signals
+
+    def run(self):
+        results = self.cache.scan(self.roots, progress=self.signals.scan_progress.emit)
+        try:
+            self.cache.save()
+        except OSError:
+            pass
+        self.signals.scanned.emit(results)
+
+class _RemoveTask(QtCore.QRunnable):
+    def __init__(self, cache, targets, signals):
+        super().__init__()
+        self.cache = cache
+        # (original path, renamed path)
+        self.targets = targets
+        self.signals = signals
+
+    def run(self):
+        expected = sum(self.cache.files(original) for original, _ in self.targets)
+        removed = 0
+        failed = []
+        for original, path in self.targets:
+            progress = lambda done, original=original: self.signals.remove_progress.emit(done, expected, original)
+            removed, failed_paths = storage.remove_tree(path, progress, removed)
+            failed.extend(failed_paths)
+            self.cache.forget(original)
+            self.cache.forget(path)
+        try:
+            self.cache.save()
+        except OSError:
+            pass
+        self.signals.removed.emit([original for original, _ in self.targets], failed)
+
+class StorageManager(QtCore.QObject):
+    # Measures and removes the prefixes, shader caches and logs of the games on a worker thread
+    scan_progress = QtCore.pyqtSignal(int, int)
+    scanned = QtCore.pyqtSignal()
+    remove_progress = QtCore.pyqtSignal(int, int, str)
+    removed = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cache = storage.DiskUsageCache()
+        # Last known usage of every scanned tree, the one saved by the last run until it is measured again
+        self.usage = {}
+        # Trees measured since the start
+        self.measured = set()
+        self.pending = set()
+        self.removing = set()
+
+        # A single worker, so the cache is only ever used by one thread; each scan is parallel on its own
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.signals = _StorageSignals()
+        self.signals.loaded.connect(self.on_loaded)
+        self.signals.scan_progress.connect(self.scan_progress)
+        self.signals.scanned.connect(self.on_scanned)
+        self.signals.remove_progress.connect(self.remove_progress)
+        self.signals.removed.connect(self.on_removed)
+        self.pool.start(_LoadTask(self.cache, self.signals))
+
+    def on_loaded(self, results):
+        for root, usage in results.items():
+            if root not in self.removing:
+                self.usage.setdefault(root, usage)
+        self.scanned.emit()
+
+    def scan(self, roots):
+        roots = [root for root in roots if root not in self.pending and root not in self.removing]
+        if not roots:
+            return
+        self.pending.update(roots)
+        self.pool.start(_ScanTask(self.cache, roots, self.signals))
+
+    def scan_games(self, games):
+        self.scan([path for game in games for path in storage.game_paths(game).values()])
+
+    def refresh_games(self, games):
+        # Measures the trees of the games that were not measured since the start
+        self.scan([path for game in games for path in storage.game_paths(game).values() if path not in self.measured])
+
+    def on_scanned(self, results):
+        self.pending.difference_update(results)
+        self.measured.update(results)
+        self.usage.update(results)
+        self.scanned.emit()
+
+    def game_usage(self, game):
+        # {category: DiskUsage} of a game, None until all of its trees were scanned once
+        paths = storage.game_paths(game)
+        if any(path not in self.usage for path in paths.values()):
+            return None
+        return {category: self.usage[path] for category, path in paths.items()}
+
+    def is_busy(self):
+        return bool(self.pending or self.removing)
+
+    def remove(self, paths):
+        # The trees are renamed right away and deleted in the background
+        targets = []
+        for path in paths:
+            if path in self.removing:
+                continue
+            renamed = storage.move_aside(path)
+            if renamed is not None:
+                targets.append((path, renamed))
+                self.removing.add(path)
+            self.usage.pop(path, None)
+            self.measured.discard(path)
+        if targets:
+            self.pool.start(_RemoveTask(self.cache, targets, self.signals))
+        return len(targets)
+
+    def on_removed(self, paths, failed):
+        self.removing.difference_update(paths)
+        for path in paths:
+            self.usage.pop(path, None)
+        self.removed.emit(paths, failed)
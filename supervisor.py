@@ -0,0 +1,211 @@
+import os
+import time
+import signal
+from PyQt5 import QtCore
+from launch_history import LaunchRecord, parse_marker
+from tuning import launch_settings
+from game_runtime import RotatingLog, game_log_dir, write_state, clear_state, read_state, find_game_processes, exe_name
+
+# Seconds to wait after SIGTERM before the game is killed
+STOP_TIMEOUT = 10
+# The first game process is looked for in /proc this often, for at most FIRST_PROCESS_TIMEOUT seconds
+PROBE_INTERVAL_MS = 250
+FIRST_PROCESS_TIMEOUT = 600
+
+class RunningGame:
+    __slots__ = ("game_id", "name", "process", "log", "started", "finished", "state", "pid", "exit_code",
+                 "record", "exe_name", "pending", "probing", "steps", "step", "cancelled")
+
+    def __init__(self, game, process, log):
+        self.game_id = game.id
+        self.name = game.name
+        self.process = process
+        self.log = log
+        self.started = time.monotonic()
+        self.finished = None
+        self.state = "Starting"
+        self.pid = None
+        self.exit_code = None
+        profile, settings = launch_settings(game)
+        self.record = LaunchRecord(game.id, time.time(), game.proton, profile=profile, tuning=settings)
+        self.exe_name = exe_name(game)
+        self.pending = b""
+        self.probing = True
+        self.steps = []
+        self.step = None
+        self.cancelled = False
+
+    @property
+    def active(self):
+        return self.finished is None
+
+    @property
+    def uptime(self):
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+class GameSupervisor(QtCore.QObject):
+    # Emitted with the game id whenever a game starts, stops or changes state
+    state_changed = QtCore.pyqtSignal(str)
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.games = {}
+        self.probe_timer = QtCore.QTimer(self)
+        self.probe_timer.setInterval(PROBE_INTERVAL_MS)
+        self.probe_timer.timeout.connect(self.probe_processes)
+
+    def launch(self, game, steps):
+        # Runs the LaunchSteps of the launch engine one after the other
+        current = self.games.get(game.id)
+        if current is not None and current.active:
+            return False
+
+        log = RotatingLog(game_log_dir(game.id))
+        log.open()
+        process = QtCore.QProcess(self)
+        process.setProcessChannelMode(QtCore.QProcess.MergedChannels)
+        running = RunningGame(game, process, log)
+        running.steps = list(steps)
+        running.record.mark("script_start")
+        self.games[game.id] = running
+
+        process.readyReadStandardOutput.connect(lambda: self.on_output(running))
+        process.started.connect(lambda: self.on_started(running))
+        process.finished.connect(lambda code, status: self.on_finished(running, code, status))
+        process.errorOccurred.connect(lambda error: self.on_error(running, error))
+
+        self.start_step(running)
+        self.state_changed.emit(game.id)
+        return True
+
+    def start_step(self, running):
+        running.step = running.steps.pop(0)
+        running.record.mark(running.step.phase)
+        environment = QtCore.QProcessEnvironment.systemEnvironment()
+        for key, value in running.step.environment.items():
+            environment.insert(key, value)
+        running.process.setProcessEnvironment(environment)
+        # setsid puts the game in its own process group, so stop/kill also reach wine and its children
+        running.process.start("setsid", running.step.argv)
+
+    def running(self, game_id):
+        return self.games.get(game_id)
+
+    def is_running(self, game_id):
+        running = self.games.get(game_id)
+        return running is not None and running.active
+
+    def active_games(self):
+        return [running for running in self.games.values() if running.active]
+
+    def stop(self, game_id):
+        running = self.games.get(game_id)
+        if running is None or not running.active:
+            return
+        running.state = "Stopping"
+        running.cancelled = True
+        self.signal_group(running, signal.SIGTERM)
+        QtCore.QTimer.singleShot(STOP_TIMEOUT * 1000, lambda: self.kill(game_id) if running.active else None)
+        self.state_changed.emit(game_id)
+
+    def kill(self, game_id):
+        running = self.games.get(game_id)
+        if running is None or not running.active:
+            return
+        running.cancelled = True
+        self.signal_group(running, signal.SIGKILL)
+
+    def signal_group(self, running, signum):
+        if running.pid is None:
+            running.process.kill()
+            return
+        try:
+            os.killpg(running.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def on_output(self, running):
+        data = bytes(running.process.readAllStandardOutput())
+        running.log.write(data)
+        # Pick up the phase markers printed by the launch script
+        lines = (running.pending + data).split(b"\n")
+        running.pending = lines.pop()
+        for line in lines:
+            marker = parse_marker(line.strip())
+            if marker is not None:
+                running.record.mark(*marker)
+
+    def on_started(self, running):
+        running.pid = int(running.process.processId())
+        running.state = "Running"
+        # Lets "protonlauncher status" and shortcuts see games started from the window
+        write_state(running.game_id, running.pid, running.name, "launcher")
+        self.probe_timer.start()
+        self.state_changed.emit(running.game_id)
+
+    def on_finished(self, running, code, status):
+        self.on_output(running)
+        if running.step.done_phase:
+            running.record.mark(running.step.done_phase)
+        if running.steps and not running.cancelled:
+            # "proton init" exits with an error once the prefix is ready, the next step runs regardless
+            self.start_step(running)
+            return
+        running.log.close()
+        clear_state(running.game_id)
+        running.finished = time.monotonic()
+        running.exit_code = code
+        running.probing = False
+        if status == QtCore.QProcess.CrashExit:
+            running.state = "Crashed"
+        else:
+            running.state = f"Exited (code {code})"
+        running.record.exit_code = code
+        running.record.mark("exit")
+        self.history.record(running.record)
+        self.state_changed.emit(running.game_id)
+
+    def probe_processes(self):
+        # One pass over /proc for every game still waiting for its first process
+        waiting = {}
+        for running in self.games.values():
+            if not running.probing or running.pid is None:
+                continue
+            if time.monotonic() - running.started > FIRST_PROCESS_TIMEOUT:
+                running.probing = False
+                continue
+            waiting[running.pid] = running
+        if not waiting:
+            self.probe_timer.stop()
+            return
+
+        for process_group in find_game_processes({pid: running.exe_name for pid, running in waiting.items()}):
+            running = waiting[process_group]
+            running.record.mark("first_process")
+            running.probing = False
+            self.state_changed.emit(running.game_id)
+
+    def on_error(self, running, error):
+        if error != QtCore.QProcess.FailedToStart:
+            return
+        running.log.close()
+        running.finished = time.monotonic()
+        running.state = f"Failed to start: {running.process.errorString()}"
+        self.state_changed.emit(running.game_id)
+
+    def describe(self, game_id):
+        running = self.games.get(game_id)
+        if running is None or not running.active:
+            # Games started from a shortcut run outside of this window
+            state = read_state(game_id)
+            if state is not None:
+                uptime = time.strftime("%H:%M:%S", time.gmtime(time.time() - state["started"]))
+                return f"Running from a shortcut (PID {state['pid']}, uptime {uptime})"
+        if running is None:
+            return "Not running"
+        uptime = time.strftime("%H:%M:%S", time.gmtime(running.uptime))
+        if running.pid is not None:
+            return f"{running.state} (PID {running.pid}, uptime {uptime})"
+        return running.state
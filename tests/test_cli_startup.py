@@ -0,0 +1,36 @@
+import os
+import sys
+import subprocess
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The startup time itself is measured by benchmarks/bench_library.py, a wall clock budget is no test on a busy machine
+
+def run(argv, home):
+    return subprocess.run([sys.executable] + argv, env=dict(os.environ, HOME=str(home)), cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+
+@pytest.fixture
+def game_id(tmp_path):
+    # A library with one game in a throw-away home
+    script = (
+        "import os; from games import Game; from game_store import GameStore, DB_PATH\n"
+        "os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)\n"
+        "game = Game(name='Startup Game', path='/games/startup/game.exe', prefix='/games/startup/prefix',"
+        " proton='GE-Proton9-1', icon='')\n"
+        "store = GameStore(); store.save_games([game]); store.close(); print(game.id)\n"
+    )
+    return run(["-c", script], tmp_path).stdout.strip()
+
+def test_shortcut_command_runs_cli():
+    import cli
+
+    assert cli.shortcut_command().endswith(f'"{os.path.join(ROOT, "cli.py")}"')
+
+def test_import_leaves_qt_out(tmp_path):
+    output = run(["-c", "import sys, cli; print('PyQt5' in sys.modules, 'numpy' in sys.modules)"], tmp_path)
+    assert output.stdout.split() == ["False", "False"]
+
+def test_commands_leave_qt_out(tmp_path, game_id):
+    script = f"import sys, cli; cli.main(['list']); cli.main(['status', {game_id!r}]); print('PyQt5' in sys.modules)"
+    assert run(["-c", script], tmp_path).stdout.splitlines()[-1] == "False"
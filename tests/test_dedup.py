@@ -0,0 +1,48 @@
+import os
+import shutil
+import dedup
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+def copy_clone(source, target):
+    # The test filesystem can not reflink, a copy keeps the same inode handling as a clone
+    tmp_path = f"{target}{dedup.TMP_SUFFIX}"
+    shutil.copyfile(source, tmp_path)
+    shutil.copystat(target, tmp_path)
+    os.replace(tmp_path, target)
+
+def test_later_runs_skip_files_already_reflinked(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, "reflink", copy_clone)
+    data = os.urandom(dedup.MIN_SIZE * 4)
+    roots = [str(tmp_path / name) for name in ("first", "second", "third")]
+    for root in roots:
+        write(os.path.join(root, "pfx", "drive_c", "windows", "system32", "d3d11.dll"), data)
+    index_path = str(tmp_path / "dedup.db")
+
+    result = dedup.dedup_roots(roots, index_path=index_path)
+    assert (result.reflinked, result.saved) == (2, 2 * len(data))
+
+    # Nothing changed, nothing is hashed, cloned or counted again
+    result = dedup.dedup_roots(roots, index_path=index_path)
+    assert (result.hashed, result.reflinked, result.saved) == (0, 0, 0)
+
+    # A new twin is cloned from the same source as the others
+    roots.append(str(tmp_path / "fourth"))
+    write(os.path.join(roots[-1], "pfx", "drive_c", "windows", "system32", "d3d11.dll"), data)
+    result = dedup.dedup_roots(roots, index_path=index_path)
+    assert (result.reflinked, result.saved) == (1, len(data))
+
+    # A source written in place no longer shares its blocks, its twins are cloned again
+    index = dedup.HashIndex(index_path)
+    sources = [path for (path,) in index.conn.execute("SELECT path FROM files WHERE linked_to IS NULL")]
+    index.close()
+    assert len(sources) == 1
+    with open(sources[0], "r+b") as f:
+        f.write(data[:16])
+    stat = os.stat(sources[0])
+    os.utime(sources[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    result = dedup.dedup_roots(roots, index_path=index_path)
+    assert (result.reflinked, result.saved) == (3, 3 * len(data))
@@ -0,0 +1,72 @@
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import pytest
+from PyQt5 import QtCore, QtWidgets
+from game_model import GameListModel, GameFilterModel, GameRole
+from games import Game
+from proton_registry import ProtonRegistry
+
+NAMES = ["Alpha Centauri", "Baldurs Gate", "Celeste", "Dead Cells", "Elden Ring", "Factorio", "Grim Fandango",
+         "Hollow Knight", "Into the Breach", "Journey"]
+
+class Thumbnails(QtCore.QObject):
+    # The model only asks for icons when a view paints them
+    thumbnail_ready = QtCore.pyqtSignal(str)
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+@pytest.fixture
+def models(app, tmp_path):
+    model = GameListModel(Thumbnails(), "", ProtonRegistry(str(tmp_path)))
+    filter_model = GameFilterModel(model)
+    model.set_games(Game(name=name, path=f"/games/{name}/game.exe", prefix=f"/games/{name}/prefix",
+                         proton="GE-Proton9-1", icon="") for name in NAMES)
+    return model, filter_model
+
+def filter_names(filter_model):
+    return [filter_model.game_at(row).name for row in range(filter_model.rowCount())]
+
+def test_update_games_signals_only_the_edited_rows(models):
+    model, filter_model = models
+    changes = []
+    model.dataChanged.connect(lambda first, last, roles: changes.append((first.row(), last.row(), set(roles))))
+    indexed = []
+    index_game = filter_model.index_game
+    filter_model.index_game = lambda game: (indexed.append(game.name), index_game(game))
+    games = model.games()
+
+    model.update_games({games[0].id: {"proton": "Experimental"}, games[9].id: {"proton": "Experimental"},
+                        games[4].id: {"mangohud": True}, games[5].id: {"mangohud": True}})
+    roles = {GameRole, QtCore.Qt.ToolTipRole, QtCore.Qt.ForegroundRole}
+    assert sorted(changes) == [(0, 0, roles), (4, 5, {GameRole}), (9, 9, roles)]
+    assert sorted(indexed) == ["Alpha Centauri", "Elden Ring", "Factorio", "Journey"]
+
+    filter_model.set_query("experimental")
+    assert filter_names(filter_model)[:2] == ["Alpha Centauri", "Journey"]
+
+def test_remove_games_on_rows_apart(models):
+    model, filter_model = models
+    games = list(model.games())
+    kept = QtCore.QPersistentModelIndex(filter_model.index(8))
+    layouts = []
+    filter_model.layoutChanged.connect(lambda: layouts.append(True))
+
+    model.remove_games([games[row].id for row in (0, 2, 3, 7, 9)])
+    remaining = ["Baldurs Gate", "Elden Ring", "Factorio", "Grim Fandango", "Into the Breach"]
+    assert [game.name for game in model.games()] == remaining
+    assert [model.row_of(game.id) for game in model.games()] == list(range(5))
+    assert all(model.row_of(games[row].id) is None for row in (0, 2, 3, 7, 9))
+    # One filter update for the whole batch, and the selection follows its game
+    assert len(layouts) == 1
+    assert filter_names(filter_model) == remaining
+    assert filter_model.game_at(kept.row()).name == "Into the Breach"
+
+    # The search index no longer knows the removed games
+    for name in NAMES:
+        filter_model.set_query(name)
+        found = filter_names(filter_model)
+        assert (name in found) == (name in remaining)
+    filter_model.set_query("")
+    assert filter_names(filter_model) == remaining
@@ -0,0 +1,64 @@
+import os
+import time
+import perf_reports
+from games import Game
+from game_store import GameStore
+from launch_history import LaunchHistory, LaunchRecord
+
+def write_log(directory, started, frames=200):
+    name = f"game_{time.strftime('%Y-%m-%d_%H-%M-%S', time.localtime(started))}.csv"
+    lines = ["os,cpu,gpu", "Linux,CPU,GPU", "fps,frametime,cpu_load"]
+    lines += [f"60,{16.6 + (number % 3)},20" for number in range(frames)]
+    with open(os.path.join(directory, name), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+def test_sessions_keep_the_settings_of_their_launch(tmp_path, monkeypatch):
+    log_dir = tmp_path / "mangohud"
+    log_dir.mkdir()
+    monkeypatch.setattr(perf_reports, "mangohud_log_dir", lambda game_id: str(log_dir))
+    store = GameStore(str(tmp_path / "games.db"), str(tmp_path / "games.json"))
+    game = Game(name="Portal 2", path="/games/portal2/portal2.exe", prefix="/games/portal2/prefix",
+                proton="GE-Proton9-2", icon="", profile="Quality")
+    history = LaunchHistory(store)
+    # Launched first without recorded settings, like a launch of an older version, then with another profile
+    first = time.time() - 7200
+    second = time.time() - 3600
+    history.record(LaunchRecord(game.id, first, "GE-Proton9-1"))
+    history.record(LaunchRecord(game.id, second, "GE-Proton9-1", profile="Performance", tuning="sync fsync, gamemode"))
+    write_log(str(log_dir), first + 10)
+    write_log(str(log_dir), second + 10)
+
+    # The game was switched to another profile after playing, the ingest happens later
+    assert perf_reports.PerfSessions(store).ingest(game, "Quality", "defaults") == 2
+    sessions = sorted(perf_reports.PerfSessions(store).sessions(game.id), key=lambda session: session["started"])
+    assert [(session["proton"], session["profile"], session["tuning"]) for session in sessions] == [
+        ("GE-Proton9-1", "Quality", "defaults"),
+        ("GE-Proton9-1", "Performance", "sync fsync, gamemode"),
+    ]
+    assert history.history(game.id)[0].profile == "Performance"
+    store.close()
+
+def test_log_growing_after_its_first_ingest(tmp_path, monkeypatch):
+    log_dir = tmp_path / "mangohud"
+    log_dir.mkdir()
+    monkeypatch.setattr(perf_reports, "mangohud_log_dir", lambda game_id: str(log_dir))
+    store = GameStore(str(tmp_path / "games.db"), str(tmp_path / "games.json"))
+    game = Game(name="Portal 2", path="/games/portal2/portal2.exe", prefix="/games/portal2/prefix",
+                proton="GE-Proton9-2", icon="")
+    sessions = perf_reports.PerfSessions(store)
+    started = time.time() - 60
+    # Read while the game was still starting, too short to be a session
+    write_log(str(log_dir), started, frames=50)
+    assert sessions.ingest(game, "Quality", "defaults") == 0
+    assert sessions.sessions(game.id) == []
+    assert sessions.ingest(game, "Quality", "defaults") == 0
+
+    write_log(str(log_dir), started, frames=500)
+    assert sessions.ingest(game, "Quality", "defaults") == 1
+    assert [session["frames"] for session in sessions.sessions(game.id)] == [500]
+    # Read again, the session is replaced and not added twice
+    write_log(str(log_dir), started, frames=800)
+    assert sessions.ingest(game, "Quality", "defaults") == 1
+    assert [session["frames"] for session in sessions.sessions(game.id)] == [800]
+    assert sessions.pending_logs(game.id) == []
+    store.close()
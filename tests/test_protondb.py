@@ -0,0 +1,156 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+import protondb
+from config import Config
+from games import Game
+from game_store import GameStore
+
+# Steam store items and ProtonDB summaries served by the stub
+STORE_ITEMS = {
+    "Portal 2": [{"id": 620, "name": "Portal 2"}],
+    "Half Life": [{"id": 70, "name": "Half-Life"}, {"id": 220, "name": "Half-Life 2"}],
+}
+SUMMARIES = {
+    620: {"tier": "platinum", "trendingTier": "gold", "bestReportedTier": "platinum", "confidence": "strong",
+          "score": 0.9, "total": 120},
+    70: {"tier": "gold", "trendingTier": "gold", "bestReportedTier": "platinum", "confidence": "good",
+         "score": 0.8, "total": 40},
+}
+# Summaries of this app answer after SLOW_SECONDS
+SLOW_APPID = 777
+SLOW_SECONDS = 1.0
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.requests.append(url.path)
+        if url.path == "/api/storesearch/":
+            term = parse_qs(url.query).get("term", [""])[0]
+            self.reply(200, {"total": 0, "items": STORE_ITEMS.get(term, [])})
+            return
+        prefix = "/api/v1/reports/summaries/"
+        if url.path.startswith(prefix) and url.path.endswith(".json"):
+            appid = int(url.path[len(prefix):-len(".json")])
+            if appid == SLOW_APPID:
+                time.sleep(SLOW_SECONDS)
+            if appid in SUMMARIES:
+                self.reply(200, SUMMARIES[appid])
+                return
+        self.reply(404, {})
+
+    def reply(self, status, data):
+        body = json.dumps(data).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # The client gave up on a slow answer
+            pass
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.block_on_close = False
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(server, tmp_path, monkeypatch):
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"protondb_url": url, "steam_store_url": url}))
+    monkeypatch.setattr(protondb, "config", Config(str(path)))
+    store = GameStore(str(tmp_path / "games.db"), str(tmp_path / "games.json"))
+    client = protondb.ProtonDBClient(store, workers=4)
+    yield client
+    client.close()
+    store.close()
+
+def game(name, appid=None):
+    return Game(name=name, path=f"/games/{name}/game.exe", prefix=f"/games/{name}/prefix", proton="GE-Proton9-1",
+                icon="", appid=appid)
+
+def test_hit(client, server):
+    portal = game("Portal 2")
+    results, failed = client.refresh([portal])
+    assert failed == 0
+    summary = results[portal.id]
+    assert (summary["appid"], summary["tier"], summary["trending_tier"], summary["reports"]) == (620, "platinum", "gold", 120)
+    assert client.cache.appid(portal)[0] == 620
+    assert client.cache.game_summary(portal)["confidence"] == "strong"
+    assert server.requests == ["/api/storesearch/", "/api/v1/reports/summaries/620.json"]
+
+def test_close_name_match(client):
+    # No exact title, the closest one above MIN_NAME_SIMILARITY is taken
+    half_life = game("Half Life")
+    results, failed = client.refresh([half_life])
+    assert failed == 0
+    assert results[half_life.id]["appid"] == 70
+
+def test_404(client):
+    # ProtonDB has no summary for games without reports, that is a result and not a failure
+    unknown = game("Unknown Game", appid=999)
+    results, failed = client.refresh([unknown])
+    assert failed == 0
+    assert results[unknown.id]["reports"] == 0
+    assert protondb.describe(client.cache.game_summary(unknown)) == "no reports"
+
+def test_no_store_match(client, server):
+    missing = game("Not On Steam")
+    results, failed = client.refresh([missing])
+    assert (results, failed) == ({missing.id: None}, 0)
+    assert client.cache.summaries([missing])[missing.id]["appid"] is None
+    # The failed name lookup is cached as well
+    server.requests.clear()
+    assert client.refresh([missing]) == ({}, 0)
+    assert server.requests == []
+
+def test_timeout(client, monkeypatch):
+    monkeypatch.setattr(protondb, "REQUEST_TIMEOUT", 0.2)
+    slow = game("Slow Game", appid=SLOW_APPID)
+    portal = game("Portal 2")
+    start = time.monotonic()
+    results, failed = client.refresh([slow, portal])
+    # The slow game fails after its retries, the other one is still looked up
+    assert failed == 1
+    assert slow.id not in results and results[portal.id]["tier"] == "platinum"
+    assert client.cache.game_summary(slow) is None
+    assert time.monotonic() - start < 10
+
+def test_batch_and_cache(client, server, monkeypatch):
+    games = [game("Portal 2"), game("Half Life"), game("Unknown Game", appid=999), game("Not On Steam")]
+    progress = []
+    results, failed = client.refresh(games, progress=lambda done, total: progress.append((done, total)))
+    assert failed == 0 and set(results) == {item.id for item in games}
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+    # Fresh data is not looked up again, unless forced; a known app id is not searched again either way
+    server.requests.clear()
+    assert client.refresh(games) == ({}, 0)
+    assert server.requests == []
+    results, _ = client.refresh(games[:1], force=True)
+    assert results[games[0].id]["tier"] == "platinum"
+    assert server.requests == ["/api/v1/reports/summaries/620.json"]
+
+    # Apps of a data dump that are not in the library are left out, also over several batches
+    client.cache.store_summary({"appid": 4000, "tier": "gold", "trending_tier": None, "best_tier": None,
+                                "confidence": None, "score": 1.0, "reports": 3, "checked": time.time(), "source": "dump"})
+    monkeypatch.setattr(protondb, "QUERY_BATCH", 1)
+    summaries = client.cache.summaries(games)
+    assert set(summaries) == {item.id for item in games}
+    assert {summary["appid"] for summary in summaries.values()} == {620, 70, 999, None}
@@ -0,0 +1,46 @@
+import os
+import shortcuts
+from games import Game
+from launch_engine import wrapper_path
+
+def game(name):
+    return Game(name=name, path=f"/games/{name}/game.exe", prefix=f"/games/{name}/prefix", proton="GE-Proton9-1", icon="")
+
+def write(path, lines):
+    with open(path, "w") as f:
+        f.write("\n".join(["[Desktop Entry]", "Version=1.0", "Type=Application"] + lines) + "\n")
+
+def test_earlier_entries_are_taken_over(tmp_path):
+    desktop = tmp_path / "Desktop"
+    applications = tmp_path / "applications"
+    desktop.mkdir()
+    portal, witcher, other = game("Portal 2"), game("The Witcher"), game("Other Game")
+    # Earlier versions ran the launch script with bash
+    write(desktop / "Portal 2.desktop", ["Name=Portal 2", f'Exec=bash "{wrapper_path(portal)}"', "Icon=/icons/portal.png"])
+    write(desktop / "The Witcher.desktop", ["Name=The Witcher", f'Exec=bash "{wrapper_path(witcher)}"'])
+    # Entries of the user are left alone, even when they look alike
+    write(desktop / "Notes.desktop", ["Name=Notes", 'Exec=bash "/home/user/notes.sh"'])
+    write(desktop / "Other.desktop", ["Name=Other", f'Exec="/usr/bin/python3" "/opt/tools/main.py" launch {other.id}'])
+
+    result = shortcuts.sync_shortcuts([portal, witcher, other], str(desktop), targets=[], applications_dir=str(applications))
+    assert not result.failed
+    assert sorted(os.listdir(desktop)) == ["Notes.desktop", "Other.desktop", "Portal 2.desktop", "The Witcher.desktop"]
+    assert shortcuts.read_entry(str(desktop / "Other.desktop"))[0] is None
+    # Only the desktop had shortcuts
+    assert not applications.exists()
+    for item in (portal, witcher):
+        game_id, text = shortcuts.read_entry(str(desktop / f"{item.name}.desktop"))
+        assert game_id == item.id
+        assert f"Exec={shortcuts.shortcut_command()} launch {item.id}" in text
+
+    # A second sync has nothing to do
+    result = shortcuts.sync_shortcuts([portal, witcher, other], str(desktop), targets=[], applications_dir=str(applications))
+    assert (result.written, result.removed, result.unchanged) == ([], [], 2)
+
+def test_earlier_entry_of_a_renamed_game_is_replaced(tmp_path):
+    desktop = tmp_path / "Desktop"
+    desktop.mkdir()
+    witcher = game("The Witcher")
+    write(desktop / "Witcher.desktop", ["Name=Witcher", f'Exec=bash "{wrapper_path(witcher)}"'])
+    shortcuts.sync_shortcuts([witcher], str(desktop), targets=[], applications_dir=str(tmp_path / "applications"))
+    assert os.listdir(desktop) == ["The Witcher.desktop"]
@@ -0,0 +1,51 @@
+import os
+import storage
+
+def write(path, size, mode="wb"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, mode) as f:
+        f.write(b"x" * size)
+
+def test_files_growing_in_place(tmp_path):
+    root = str(tmp_path / "prefix")
+    write(os.path.join(root, "drive_c", "save.dat"), 4096)
+    write(os.path.join(root, "logs", "game.log"), 4096)
+    cache = storage.DiskUsageCache(str(tmp_path / "disk-usage.json"))
+    before = cache.scan([root])[root]
+    assert before.files == 2
+
+    # Neither directory changes, only the files in them
+    mtimes = {name: os.lstat(os.path.join(root, name)).st_mtime_ns for name in ("drive_c", "logs")}
+    write(os.path.join(root, "logs", "game.log"), 1024 * 1024, "ab")
+    write(os.path.join(root, "drive_c", "save.dat"), 256 * 1024, "r+b")
+    assert {name: os.lstat(os.path.join(root, name)).st_mtime_ns for name in mtimes} == mtimes
+
+    after = cache.scan([root])[root]
+    assert after.files == 2
+    assert after.size >= before.size + 1024 * 1024 + 252 * 1024
+    assert cache.files(root) == 2
+
+def test_saved_sizes_and_directories_listed_again(tmp_path, monkeypatch):
+    root = str(tmp_path / "prefix")
+    for name in ("drive_c", "logs", "shadercache"):
+        write(os.path.join(root, name, "data.bin"), 8192)
+    path = str(tmp_path / "disk-usage.json")
+    cache = storage.DiskUsageCache(path)
+    measured = cache.scan([root])[root]
+    cache.save()
+
+    # The next run shows the saved sizes before measuring anything
+    cache = storage.DiskUsageCache(path)
+    saved = cache.usage()[root]
+    assert (saved.size, saved.shared, saved.files) == (measured.size, measured.shared, measured.files)
+
+    listed = []
+    read_dir = storage.read_dir
+    monkeypatch.setattr(storage, "read_dir", lambda path, mtime: (listed.append(path), read_dir(path, mtime))[1])
+    assert cache.scan([root])[root].size == measured.size
+    assert listed == []
+
+    # Only the directory that got a new file is listed again
+    write(os.path.join(root, "logs", "game.log"), 4096)
+    assert cache.scan([root])[root].files == 4
+    assert listed == [os.path.join(root, "logs")]
@@ -0,0 +1,188 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from PyQt5 import QtCore, QtGui
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+
+THUMBNAIL_DIR = os.path.join(app_dir, "thumbnails")
+INDEX_PATH = os.path.join(THUMBNAIL_DIR, "index.json")
+THUMBNAIL_SIZE = 128
+# Upper bound for the thumbnails stored on disk, the least recently used ones are evicted first
+MAX_DISK_BYTES = 64 * 1024 * 1024
+# Number of decoded icons kept in memory
+MAX_MEMORY_ICONS = 1024
+
+def thumbnail_key(path):
+    # The key changes whenever the source image is replaced or modified
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def thumbnail_file(key):
+    return os.path.join(THUMBNAIL_DIR, f"{key}.png")
+
+class _DecodeSignals(QtCore.QObject):
+    # icon path, cache key, size of the cached file, decoded image
+    decoded = QtCore.pyqtSignal(str, str, int, QtGui.QImage)
+    failed = QtCore.pyqtSignal(str)
+
+class _DecodeTask(QtCore.QRunnable):
+    def __init__(self, path, signals):
+        super().__init__()
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        key = thumbnail_key(self.path)
+        if key is None:
+            self.signals.failed.emit(self.path)
+            return
+
+        cache_file = thumbnail_file(key)
+        image = QtGui.QImage()
+        if os.path.exists(cache_file):
+            image.load(cache_file)
+
+        if image.isNull():
+            image = self.decode()
+            if image.isNull():
+                self.signals.failed.emit(self.path)
+                return
+            # Write to a temporary file first so a half written thumbnail is never picked up
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            if image.save(tmp_file, "PNG"):
+                os.replace(tmp_file, cache_file)
+
+        try:
+            size = os.path.getsize(cache_file)
+        except OSError:
+            size = 0
+        self.signals.decoded.emit(self.path, key, size, image)
+
+    def decode(self):
+        # Let the image plugin scale while decoding, large covers are never fully expanded in memory
+        reader = QtGui.QImageReader(self.path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        if source_size.isValid() and (source_size.width() > THUMBNAIL_SIZE or source_size.height() > THUMBNAIL_SIZE):
+            reader.setScaledSize(source_size.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, QtCore.Qt.KeepAspectRatio))
+        image = reader.read()
+        if not image.isNull() and (image.width() > THUMBNAIL_SIZE or image.height() > THUMBNAIL_SIZE):
+            image = image.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        return image
+
+class ThumbnailCache(QtCore.QObject):
+    # Emitted with the icon path once its thumbnail can be fetched with icon()
+    thumbnail_ready = QtCore.pyqtSignal(str)
+
+    def __init__(self, placeholder_path, parent=None):
+        super().__init__(parent)
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        self.placeholder_path = placeholder_path
+        self._placeholder = None
+        self._icons = OrderedDict()
+        self._pending = set()
+        self._failed = set()
+        self._disk_index = self.load_index()
+        self._disk_bytes = sum(self._disk_index.values())
+
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, QtCore.QThread.idealThreadCount() - 1))
+
+        self.signals = _DecodeSignals()
+        self.signals.decoded.connect(self.on_decoded)
+        self.signals.failed.connect(self.on_failed)
+
+        # Persist the LRU index a moment after the last change instead of on every thumbnail
+        self.save_timer = QtCore.QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(2000)
+        self.save_timer.timeout.connect(self.save_index)
+
+    def placeholder(self):
+        if self._placeholder is None:
+            image = QtGui.QImage(self.placeholder_path)
+            if not image.isNull():
+                image = image.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+            self._placeholder = QtGui.QIcon(QtGui.QPixmap.fromImage(image))
+        return self._placeholder
+
+    def icon(self, path):
+        # Returns the thumbnail if it is already decoded, otherwise schedules it and returns the placeholder
+        if not path:
+            return self.placeholder()
+        icon = self._icons.get(path)
+        if icon is not None:
+            self._icons.move_to_end(path)
+            return icon
+        self.request(path)
+        return self.placeholder()
+
+    def request(self, path):
+        if path in self._pending or path in self._failed:
+            return
+        self._pending.add(path)
+        self.pool.start(_DecodeTask(path, self.signals))
+
+    def invalidate(self, path):
+        # Forget the decoded icon, the next request picks up the new mtime/size key
+        self._icons.pop(path, None)
+        self._failed.discard(path)
+
+    def on_decoded(self, path, key, size, image):
+        self._pending.discard(path)
+        self._icons[path] = QtGui.QIcon(QtGui.QPixmap.fromImage(image))
+        self._icons.move_to_end(path)
+        while len(self._icons) > MAX_MEMORY_ICONS:
+            self._icons.popitem(last=False)
+
+        self.touch(key, size)
+        self.thumbnail_ready.emit(path)
+
+    def on_failed(self, path):
+        self._pending.discard(path)
+        self._failed.add(path)
+
+    def touch(self, key, size):
+        if key in self._disk_index:
+            self._disk_index.move_to_end(key)
+        else:
+            self._disk_index[key] = size
+            self._disk_bytes += size
+            self.evict()
+        self.save_timer.start()
+
+    def evict(self):
+        while self._disk_bytes > MAX_DISK_BYTES and len(self._disk_index) > 1:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(thumbnail_file(key))
+            except OSError:
+                pass
+
+    def load_index(self):
+        index = OrderedDict()
+        if os.path.exists(INDEX_PATH):
+            try:
+                with open(INDEX_PATH, "r") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = []
+            # Entries are stored from least to most recently used
+            for key, size in entries:
+                if os.path.exists(thumbnail_file(key)):
+                    index[key] = size
+        return index
+
+    def save_index(self):
+        self.save_timer.stop()
+        tmp_path = f"{INDEX_PATH}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(list(self._disk_index.items()), f)
+        os.replace(tmp_path, INDEX_PATH)
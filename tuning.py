@@ -0,0 +1,151 @@
+import os
+import re
+from config import config
+
+app_dir = os.path.expanduser("~/.protonlauncher")
+
+SHADER_CACHE_DIR = os.path.join(app_dir, "shadercache")
+# Profile every game inherits from unless it picks another one, it always exists
+DEFAULT_PROFILE = "Default"
+
+SYNC_MODES = ("default", "esync", "fsync", "ntsync", "off")
+IO_PRIORITIES = ("", "best-effort", "idle")
+
+# Tuning settings with their type, default value and label. Profiles and games only store the settings they change.
+SETTINGS = {
+    "sync": (str, "default", "Synchronization"),
+    "dxvk_async": (bool, False, "DXVK async shader compilation"),
+    "shader_cache": (bool, True, "Per-game DXVK/VKD3D shader cache"),
+    "nvapi": (bool, False, "NVAPI (DLSS, Reflex)"),
+    "large_address_aware": (bool, False, "Large address aware"),
+    "gamemode": (bool, False, "Run with gamemoderun"),
+    "cpu_affinity": (str, "", "CPU affinity (taskset)"),
+    "nice": (int, 0, "CPU priority (nice)"),
+    "io_priority": (str, "", "IO priority (ionice)"),
+}
+
+def defaults():
+    return {key: default for key, (_, default, _) in SETTINGS.items()}
+
+def clean(values):
+    # Known settings with a valid value, anything else is dropped
+    result = {}
+    for key, value in (values or {}).items():
+        if key not in SETTINGS:
+            continue
+        expected = SETTINGS[key][0]
+        if expected is int and isinstance(value, bool):
+            continue
+        if not isinstance(value, expected):
+            continue
+        if key == "sync" and value not in SYNC_MODES:
+            continue
+        if key == "io_priority" and value not in IO_PRIORITIES:
+            continue
+        # taskset CPU list, e.g. "0-7" or "0,2,4,6"
+        if key == "cpu_affinity" and value and not re.fullmatch(r"[0-9]+(-[0-9]+)?(,[0-9]+(-[0-9]+)?)*", value):
+            continue
+        result[key] = value
+    return result
+
+def profiles():
+    # {name: {"inherits": parent name, setting: value, ...}}, the default profile is always there
+    stored = config.get("profiles") or {}
+    result = {DEFAULT_PROFILE: {}}
+    for name, profile in stored.items():
+        if isinstance(profile, dict):
+            result[name] = dict(profile)
+    result[DEFAULT_PROFILE].pop("inherits", None)
+    return result
+
+def save_profiles(values):
+    # Config values are compared on set, so a new dict is stored every time
+    config.set("profiles", {name: dict(profile) for name, profile in values.items()})
+
+def profile_chain(name, all_profiles):
+    # Profiles applied for a name, the default profile first; cycles and missing parents end the chain
+    chain = []
+    seen = set()
+    while name and name in all_profiles and name not in seen:
+        seen.add(name)
+        chain.append(all_profiles[name])
+        name = all_profiles[name].get("inherits") or (DEFAULT_PROFILE if name != DEFAULT_PROFILE else None)
+    if DEFAULT_PROFILE not in seen:
+        chain.append(all_profiles[DEFAULT_PROFILE])
+    return list(reversed(chain))
+
+def resolve(game, all_profiles=None):
+    # Effective settings of a game: defaults, then its profile chain, then its own overrides
+    all_profiles = profiles() if all_profiles is None else all_profiles
+    settings = defaults()
+    for profile in profile_chain(game.profile or DEFAULT_PROFILE, all_profiles):
+        settings.update(clean(profile))
+    settings.update(clean(game.tuning))
+    return settings
+
+def shader_cache_dir(game_id):
+    return os.path.join(SHADER_CACHE_DIR, game_id)
+
+def environment(settings, game):
+    variables = {}
+    sync = settings["sync"]
+    if sync in ("esync", "off"):
+        variables["PROTON_NO_FSYNC"] = "1"
+    if sync in ("fsync", "off"):
+        variables["PROTON_NO_ESYNC"] = "1"
+    if sync == "ntsync":
+        variables["PROTON_USE_NTSYNC"] = "1"
+    if settings["dxvk_async"]:
+        variables["DXVK_ASYNC"] = "1"
+    if settings["shader_cache"]:
+        cache_dir = shader_cache_dir(game.id)
+        variables["DXVK_STATE_CACHE_PATH"] = cache_dir
+        variables["VKD3D_SHADER_CACHE_PATH"] = cache_dir
+    else:
+        variables["DXVK_STATE_CACHE"] = "0"
+    if settings["nvapi"]:
+        variables["PROTON_ENABLE_NVAPI"] = "1"
+        variables["DXVK_ENABLE_NVAPI"] = "1"
+    if settings["large_address_aware"]:
+        variables["PROTON_FORCE_LARGE_ADDRESS_AWARE"] = "1"
+    return variables
+
+def command_prefix(settings):
+    # Programs the Proton command is run through
+    prefix = []
+    if settings["cpu_affinity"]:
+        prefix += ["taskset", "-c", settings["cpu_affinity"]]
+    if settings["nice"]:
+        prefix += ["nice", "-n", str(settings["nice"])]
+    if settings["io_priority"]:
+        prefix += ["ionice", "-c", "2" if settings["io_priority"] == "best-effort" else "3"]
+    if settings["gamemode"]:
+        prefix.append("gamemoderun")
+    return prefix
+
+def describe(settings):
+    # Short description of the settings that differ from the defaults
+    parts = []
+    if settings["sync"] != "default":
+        parts.append(f"sync {settings['sync']}")
+    for key in ("dxvk_async", "nvapi", "large_address_aware", "gamemode"):
+        if settings[key]:
+            parts.append(SETTINGS[key][2])
+    if not settings["shader_cache"]:
+        parts.append("no shader state cache")
+    if settings["cpu_affinity"]:
+        parts.append(f"CPUs {settings['cpu_affinity']}")
+    if settings["nice"]:
+        parts.append(f"nice {settings['nice']}")
+    if settings["io_priority"]:
+        parts.append(f"ionice {settings['io_priority']}")
+    return ", ".join(parts) or "defaults"
+
+def launch_settings(game):
+    # (profile, description of the resolved settings) a launch runs with, recorded with it for the performance reports
+    return game.profile or DEFAULT_PROFILE, describe(resolve(game))
+
+def prepare(settings, game):
+    # Directories the settings expect to exist before the launch
+    if settings["shader_cache"]:
+        os.makedirs(shader_cache_dir(game.id), exist_ok=True)